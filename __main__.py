@@ -1,16 +1,20 @@
-from orm.driver import Driver
+from configs.automation_configs import DRIVER_POOL_SIZE
+from orm.driver_pool import DriverPool
 from orm.ui import UI
 
 # from helpers.action import sleepWithLog
 
-driver = Driver(dry_run=False, high_light_mode=False)
-# driver = Driver(dry_run=True, high_light_mode=False)
+driver_pool = DriverPool(size=DRIVER_POOL_SIZE, dry_run=False, high_light_mode=False)
+# driver_pool = DriverPool(size=DRIVER_POOL_SIZE, dry_run=True, high_light_mode=False)
+
+# The startup page opens in the first browser of the pool, the one the pool started by itself.
+with driver_pool.lease() as driver:
+    driver.goto("https://stackoverflow.com/questions/30324760/how-to-get-an-attribute-of-an-element-from-selenium")
+    # sleep(1)
+    driver.switchTab(0)
 
 # # Test "Click by attribute"
 # driver.switchTab(0)
-driver.goto("https://stackoverflow.com/questions/30324760/how-to-get-an-attribute-of-an-element-from-selenium")
-# sleep(1)
-driver.switchTab(0)
 # driver.clickByAttribute(
 #     selector="#answers > div",
 #     attribute="itemprop",
@@ -46,7 +50,7 @@ driver.switchTab(0)
 # driver.goto("https://reservation.mens.reginaclinic.jp/?utm_medium=cpc_brand&utm_source=google&utm_campaign=brand_term&argument=cYCQCTwd&dmai=a652fa167b8892#/")
 
 # Most of the UI setup is done in the init function.
-ui = UI(driver=driver)
+ui = UI(driver_pool=driver_pool)
 
 ui.go()
-driver.close()
+driver_pool.close()
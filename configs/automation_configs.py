@@ -1,9 +1,189 @@
+from enum import StrEnum
+
+# SLEEP_TIME_AFTER_LOAD is only used by the LoadCondition.FIXED_SLEEP.
 SLEEP_TIME_AFTER_LOAD=0.3
 
+# PageLoadStrategy is the browser's page load strategy, it decides when driver.get() returns.
+class PageLoadStrategy(StrEnum):
+    # NORMAL waits for the load event (document.readyState == "complete").
+    NORMAL = "normal"
+    # EAGER waits for the DOMContentLoaded (document.readyState == "interactive").
+    EAGER = "eager"
+    # NONE returns right after the navigation starts.
+    NONE = "none"
+
+# LoadCondition is the extra condition Driver.goto waits for after driver.get() returns.
+class LoadCondition(StrEnum):
+    # READY_STATE waits until document.readyState is "complete".
+    READY_STATE = "ready state"
+    # SENTINEL waits until the given sentinel selector shows up.
+    SENTINEL = "sentinel"
+    # NETWORK_IDLE waits until there's no fetch/XHR in flight for NETWORK_IDLE_TIME seconds.
+    NETWORK_IDLE = "network idle"
+    # FIXED_SLEEP is the old behavior, sleep SLEEP_TIME_AFTER_LOAD no matter what.
+    FIXED_SLEEP = "fixed sleep"
+
+PAGE_LOAD_STRATEGY=PageLoadStrategy.NORMAL
+PAGE_LOAD_CONDITIONS=[LoadCondition.READY_STATE]
+# PAGE_LOAD_TIMEOUT is the maximum time for each of the load conditions.
+PAGE_LOAD_TIMEOUT=30
+NETWORK_IDLE_TIME=0.5
+
+# BackoffCurve is how the sleep between 2 attempts of a step grows, see orm/retry_policy.py.
+class BackoffCurve(StrEnum):
+    # CONSTANT sleeps RETRY_INTERVAL before every retry.
+    CONSTANT = "constant"
+    # LINEAR sleeps RETRY_INTERVAL, then 2x, 3x, ...
+    LINEAR = "linear"
+    # EXPONENTIAL sleeps RETRY_INTERVAL, then 2x, 4x, ...
+    EXPONENTIAL = "exponential"
+
+# The retry policy of the actions that don't have their own "retry" in the template's JSON file.
+# 1 attempt means no retry, the old behavior.
+RETRY_ATTEMPTS=1
+RETRY_BACKOFF=BackoffCurve.EXPONENTIAL
 # RETRY_INTERVAL is the sleep time between retry attempts. 
 RETRY_INTERVAL=1
+# RETRY_MAX_INTERVAL caps the sleep time between retry attempts.
+RETRY_MAX_INTERVAL=30
 ELEMENT_LOADING_TIMEOUT=5
 # ELEMENT_LOADING_TIMEOUT=2
 
+# The way the Driver waits for an element to show up.
+class WaitStrategy(StrEnum):
+    # OBSERVER resolves as soon as the element is added to the page (MutationObserver),
+    # and falls back to POLL if the script can't be run on the page.
+    OBSERVER = "observer"
+    # POLL checks for the element every ELEMENT_POLL_INTERVAL seconds.
+    POLL = "poll"
+
+ELEMENT_WAIT_STRATEGY=WaitStrategy.OBSERVER
+# ELEMENT_POLL_INTERVAL is the sleep time between 2 checks when the Driver is polling for an element.
+ELEMENT_POLL_INTERVAL=0.1
+
+# PacingMode is how long a template waits between 2 of its steps.
+class PacingMode(StrEnum):
+    # NONE goes to the next step right away.
+    NONE = "none"
+    # FIXED sleeps for the pacing duration.
+    FIXED = "fixed"
+    # UNTIL_READY waits until the next step's element shows up, at most ELEMENT_LOADING_TIMEOUT.
+    UNTIL_READY = "until ready"
+
+# The pacing of the templates that don't have their own "pacing" in their JSON file.
+# FIXED 0.5s is the old behavior.
+STEP_PACING_MODE=PacingMode.FIXED
+STEP_PACING_DURATION=0.5
+# DRY_RUN_ACTION_DURATION is how long an action pretends to run when the Driver is in the dry_run mode.
+DRY_RUN_ACTION_DURATION=0.5
+
+# STEP_TIMEOUT is the maximum time (in seconds) of 1 template step, including its waits, 0 means no limit.
+STEP_TIMEOUT=0
+# BROWSER_WAIT_SLICE is how often (in seconds) a wait inside the browser checks if its step is paused or timed out.
+# WebDriver runs the commands of a session one at a time, so the browser can't be told to stop a wait while it runs,
+# the wait is cut into short slices instead: a pause stops a waiting step after at most this long,
+# an element showing up still ends the wait right away.
+BROWSER_WAIT_SLICE=0.15
+
+# ResumeMode is where the next repeat of a template starts after a failed (or paused) repeat.
+class ResumeMode(StrEnum):
+    # RESTART starts the next repeat from the first step, the old behavior.
+    RESTART = "restart"
+    # FAILED_STEP starts from the step that failed.
+    FAILED_STEP = "failed step"
+    # RESTART_POINT starts from the closest step marked as restart_point before the failed step,
+    # or from the first step if there's none.
+    RESTART_POINT = "restart point"
+
+# The resume mode of the templates that don't have their own "resume_mode" in their JSON file.
+RESUME_MODE=ResumeMode.RESTART
+# CHECKPOINT_FOLDER is where the templates keep where to resume from, so it survives a restart of the app.
+# The checkpoints are only written when the resume mode is not RESTART.
+CHECKPOINT_FOLDER="./checkpoints"
+
+# ScheduleMode is when the scheduler starts a template, see orm/schedule.py.
+class ScheduleMode(StrEnum):
+    # FIXED_RATE starts the template every interval seconds, counted from the previous start,
+    # or aligned to the clock (e.g. every 15 minutes at :00, :15, :30 and :45).
+    FIXED_RATE = "fixed rate"
+    # CRON starts the template at the moments of a cron expression, e.g. "0 9 * * *" is every day at 09:00.
+    CRON = "cron"
+    # DELAY starts the template interval seconds after its previous run is over.
+    DELAY = "delay"
+
+# OverlapPolicy is what to do when a template is still running at its next scheduled start.
+class OverlapPolicy(StrEnum):
+    # SKIP drops that start, the template waits for the one after.
+    SKIP = "skip"
+    # QUEUE starts the template again right after the current run, the missed starts count as 1.
+    QUEUE = "queue"
+
+SCHEDULE_OVERLAP_POLICY=OverlapPolicy.SKIP
+
+# HEADLESS runs Firefox without a window.
+HEADLESS=False
+# FAST_START applies the FAST_START_PREFERENCES to the new browser's profile,
+# so Firefox doesn't spend its startup on the first-run pages, telemetry and update checks.
+FAST_START=True
+FAST_START_PREFERENCES={
+    # No first-run, welcome or "what's new" pages.
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.startup.page": 0,
+    "browser.aboutwelcome.enabled": False,
+    "startup.homepage_welcome_url": "about:blank",
+    "startup.homepage_welcome_url.additional": "",
+    "browser.newtabpage.enabled": False,
+    # No telemetry.
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "toolkit.telemetry.unified": False,
+    "toolkit.telemetry.reportingpolicy.firstRun": False,
+    "browser.newtabpage.activity-stream.feeds.telemetry": False,
+    "browser.ping-centre.telemetry": False,
+    "app.normandy.enabled": False,
+    # No update checks.
+    "app.update.auto": False,
+    "app.update.checkInstallTime": False,
+    "extensions.update.enabled": False,
+    "browser.search.update": False,
+    "network.captive-portal-service.enabled": False,
+}
+
+# The resources that the browser shouldn't download, see helpers/resource_policy.py.
+# The templates only click and type, so these only slow down the page load.
+BLOCK_IMAGES=False
+BLOCK_FONTS=False
+BLOCK_MEDIA=False
+# BLOCKED_DOMAINS blocks these domains and their sub domains, e.g. the third-party trackers.
+BLOCKED_DOMAINS=[]
+
+# DRIVER_POOL_SIZE is the number of browsers that can run templates at the same time.
+# Each running template leases 1 browser, the others wait in line.
+DRIVER_POOL_SIZE=1
+
+# RESULTS_FOLDER is where the data-driven runs write the result of each row of their data file.
+RESULTS_FOLDER="./results"
+
+# METRICS_FOLDER is where the Driver's latency metrics are dumped after each template run.
+METRICS_FOLDER="./metrics"
+
 # The setting of the special border around the selected element.
 HIGHLIGHT_ELEMENT_DURATION = 1
+
+# IN_BROWSER_LOOKUP makes the Click by Value/Attribute lookup run inside the browser in 1 script call,
+# instead of reading the text/attribute of every candidate element from python.
+IN_BROWSER_LOOKUP=True
+
+class TemplateStoreKind(StrEnum):
+    # 1 JSON file per template in TEMPLATE_FOLDER, named "<tab index>_<name>.json".
+    JSON = "json"
+    # 1 SQLite database for all the templates, keyed by a stable ID, see orm/template_store.py.
+    SQLITE = "sqlite"
+
+# TEMPLATE_STORE is where the templates are saved.
+# When switching to SQLITE, the JSON templates are imported once into the empty database.
+TEMPLATE_STORE=TemplateStoreKind.JSON
+TEMPLATE_FOLDER="./templates"
+TEMPLATE_DATABASE="./templates/templates.db"
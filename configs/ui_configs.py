@@ -13,7 +13,24 @@ class ResultText(StrEnum):
     IN_PROGRESS = "Please wait. Executing..."
     SUCCESS = "Success"
     FAILED = "{}"
-    PAUSE_NOTIFICATION = "Pause after this action is done..."
+    PAUSE_NOTIFICATION = "Pausing..."
+    WAITING_FOR_BROWSER = "Waiting for a free browser..."
+    RETRYING = "Retrying ({}/{}) after: {}"
+    ROWS_PROGRESS = "{} rows done, {} failed ({:.1f} rows/min)"
+    PREFLIGHT = "Preflight: {} selectors, {} not found, {} hidden, {} invalid, {} with many matches"
+    PREFLIGHT_DRY_RUN = "Dry run, no selector is checked"
+################################################
+# UI_FRAME_RATE is how many times per second the UI applies the changes posted by the running templates.
+UI_FRAME_RATE = 30
+################################################
+# TEMPLATE_BACKGROUND_PARSING reads the template files on a background thread at startup,
+# so the schedules are armed and the tabs open faster, while the window shows up right away.
+# Either way, the rows of a template are only built when its tab is first opened or run.
+# Without it, a scheduled template is only armed after its tab is opened.
+TEMPLATE_BACKGROUND_PARSING = True
+# TEMPLATE_AUTOSAVE_DELAY is the seconds without any edit before the edited templates are saved in the background.
+# 0 turns the autosave off, the templates are only saved by the Save buttons (still in the background).
+TEMPLATE_AUTOSAVE_DELAY = 2
 ################################################
 # HISTORY TABLE
 # the default error message for the action that is not executed yet. 
@@ -1,8 +1,14 @@
 import time
 from tqdm import tqdm
 
+from helpers.cancellation import CancellationToken
+
 # sleepWithLog delay execution for a given number of seconds.
-def sleepWithLog(duration: float) -> None:
+# With a token, the sleep stops (raising helpers.cancellation.Cancelled) as soon as the token is cancelled.
+def sleepWithLog(duration: float, token: CancellationToken | None = None) -> None:
     update_frequency = 0.1
     for _ in tqdm(range(int(duration/update_frequency))):
-        time.sleep(update_frequency)
+        if token is None:
+            time.sleep(update_frequency)
+        else:
+            token.sleep(update_frequency)
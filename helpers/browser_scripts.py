@@ -0,0 +1,287 @@
+import pkgutil
+
+# The atoms that selenium itself runs for WebElement.get_attribute() and WebElement.is_displayed().
+# Reusing them in our scripts guarantees that a lookup done inside the browser
+# sees exactly the same attribute values as the old python loop did.
+_GET_ATTRIBUTE_ATOM = pkgutil.get_data("selenium.webdriver.remote", "getAttribute.js").decode("utf8")
+_IS_DISPLAYED_ATOM = pkgutil.get_data("selenium.webdriver.remote", "isDisplayed.js").decode("utf8")
+
+# FIND_MATCH_SCRIPT resolves the "Click by Value" lookup in one round trip.
+# arguments: [selector, html_attribute, value]
+#   - If html_attribute is empty, it returns the candidates whose visible text can be value, in the document order.
+#     Selenium has no atom for the visible text (WebElement.text is answered by the browser driver itself),
+#     so the script only drops the elements that can't match, and the caller compares the candidates with WebElement.text.
+#   - Otherwise, it does the strict pass (attribute == value) first,
+#     then the partial pass (value in attribute).
+# It returns {count, element, candidates, kind}, where count is the number of elements matching the selector,
+# so the caller can keep waiting while the selector matches nothing.
+FIND_MATCH_SCRIPT = """
+var getAttribute = (%s);
+var isDisplayed = (%s);
+var selector = arguments[0], htmlAttribute = arguments[1], value = arguments[2];
+
+// fold removes the spaces and the case, per character,
+// so the text-transform and the space collapsing of WebElement.text don't matter.
+// The final sigma is folded too, its lower case depends on the letters around it.
+function fold(text) {
+    return text.toUpperCase().toLowerCase().replace(/\\u03c2/g, "\\u03c3").replace(/\\s+/g, "");
+}
+
+// allText is all the text under the node, hidden or not, including the open shadow roots.
+function allText(node) {
+    if (node.nodeType === Node.TEXT_NODE) {
+        return node.data;
+    }
+    var text = "";
+    if (node.shadowRoot) {
+        text += allText(node.shadowRoot);
+    }
+    for (var child = node.firstChild; child !== null; child = child.nextSibling) {
+        text += allText(child);
+    }
+    return text;
+}
+
+// mayHaveText tells if WebElement.text of the element can be value.
+// WebElement.text is a part of the element's text, spaced and cased differently,
+// and it's empty for a hidden element, so value must be a subsequence of all the folded text.
+// It never rejects a match, it only saves the round trips of the elements that can't match.
+var foldedValue = fold(value);
+function mayHaveText(element) {
+    if (foldedValue === "") {
+        return true;
+    }
+    if (!isDisplayed(element)) {
+        return false;
+    }
+    var text = fold(allText(element));
+    var j = 0;
+    for (var i = 0; i < text.length && j < foldedValue.length; i++) {
+        if (text[i] === foldedValue[j]) {
+            j++;
+        }
+    }
+    return j === foldedValue.length;
+}
+
+var elements = document.querySelectorAll(selector);
+var result = {count: elements.length, element: null, candidates: [], kind: ""};
+
+if (htmlAttribute === "") {
+    result.kind = "text";
+    for (var i = 0; i < elements.length; i++) {
+        if (mayHaveText(elements[i])) {
+            result.candidates.push(elements[i]);
+        }
+    }
+    return result;
+}
+
+var attributes = [];
+for (var i = 0; i < elements.length; i++) {
+    attributes.push(getAttribute(elements[i], htmlAttribute));
+    if (attributes[i] === value) {
+        result.element = elements[i];
+        result.kind = "strict";
+        return result;
+    }
+}
+
+for (var i = 0; i < elements.length; i++) {
+    // Skip the null attributes to mirror the nil check of the python loop.
+    if (attributes[i] === null || attributes[i] === undefined) {
+        continue;
+    }
+    if (String(attributes[i]).indexOf(value) !== -1) {
+        result.element = elements[i];
+        result.kind = "partial";
+        return result;
+    }
+}
+return result;
+""" % (_GET_ATTRIBUTE_ATOM, _IS_DISPLAYED_ATOM)
+
+# PREFLIGHT_SCRIPT checks many selectors against the current page in one round trip.
+# arguments: [selectors]
+# It returns 1 {selector, count, visible, error} per selector, in order,
+# where count is the number of matching elements, visible is how many of them are displayed,
+# and error is the message of an invalid selector, so 1 broken selector doesn't hide the others.
+PREFLIGHT_SCRIPT = """
+var isDisplayed = (%s);
+var selectors = arguments[0];
+
+return selectors.map(function(selector) {
+    var result = {selector: selector, count: 0, visible: 0, error: ""};
+    var elements;
+    try {
+        elements = document.querySelectorAll(selector);
+    } catch (e) {
+        result.error = String(e);
+        return result;
+    }
+    result.count = elements.length;
+    for (var i = 0; i < elements.length; i++) {
+        if (isDisplayed(elements[i])) {
+            result.visible++;
+        }
+    }
+    return result;
+});
+""" % _IS_DISPLAYED_ATOM
+
+# WAIT_FOR_SELECTOR_SCRIPT is an async script (execute_async_script) that resolves
+# as soon as the selector matches at least 1 element, using a MutationObserver instead of polling.
+# arguments: [selector, timeout in milliseconds, callback]
+# It calls back with true if the element shows up, false if it times out.
+WAIT_FOR_SELECTOR_SCRIPT = """
+var selector = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+if (document.querySelector(selector) !== null) {
+    done(true);
+    return;
+}
+
+var finished = false;
+var observer = new MutationObserver(function() {
+    if (document.querySelector(selector) !== null) {
+        finish(true);
+    }
+});
+var timer = setTimeout(function() { finish(false); }, timeout);
+
+function finish(found) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(found);
+}
+
+observer.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true});
+"""
+
+# READY_STATE_SCRIPT is an async script that resolves when document.readyState reaches the target state.
+# arguments: [target state ("interactive" or "complete"), timeout in milliseconds, callback]
+# It calls back with true if the state is reached, false if it times out.
+READY_STATE_SCRIPT = """
+var target = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var ranks = {"loading": 0, "interactive": 1, "complete": 2};
+
+function reached() {
+    return ranks[document.readyState] >= ranks[target];
+}
+
+if (reached()) {
+    done(true);
+    return;
+}
+
+var finished = false;
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    document.removeEventListener("readystatechange", onChange);
+    clearTimeout(timer);
+    done(result);
+}
+function onChange() {
+    if (reached()) {
+        finish(true);
+    }
+}
+var timer = setTimeout(function() { finish(false); }, timeout);
+document.addEventListener("readystatechange", onChange);
+"""
+
+# NETWORK_IDLE_SCRIPT is an async script that resolves when the page has been quiet for a while.
+# It installs a counter around fetch and XMLHttpRequest (once per page),
+# and also watches the resource timing entries so the requests started before the counter is installed
+# still reset the quiet window when they finish.
+# The quiet window is kept in the page, so it goes on from one slice of the wait to the next (see BROWSER_WAIT_SLICE).
+# arguments: [idle time in milliseconds, timeout in milliseconds, callback]
+# It calls back with true if the network is idle, false if it times out.
+NETWORK_IDLE_SCRIPT = """
+var idleTime = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+
+var network = window.__rpaNetwork;
+if (!network) {
+    network = {inflight: 0, quietSince: Date.now(), resourceCount: performance.getEntriesByType("resource").length};
+    window.__rpaNetwork = network;
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function() {
+            network.inflight++;
+            return originalFetch.apply(this, arguments).finally(function() { network.inflight--; });
+        };
+    }
+
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        network.inflight++;
+        this.addEventListener("loadend", function() { network.inflight--; }, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+}
+
+var started = Date.now();
+function check() {
+    var now = Date.now();
+    var resourceCount = performance.getEntriesByType("resource").length;
+    if (network.inflight > 0 || resourceCount !== network.resourceCount || document.readyState === "loading") {
+        network.quietSince = now;
+        network.resourceCount = resourceCount;
+    }
+    return now - network.quietSince >= idleTime;
+}
+
+if (check()) {
+    done(true);
+    return;
+}
+var interval = setInterval(function() {
+    var now = Date.now();
+    if (check()) {
+        clearInterval(interval);
+        done(true);
+    } else if (now - started >= timeout) {
+        clearInterval(interval);
+        done(false);
+    }
+}, 50);
+"""
+
+# HIGHLIGHT_SCRIPT outlines all the given elements at once and restores them with a timer,
+# so the automation doesn't have to wait for the highlight to be over.
+# Only the outline is touched, the rest of the element's style is kept as it is.
+# arguments: [elements, duration in milliseconds]
+HIGHLIGHT_SCRIPT = """
+var elements = arguments[0], duration = arguments[1];
+if (elements.length > 0) {
+    elements[0].scrollIntoView({block: "center"});
+}
+
+elements.forEach(function(element) {
+    // If the element is still highlighted from the previous call,
+    // keep its real original outline and only extend the timer.
+    if (element.__rpaHighlight) {
+        clearTimeout(element.__rpaHighlight.timer);
+    } else {
+        element.__rpaHighlight = {
+            outline: element.style.outline,
+            outlineOffset: element.style.outlineOffset,
+        };
+    }
+    element.style.outline = "dashed";
+    element.style.outlineOffset = "4px";
+
+    element.__rpaHighlight.timer = setTimeout(function() {
+        element.style.outline = element.__rpaHighlight.outline;
+        element.style.outlineOffset = element.__rpaHighlight.outlineOffset;
+        delete element.__rpaHighlight;
+    }, duration);
+});
+"""
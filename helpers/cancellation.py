@@ -0,0 +1,105 @@
+import threading
+import time
+import weakref
+
+class Cancelled(Exception):
+    """Cancelled is raised by the waits of a cancelled (or expired) CancellationToken."""
+
+
+class CancellationToken:
+    def __init__(self, timeout: float = 0, parent: "CancellationToken | None" = None) -> None:
+        """
+        CancellationToken is passed from a template run down to the sleeps and the waits of its steps,
+        so a pause or a timeout stops them right away instead of after the whole sleep/wait.
+
+        :timeout: float: the seconds before the token expires, 0 means never.
+        :parent: CancellationToken: cancelling the parent cancels this token too, e.g. the run's token of a step's token.
+        """
+        self.deadline: float | None = time.monotonic() + timeout if timeout > 0 else None
+        self.timeout: float = timeout
+        self.reason: str = ""
+        self.__event = threading.Event()
+        self.__lock = threading.Lock()
+        self.__children: weakref.WeakSet[CancellationToken] = weakref.WeakSet()
+        self.__parent: CancellationToken | None = parent
+
+        if parent is not None:
+            if parent.deadline is not None and (self.deadline is None or parent.deadline < self.deadline):
+                self.deadline = parent.deadline
+                self.timeout = parent.timeout
+            parent.__addChild(self)
+
+
+    def __addChild(self, child: "CancellationToken") -> None:
+        with self.__lock:
+            self.__children.add(child)
+        if self.__event.is_set():
+            child.cancel(reason=self.reason)
+
+
+    # child returns a new token cancelled with this one, with its own timeout, e.g. for 1 step.
+    def child(self, timeout: float = 0) -> "CancellationToken":
+        return CancellationToken(timeout=timeout, parent=self)
+
+
+    # cancel wakes up everything waiting on this token and its children.
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self.__lock:
+            if self.__event.is_set():
+                return
+            self.reason = reason
+            self.__event.set()
+            children = list(self.__children)
+        for child in children:
+            child.cancel(reason=reason)
+
+
+    def isCancelled(self) -> bool:
+        return self.__event.is_set() or self.remaining() == 0
+
+
+    # remaining returns the seconds before the deadline, None if there's no deadline.
+    def remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0, self.deadline - time.monotonic())
+
+
+    # timedOut tells us if the token expired on its own timeout,
+    # rather than being cancelled or expired with its parent, e.g. a step that is too slow but wasn't paused.
+    def timedOut(self) -> bool:
+        if self.__event.is_set() or self.remaining() != 0:
+            return False
+        return self.__parent is None or not self.__parent.isCancelled()
+
+
+    # why returns the reason of the cancellation, or the timeout if the token is expired.
+    def why(self) -> str:
+        if self.__event.is_set():
+            return self.reason
+        return "timeout after {}s".format(self.timeout)
+
+
+    def raiseIfCancelled(self) -> None:
+        if self.isCancelled():
+            raise Cancelled(self.why())
+
+
+    # sleep sleeps for the duration, and raises Cancelled as soon as the token is cancelled or expired.
+    def sleep(self, duration: float) -> None:
+        self.raiseIfCancelled()
+        remaining = self.remaining()
+        if remaining is not None and remaining < duration:
+            self.__event.wait(timeout=remaining)
+            # The deadline is reached, even if time.monotonic disagrees by a hair.
+            raise Cancelled(self.why())
+        if self.__event.wait(timeout=duration):
+            self.raiseIfCancelled()
+
+
+    # limit returns the timeout capped by the token's deadline.
+    def limit(self, timeout: float) -> float:
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
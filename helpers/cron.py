@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+# The fields of a cron expression, in order: (name, min, max).
+_FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 6),
+]
+
+
+class CronExpression:
+    def __init__(self, expression: str) -> None:
+        """
+        CronExpression is the classic 5 fields cron: "minute hour day-of-month month day-of-week",
+        e.g. "0 9 * * 1-5" is 09:00 from Monday to Friday, "*/15 * * * *" is every 15 minutes.
+        Each field takes *, a number, a range (1-5), a list (1,3,5) and a step (*/15, 0-30/10).
+        The day of week starts from Sunday (0), 7 is Sunday too.
+        Like cron, if both the day of month and the day of week are restricted, either of them matches.
+        """
+        self.expression: str = expression.strip()
+        fields = self.expression.split()
+        if len(fields) != len(_FIELDS):
+            raise Exception("cron expression must have {} fields, got ({})".format(len(_FIELDS), expression))
+
+        values: list[set[int]] = []
+        for text, (name, low, high) in zip(fields, _FIELDS):
+            if name == "day of week":
+                # 7 is Sunday too.
+                values.append({value % 7 for value in _parseField(text=text, name=name, low=low, high=7)})
+            else:
+                values.append(_parseField(text=text, name=name, low=low, high=high))
+        self.minutes, self.hours, self.days, self.months, self.weekdays = values
+        # The restriction is decided from the values, not the text, e.g. "*/1" and "1-31" are any day too.
+        self.any_day: bool = self.days == set(range(_FIELDS[2][1], _FIELDS[2][2] + 1))
+        self.any_weekday: bool = self.weekdays == set(range(_FIELDS[4][1], _FIELDS[4][2] + 1))
+
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+    # matchesDay tells us if the cron runs on that day.
+    def matchesDay(self, moment: datetime) -> bool:
+        if moment.month not in self.months:
+            return False
+        day_matches = moment.day in self.days
+        # datetime's Monday is 0, cron's Monday is 1.
+        weekday_matches = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday_matches
+        if self.any_weekday:
+            return day_matches
+        return day_matches or weekday_matches
+
+
+    # nextAfter returns the first moment strictly after the given one that matches the cron.
+    # It jumps a whole month, day or hour at a time when they don't match, so it's fast even for rare schedules.
+    def nextAfter(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 5 years covers every valid expression, including the 29th of February.
+        limit = candidate + timedelta(days=366*5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self.matchesDay(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate = candidate + timedelta(minutes=1)
+                continue
+            return candidate
+        raise Exception("cron expression ({}) never matches".format(self.expression))
+
+
+# _parseField returns the values of 1 cron field.
+def _parseField(text: str, name: str, low: int, high: int) -> set[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        step = 1
+        has_step = "/" in part
+        if has_step:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise Exception("invalid step ({}) in the {} field".format(step_text, name))
+            step = int(step_text)
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            if not start_text.isdigit() or not end_text.isdigit():
+                raise Exception("invalid range ({}) in the {} field".format(part, name))
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = int(part)
+            # "5/10" means from 5 to the max, every 10, and "5/1" from 5 to the max.
+            end = high if has_step else start
+        else:
+            raise Exception("invalid value ({}) in the {} field".format(part, name))
+
+        if start < low or end > high or start > end:
+            raise Exception("{} must be between {} and {}, got ({})".format(name, low, high, part))
+        values.update(range(start, end + 1, step))
+    return values
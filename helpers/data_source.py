@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import Iterator
+import csv
+import json
+import re
+
+# PLACEHOLDER_REGEX matches the {column} placeholders of the actions, and the {{ and }} escapes of a literal { and }.
+# The placeholders only exist in the templates with a data file, the other templates keep their { and } as they are.
+PLACEHOLDER_REGEX = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_ .-]*)\}")
+
+
+# iterRows streams the rows of a CSV file (with a header line) or a JSONL file (1 object per line),
+# so a file of any size can drive a template without being loaded into memory.
+def iterRows(filename: str) -> Iterator[dict[str, str]]:
+    extension = Path(filename).suffix.lower()
+    with open(filename, "r", encoding="utf8", newline="") as f:
+        if extension == ".csv":
+            for row in csv.DictReader(f):
+                yield row
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(f, start=1):
+                if line.strip() == "":
+                    continue
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise Exception("line {} of {} is not a JSON object".format(line_number, filename))
+                yield {key: "" if value is None else str(value) for key, value in row.items()}
+        else:
+            raise Exception("unsupported data file ({}), expected a .csv or a .jsonl file".format(filename))
+
+
+# placeholderColumns returns the columns used by the {column} placeholders of the text, in their order.
+def placeholderColumns(text: str) -> list[str]:
+    return [match.group(1) for match in PLACEHOLDER_REGEX.finditer(text) if match.group(1) is not None]
+
+
+# fillPlaceholders replaces the {column} placeholders of the text by the values of the row,
+# and the {{ and }} escapes by a literal { and }.
+def fillPlaceholders(text: str, row: dict[str, str]) -> str:
+    def replace(match: re.Match) -> str:
+        column = match.group(1)
+        if column is None:
+            return match.group(0)[0]
+        if column not in row:
+            raise Exception("column ({}) is not in the data file, got {}".format(column, list(row.keys())))
+        return row[column]
+    return PLACEHOLDER_REGEX.sub(replace, text)
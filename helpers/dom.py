@@ -0,0 +1,382 @@
+from html.parser import HTMLParser
+from typing import Callable, Iterator
+import re
+
+# A very small in-process DOM, just enough for the simulated browser (orm/simulated_driver.py)
+# to answer the lookups that the Driver does: parsing HTML fixtures, CSS selectors and visible text.
+
+# VOID_TAGS never have children, so they are closed right away.
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# HIDDEN_TAGS are never rendered.
+HIDDEN_TAGS = {"head", "script", "style", "template", "title", "noscript"}
+# BLOCK_TAGS start a new line in the visible text.
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "option",
+    "p", "pre", "section", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+
+
+# _fold removes the spaces and the case, like the fold of FIND_MATCH_SCRIPT.
+def _fold(text: str) -> str:
+    return re.sub(r"\s+", "", text.upper().lower().replace("\u03c2", "\u03c3"))
+
+
+class Node:
+    def __init__(self, tag: str, attributes: dict[str, str], parent: "Node | None" = None) -> None:
+        """
+        Node is an HTML element. The text is kept as plain strings in the children list.
+
+        :tag: str: the lower case tag name, "#document" for the root.
+        :attributes: dict[str, str]: the HTML attributes as written in the fixture.
+        """
+        self.tag: str = tag
+        self.attributes: dict[str, str] = attributes
+        self.parent: Node | None = parent
+        self.children: list[Node | str] = []
+        # The live state of the form elements, initiated from the attributes.
+        self.value: str = attributes.get("value", "")
+        self.selected: bool = "selected" in attributes
+        self.checked: bool = "checked" in attributes
+
+
+    # elementChildren returns the children that are elements, ignoring the text.
+    def elementChildren(self) -> list["Node"]:
+        return [child for child in self.children if isinstance(child, Node)]
+
+
+    # descendants iterates through all the elements under this node in the document order.
+    def descendants(self) -> Iterator["Node"]:
+        for child in self.elementChildren():
+            yield child
+            yield from child.descendants()
+
+
+    # textContent returns all the text under this node, hidden or not.
+    def textContent(self) -> str:
+        return "".join(child if isinstance(child, str) else child.textContent() for child in self.children)
+
+
+    def isHidden(self) -> bool:
+        if self.tag in HIDDEN_TAGS or "hidden" in self.attributes:
+            return True
+        if self.tag == "input" and self.attributes.get("type", "").lower() == "hidden":
+            return True
+        style = self.attributes.get("style", "").replace(" ", "").lower()
+        return "display:none" in style or "visibility:hidden" in style
+
+
+    # isDisplayed tells us if the element and all of its ancestors are rendered.
+    def isDisplayed(self) -> bool:
+        node: Node | None = self
+        while node is not None:
+            if node.isHidden():
+                return False
+            node = node.parent
+        return True
+
+
+    # visibleText mimics WebElement.text: the rendered text,
+    # with a new line around the block elements and the spaces collapsed.
+    def visibleText(self) -> str:
+        if not self.isDisplayed():
+            return ""
+
+        chunks: list[str] = []
+        def collect(node: Node) -> None:
+            if node.isHidden():
+                return
+            if node.tag in BLOCK_TAGS:
+                chunks.append("\n")
+            for child in node.children:
+                if isinstance(child, str):
+                    chunks.append(child)
+                else:
+                    collect(child)
+            if node.tag in BLOCK_TAGS:
+                chunks.append("\n")
+        collect(self)
+
+        lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(chunks).split("\n")]
+        return "\n".join(line for line in lines if line != "").replace("\xa0", " ")
+
+
+    # mayHaveText is the filter of FIND_MATCH_SCRIPT: the folded value must be a subsequence of all the folded text.
+    def mayHaveText(self, value: str) -> bool:
+        folded_value = _fold(value)
+        if folded_value == "":
+            return True
+        if not self.isDisplayed():
+            return False
+        text = iter(_fold(self.textContent()))
+        return all(character in text for character in folded_value)
+
+
+    def __repr__(self) -> str:
+        return "<{} {}>".format(self.tag, self.attributes)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.document: Node = Node(tag="#document", attributes={})
+        self.current: Node = self.document
+
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        node = Node(tag=tag, attributes={key: value if value is not None else "" for key, value in attrs}, parent=self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        node = Node(tag=tag, attributes={key: value if value is not None else "" for key, value in attrs}, parent=self.current)
+        self.current.children.append(node)
+
+
+    def handle_endtag(self, tag: str) -> None:
+        # Close up to the matching open tag, ignoring the stray end tags.
+        node: Node | None = self.current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+
+
+    def handle_data(self, data: str) -> None:
+        self.current.children.append(data)
+
+
+# parseHTML builds the DOM tree of the given HTML and returns the document node.
+def parseHTML(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+class SelectorError(Exception):
+    pass
+
+
+# UnsupportedSelectorError is a valid selector using a pseudo class that compileSelector doesn't implement,
+# like :hover or :has. The browser may still support it.
+class UnsupportedSelectorError(SelectorError):
+    pass
+
+
+# Matcher tells if an element matches a part of the selector.
+Matcher = Callable[[Node], bool]
+
+_IDENTIFIER = r"-?[_a-zA-Z\u00a0-\uffff][-_a-zA-Z0-9\u00a0-\uffff]*"
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+    |(?P<combinator>[>+~,])
+    |(?P<star>\*)
+    |(?P<tag>{identifier})
+    |\#(?P<id>-?[-_a-zA-Z0-9\u00a0-\uffff]+)
+    |\.(?P<class>{identifier})
+    |\[\s*(?P<attribute>{identifier})\s*(?:(?P<operator>[~|^$*]?=)\s*(?:"(?P<double>[^"]*)"|'(?P<single>[^']*)'|(?P<bare>[-_a-zA-Z0-9\u00a0-\uffff]+)))?\s*\]
+    |:(?P<pseudo>[-a-zA-Z]+)(?:\((?P<argument>[^()]*(?:\([^()]*\)[^()]*)*)\))?
+""".format(identifier=_IDENTIFIER), re.VERBOSE)
+
+
+def _nthMatcher(argument: str, position: Callable[[Node], int]) -> Matcher:
+    formula = argument.replace(" ", "").lower()
+    if formula == "odd":
+        a, b = 2, 1
+    elif formula == "even":
+        a, b = 2, 0
+    else:
+        match = re.fullmatch(r"([+-]?\d*)n([+-]\d+)?|([+-]?\d+)", formula)
+        if match is None:
+            raise SelectorError("invalid nth formula ({})".format(argument))
+        if match.group(3) is not None:
+            a, b = 0, int(match.group(3))
+        else:
+            a = {"": 1, "+": 1, "-": -1}.get(match.group(1), None)
+            if a is None:
+                a = int(match.group(1))
+            b = int(match.group(2) or 0)
+
+    def matcher(node: Node) -> bool:
+        index = position(node)
+        if a == 0:
+            return index == b
+        return (index - b) % a == 0 and (index - b) // a >= 0
+    return matcher
+
+
+def _siblings(node: Node) -> list[Node]:
+    if node.parent is None:
+        return [node]
+    return node.parent.elementChildren()
+
+
+def _attributeMatcher(name: str, operator: str | None, expected: str) -> Matcher:
+    def matcher(node: Node) -> bool:
+        if name not in node.attributes:
+            return False
+        actual = node.attributes[name]
+        match operator:
+            case None:
+                return True
+            case "=":
+                return actual == expected
+            case "~=":
+                return expected in actual.split()
+            case "|=":
+                return actual == expected or actual.startswith(expected + "-")
+            case "^=":
+                return expected != "" and actual.startswith(expected)
+            case "$=":
+                return expected != "" and actual.endswith(expected)
+            case "*=":
+                return expected != "" and expected in actual
+        return False
+    return matcher
+
+
+def _pseudoMatcher(name: str, argument: str | None) -> Matcher:
+    match name:
+        case "first-child":
+            return lambda node: _siblings(node)[0] is node
+        case "last-child":
+            return lambda node: _siblings(node)[-1] is node
+        case "only-child":
+            return lambda node: len(_siblings(node)) == 1
+        case "nth-child" if argument is not None:
+            return _nthMatcher(argument, lambda node: _siblings(node).index(node) + 1)
+        case "nth-last-child" if argument is not None:
+            return _nthMatcher(argument, lambda node: len(_siblings(node)) - _siblings(node).index(node))
+        case "nth-of-type" if argument is not None:
+            return _nthMatcher(argument, lambda node: [n for n in _siblings(node) if n.tag == node.tag].index(node) + 1)
+        case "first-of-type":
+            return lambda node: [n for n in _siblings(node) if n.tag == node.tag][0] is node
+        case "last-of-type":
+            return lambda node: [n for n in _siblings(node) if n.tag == node.tag][-1] is node
+        case "checked":
+            return lambda node: node.checked or node.selected
+        case "disabled":
+            return lambda node: "disabled" in node.attributes
+        case "enabled":
+            return lambda node: "disabled" not in node.attributes
+        case "not" if argument is not None:
+            excluded = compileSelector(argument)
+            return lambda node: not excluded(node)
+    raise UnsupportedSelectorError("unsupported pseudo class (:{})".format(name))
+
+
+# compileSelector turns a CSS selector into a function telling if an element matches it.
+# It supports the usual selectors copied from the browser's devtools:
+# tag, *, #id, .class, [attribute] with all the operators, the combinators (" ", >, +, ~), the "," list
+# and the structural pseudo classes (:nth-child, :first-child, :not, ...).
+def compileSelector(selector: str) -> Matcher:
+    # Each complex selector is a list of (combinator, compound matchers), from left to right.
+    complex_selectors: list[list[tuple[str, list[Matcher]]]] = [[]]
+    combinator = " "
+    compound: list[Matcher] | None = None
+
+    def closeCompound() -> None:
+        nonlocal compound
+        if compound is not None:
+            complex_selectors[-1].append((combinator, compound))
+            compound = None
+
+    position = 0
+    selector = selector.strip()
+    if selector == "":
+        raise SelectorError("empty selector")
+
+    while position < len(selector):
+        token = _TOKEN.match(selector, position)
+        if token is None:
+            raise SelectorError("invalid selector ({}) at position {}".format(selector, position))
+        position = token.end()
+
+        if token.group("space") is not None:
+            if compound is not None:
+                closeCompound()
+                combinator = " "
+            continue
+        if token.group("combinator") is not None:
+            # 2 combinators in a row, like "div > > p" or "div >, p".
+            if compound is None and combinator != " ":
+                raise SelectorError("invalid selector ({})".format(selector))
+            closeCompound()
+            if token.group("combinator") == ",":
+                if len(complex_selectors[-1]) == 0:
+                    raise SelectorError("invalid selector ({})".format(selector))
+                complex_selectors.append([])
+                combinator = " "
+            else:
+                combinator = token.group("combinator")
+            continue
+
+        if compound is None:
+            compound = []
+        if token.group("attribute") is not None:
+            expected = next((v for v in (token.group("double"), token.group("single"), token.group("bare")) if v is not None), "")
+            compound.append(_attributeMatcher(token.group("attribute"), token.group("operator"), expected))
+        elif token.group("pseudo") is not None:
+            compound.append(_pseudoMatcher(token.group("pseudo").lower(), token.group("argument")))
+        elif token.group("star") is not None:
+            compound.append(lambda node: True)
+        elif token.group("tag") is not None:
+            tag = token.group("tag").lower()
+            compound.append(lambda node, tag=tag: node.tag == tag)
+        elif token.group("id") is not None:
+            element_id = token.group("id")
+            compound.append(lambda node, element_id=element_id: node.attributes.get("id") == element_id)
+        else:
+            class_name = token.group("class")
+            compound.append(lambda node, class_name=class_name: class_name in node.attributes.get("class", "").split())
+    # A combinator at the end, like "div >".
+    if compound is None and combinator != " ":
+        raise SelectorError("invalid selector ({})".format(selector))
+    closeCompound()
+
+    if any(len(parts) == 0 for parts in complex_selectors):
+        raise SelectorError("invalid selector ({})".format(selector))
+
+    def matchCompound(node: Node, matchers: list[Matcher]) -> bool:
+        return node.tag != "#document" and all(matcher(node) for matcher in matchers)
+
+    # matchFrom checks the parts[:index+1] of the complex selector, right to left, starting at the node.
+    def matchFrom(node: Node, parts: list[tuple[str, list[Matcher]]], index: int) -> bool:
+        part_combinator, matchers = parts[index]
+        if not matchCompound(node, matchers):
+            return False
+        if index == 0:
+            return True
+
+        match part_combinator:
+            case " ":
+                ancestor = node.parent
+                while ancestor is not None:
+                    if matchFrom(ancestor, parts, index - 1):
+                        return True
+                    ancestor = ancestor.parent
+                return False
+            case ">":
+                return node.parent is not None and matchFrom(node.parent, parts, index - 1)
+            case "+":
+                siblings = _siblings(node)
+                position = siblings.index(node)
+                return position > 0 and matchFrom(siblings[position - 1], parts, index - 1)
+            case "~":
+                siblings = _siblings(node)
+                return any(matchFrom(sibling, parts, index - 1) for sibling in siblings[:siblings.index(node)])
+        return False
+
+    def matcher(node: Node) -> bool:
+        return any(matchFrom(node, parts, len(parts) - 1) for parts in complex_selectors)
+    return matcher
+
+
+# querySelectorAll returns the elements under the root matching the selector in the document order.
+# include is an optional filter, for example to skip the elements that are not on the page yet.
+def querySelectorAll(root: Node, selector: str, include: Callable[[Node], bool] | None = None) -> list[Node]:
+    matcher = compileSelector(selector)
+    return [node for node in root.descendants() if (include is None or include(node)) and matcher(node)]
@@ -0,0 +1,83 @@
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import threading
+import time
+
+# FixtureServer serves a local folder over HTTP, so the page load of a real browser can be measured
+# without depending on the network, e.g. to compare the load time with and without a ResourcePolicy
+# (see test_blocking_the_images_speeds_up_the_page_load in helpers/test_fixture_server.py):
+#
+#   with FixtureServer(folder="./fixtures", delay_by_extension={".png": 0.5, ".woff2": 0.5}) as server:
+#       driver.goto(server.url("page.html"))
+#       print(driver.last_load_timings, server.requests)
+
+
+class _FixtureRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, server_state: "FixtureServer", **kwargs) -> None:
+        self.server_state: FixtureServer = server_state
+        super().__init__(*args, **kwargs)
+
+
+    def do_GET(self) -> None:
+        self.server_state.recordRequest(self.path)
+        delay = self.server_state.delay_by_extension.get(Path(self.path.split("?")[0]).suffix.lower(), 0)
+        if delay > 0:
+            time.sleep(delay)
+        super().do_GET()
+
+
+    # Keep the console quiet, the requests are kept in FixtureServer.requests.
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class FixtureServer:
+    def __init__(self, folder: str, port: int = 0, delay_by_extension: dict[str, float] | None = None) -> None:
+        """
+        :folder: str: the folder to serve.
+        :port: int: the port to listen to, 0 picks a free one.
+        :delay_by_extension: dict[str, float]: the seconds to wait before answering each file type,
+        to make the heavy resources (images, fonts, ...) as slow as they are on the real sites.
+        """
+        self.folder: str = folder
+        self.delay_by_extension: dict[str, float] = {
+            extension.lower(): delay for extension, delay in (delay_by_extension or {}).items()
+        }
+        # requests are the paths requested so far, in order.
+        self.requests: list[str] = []
+        self.__lock = threading.Lock()
+
+        handler = partial(_FixtureRequestHandler, server_state=self, directory=folder)
+        self.__server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.port: int = self.__server.server_address[1]
+        self.__thread: threading.Thread | None = None
+
+
+    def recordRequest(self, path: str) -> None:
+        with self.__lock:
+            self.requests.append(path)
+
+
+    # url returns the URL of the file inside the served folder.
+    def url(self, path: str = "") -> str:
+        return "http://127.0.0.1:{}/{}".format(self.port, path.lstrip("/"))
+
+
+    def start(self) -> None:
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+
+
+    def stop(self) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
+    def __enter__(self) -> "FixtureServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.stop()
@@ -0,0 +1,162 @@
+from pathlib import Path
+import json
+import threading
+
+# HISTOGRAM_BUCKETS are the upper bounds (in seconds) of the latency histogram's buckets.
+# The last bucket takes everything slower than the last bound.
+HISTOGRAM_BUCKETS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30]
+
+
+class CallStats:
+    def __init__(self) -> None:
+        """CallStats is the latency histogram and the totals of 1 Driver method."""
+        self.count: int = 0
+        self.total_time: float = 0
+        self.min_time: float = 0
+        self.max_time: float = 0
+        self.total_commands: int = 0
+        self.total_wait_time: float = 0
+        self.failed: int = 0
+        # buckets[i] counts the calls taking at most HISTOGRAM_BUCKETS[i] seconds,
+        # the extra last bucket counts the slower calls.
+        self.buckets: list[int] = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+
+    def record(self, wall_time: float, commands: int, wait_time: float, failed: bool) -> None:
+        if self.count == 0 or wall_time < self.min_time:
+            self.min_time = wall_time
+        if wall_time > self.max_time:
+            self.max_time = wall_time
+        self.count += 1
+        self.total_time += wall_time
+        self.total_commands += commands
+        self.total_wait_time += wait_time
+        if failed:
+            self.failed += 1
+
+        index = 0
+        while index < len(HISTOGRAM_BUCKETS) and wall_time > HISTOGRAM_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+
+
+    # percentile returns the upper bound of the bucket containing the given percentile (0 to 100).
+    # It's an estimation, good enough to tell the slow calls from the fast ones.
+    def percentile(self, percent: float) -> float:
+        if self.count == 0:
+            return 0
+        target = self.count * percent / 100
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return HISTOGRAM_BUCKETS[index] if index < len(HISTOGRAM_BUCKETS) else self.max_time
+        return self.max_time
+
+
+    def summary(self) -> dict[str, any]:
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "total_time": self.total_time,
+            "mean_time": self.total_time / self.count if self.count > 0 else 0,
+            "min_time": self.min_time,
+            "max_time": self.max_time,
+            "p50_time": self.percentile(50),
+            "p95_time": self.percentile(95),
+            "total_commands": self.total_commands,
+            "mean_commands": self.total_commands / self.count if self.count > 0 else 0,
+            "total_wait_time": self.total_wait_time,
+            "histogram": {
+                ("<={}".format(HISTOGRAM_BUCKETS[i]) if i < len(HISTOGRAM_BUCKETS) else ">{}".format(HISTOGRAM_BUCKETS[-1])): bucket
+                for i, bucket in enumerate(self.buckets) if bucket > 0
+            },
+        }
+
+
+class StepStats:
+    def __init__(self) -> None:
+        """StepStats counts the runs, the retries and the failures of 1 template step."""
+        self.runs: int = 0
+        self.failed: int = 0
+        self.retries: int = 0
+
+
+    def summary(self) -> dict[str, any]:
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "retries": self.retries,
+            "retries_per_run": self.retries / self.runs if self.runs > 0 else 0,
+        }
+
+
+class DriverMetrics:
+    def __init__(self) -> None:
+        """
+        DriverMetrics keeps the latency of every Driver method in memory:
+        the wall time, the number of WebDriver commands and the time spent waiting.
+        It also keeps the retries of every template step, to find the unstable steps.
+        """
+        self.__lock = threading.Lock()
+        self.__stats: dict[str, CallStats] = {}
+        self.__steps: dict[str, StepStats] = {}
+
+
+    def record(self, method: str, wall_time: float, commands: int, wait_time: float, failed: bool = False) -> None:
+        with self.__lock:
+            if method not in self.__stats:
+                self.__stats[method] = CallStats()
+            self.__stats[method].record(wall_time=wall_time, commands=commands, wait_time=wait_time, failed=failed)
+
+
+    # recordRetry counts 1 retry of the step.
+    def recordRetry(self, step: str) -> None:
+        with self.__lock:
+            if step not in self.__steps:
+                self.__steps[step] = StepStats()
+            self.__steps[step].retries += 1
+
+
+    # recordStep counts 1 run of the step, including its retries.
+    def recordStep(self, step: str, failed: bool) -> None:
+        with self.__lock:
+            if step not in self.__steps:
+                self.__steps[step] = StepStats()
+            self.__steps[step].runs += 1
+            if failed:
+                self.__steps[step].failed += 1
+
+
+    # get returns the stats of 1 method, None if the method was never called.
+    def get(self, method: str) -> CallStats | None:
+        with self.__lock:
+            return self.__stats.get(method)
+
+
+    # stepSummary returns the stats of the steps that needed a retry, the most unstable first.
+    def stepSummary(self) -> dict[str, dict[str, any]]:
+        with self.__lock:
+            steps = sorted(
+                ((step, stats) for step, stats in self.__steps.items() if stats.retries > 0),
+                key=lambda item: item[1].retries, reverse=True)
+            return {step: stats.summary() for step, stats in steps}
+
+
+    # summary returns the stats of all the methods, ready to be dumped to JSON.
+    def summary(self) -> dict[str, dict[str, any]]:
+        with self.__lock:
+            return {method: stats.summary() for method, stats in self.__stats.items()}
+
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__stats = {}
+            self.__steps = {}
+
+
+    # dumpJSON writes the summary of the methods and the steps to the file, creating its folder if needed.
+    def dumpJSON(self, filename: str) -> None:
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        with open(filename, "w") as f:
+            json.dump({"methods": self.summary(), "unstable_steps": self.stepSummary()}, indent=4, fp=f)
@@ -0,0 +1,138 @@
+import base64
+import json
+from urllib.parse import urlsplit
+from urllib.request import getproxies
+
+# _BLOCKED_PROXY is where the blocked domains are sent to.
+# Nothing listens on the discard port, so the request fails right away instead of downloading anything.
+_BLOCKED_PROXY = "PROXY 127.0.0.1:9"
+
+# _PAC_PROXY_TYPES are the PAC results of the proxy URL schemes.
+_PAC_PROXY_TYPES = {
+    "http": "PROXY",
+    "https": "HTTPS",
+    "socks": "SOCKS5",
+    "socks5": "SOCKS5",
+    "socks5h": "SOCKS5",
+    "socks4": "SOCKS",
+}
+
+
+# _systemAutoConfigURL returns the proxy auto-config script of the Windows settings, "" when there's none.
+def _systemAutoConfigURL() -> str:
+    try:
+        import winreg
+    except ImportError:
+        return ""
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Internet Settings") as key:
+            return str(winreg.QueryValueEx(key, "AutoConfigURL")[0]).strip()
+    except OSError:
+        return ""
+
+
+# _pacProxy returns the PAC result of a proxy URL, e.g. "PROXY proxy.corp:8080" for http://proxy.corp:8080.
+def _pacProxy(proxy_url: str) -> str:
+    if "://" not in proxy_url:
+        proxy_url = "http://" + proxy_url
+    parts = urlsplit(proxy_url)
+    proxy_type = _PAC_PROXY_TYPES.get(parts.scheme.lower())
+    if proxy_type is None or not parts.hostname:
+        return ""
+    return "{} {}:{}".format(proxy_type, parts.hostname, parts.port or (443 if parts.scheme.lower() == "https" else 80))
+
+
+class ResourcePolicy:
+    def __init__(
+            self,
+            block_images: bool = False,
+            block_fonts: bool = False,
+            block_media: bool = False,
+            blocked_domains: list[str] | None = None,
+            proxies: dict[str, str] | None = None,
+            auto_config_url: str | None = None) -> None:
+        """
+        ResourcePolicy tells the browser which resources it shouldn't download.
+        Our templates only click and type, so the images, the web fonts, the media
+        and the third-party trackers are only slowing down the page load.
+
+        :blocked_domains: list[str]: the domains to block, including their sub domains.
+        :proxies: dict[str, str]: the proxies the browser goes through, as urllib.request.getproxies() returns them,
+        None reads them from the system.
+        :auto_config_url: str: the proxy auto-config script of the system, None reads it from the system.
+        """
+        self.block_images: bool = block_images
+        self.block_fonts: bool = block_fonts
+        self.block_media: bool = block_media
+        self.blocked_domains: list[str] = [domain.strip().lower() for domain in (blocked_domains or []) if domain.strip() != ""]
+        self.proxies: dict[str, str] = getproxies() if proxies is None else proxies
+        self.auto_config_url: str = _systemAutoConfigURL() if auto_config_url is None else auto_config_url
+
+
+    def __str__(self) -> str:
+        return "images: {}, fonts: {}, media: {}, domains: {}".format(
+            "blocked" if self.block_images else "allowed",
+            "blocked" if self.block_fonts else "allowed",
+            "blocked" if self.block_media else "allowed",
+            self.blocked_domains,
+        )
+
+
+    # preferences returns the Firefox preferences applying this policy.
+    def preferences(self) -> dict[str, any]:
+        preferences: dict[str, any] = {}
+        if self.block_images:
+            # 2 means never load the images.
+            preferences["permissions.default.image"] = 2
+        if self.block_fonts:
+            preferences["gfx.downloadable_fonts.enabled"] = False
+            preferences["browser.display.use_document_fonts"] = 0
+        if self.block_media:
+            # 5 means block the autoplay of all media, and don't preload anything.
+            preferences["media.autoplay.default"] = 5
+            preferences["media.preload.default"] = 0
+            preferences["media.preload.auto"] = 0
+        if len(self.blocked_domains) > 0 and self.auto_config_url != "":
+            # A PAC can't call the PAC of the system, so replacing it would bypass the corporate proxy.
+            print("The blocked domains {} are allowed, the system already has a proxy auto-config {}".format(
+                self.blocked_domains, self.auto_config_url))
+        elif len(self.blocked_domains) > 0:
+            # Firefox has no domain block list, so the blocked domains go through a proxy auto-config (PAC)
+            # sending them to a dead proxy, and the rest goes through the proxies of the system, if any.
+            preferences["network.proxy.type"] = 2
+            preferences["network.proxy.autoconfig_url"] = self.proxyAutoConfigURL()
+        return preferences
+
+
+    # proxyAutoConfigURL returns the PAC script blocking the blocked_domains, as a data URL.
+    # The other domains go through the proxies of the system, except the ones of its no_proxy list.
+    def proxyAutoConfigURL(self) -> str:
+        upstream: dict[str, str] = {}
+        for scheme in ["http", "https", "ftp"]:
+            proxy = _pacProxy(self.proxies.get(scheme, self.proxies.get("all", "")))
+            if proxy != "":
+                upstream[scheme] = proxy
+        # The no_proxy entries are "*", or the domains including their sub domains, e.g. ".corp", "*.corp" or "corp".
+        bypass = [host.strip().lower() for host in self.proxies.get("no", "").split(",") if host.strip() != ""]
+        bypass = [host if host == "*" else host.lstrip("*").lstrip(".") for host in bypass]
+        script = """
+function FindProxyForURL(url, host) {
+    var blocked = %s;
+    var upstream = %s;
+    var bypass = %s;
+    host = host.toLowerCase();
+    for (var i = 0; i < blocked.length; i++) {
+        if (host === blocked[i] || dnsDomainIs(host, "." + blocked[i])) {
+            return "%s";
+        }
+    }
+    for (var i = 0; i < bypass.length; i++) {
+        if (bypass[i] === "*" || host === bypass[i] || dnsDomainIs(host, "." + bypass[i])) {
+            return "DIRECT";
+        }
+    }
+    var scheme = url.substring(0, url.indexOf(":")).toLowerCase();
+    return upstream[scheme] || "DIRECT";
+}
+""" % (json.dumps(self.blocked_domains), json.dumps(upstream), json.dumps(bypass), _BLOCKED_PROXY)
+        return "data:application/x-ns-proxy-autoconfig;base64," + base64.b64encode(script.encode("utf8")).decode("ascii")
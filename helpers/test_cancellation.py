@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from helpers.cancellation import CancellationToken, Cancelled
+
+
+def test_cancelling_the_parent_cancels_its_children() -> None:
+    run = CancellationToken()
+    step = run.child(timeout=60)
+    run.cancel(reason="paused")
+    assert step.isCancelled()
+    assert step.why() == "paused"
+    # A child made after the cancellation is cancelled right away.
+    assert run.child().isCancelled()
+
+
+def test_cancelling_a_child_does_not_cancel_its_parent() -> None:
+    run = CancellationToken()
+    run.child().cancel()
+    assert not run.isCancelled()
+
+
+def test_a_child_keeps_the_closest_deadline() -> None:
+    run = CancellationToken(timeout=0.05)
+    step = run.child(timeout=60)
+    assert step.remaining() <= 0.05
+    assert CancellationToken().child(timeout=10).limit(30) <= 10
+    assert CancellationToken().limit(30) == 30
+
+
+def test_sleep_stops_as_soon_as_the_token_is_cancelled() -> None:
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel, kwargs={"reason": "paused"}).start()
+    start = time.perf_counter()
+    with pytest.raises(Cancelled, match="paused"):
+        token.sleep(10)
+    assert time.perf_counter() - start < 1
+
+
+def test_sleep_stops_at_the_deadline() -> None:
+    token = CancellationToken(timeout=0.05)
+    start = time.perf_counter()
+    with pytest.raises(Cancelled, match="timeout"):
+        token.sleep(10)
+    assert time.perf_counter() - start < 1
+
+
+def test_sleep_without_cancellation_sleeps_the_whole_duration() -> None:
+    token = CancellationToken()
+    start = time.perf_counter()
+    token.sleep(0.05)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_timed_out_only_on_its_own_timeout() -> None:
+    parent = CancellationToken()
+    child = parent.child(timeout=0.01)
+    time.sleep(0.02)
+    assert child.timedOut()
+
+    # Expired with its parent, or cancelled, is not a timeout of its own.
+    expired_parent = CancellationToken(timeout=0.01)
+    child = expired_parent.child(timeout=30)
+    time.sleep(0.02)
+    assert child.isCancelled() and not child.timedOut()
+
+    child = CancellationToken().child(timeout=30)
+    child.cancel(reason="paused")
+    assert not child.timedOut()
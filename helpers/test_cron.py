@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+
+from helpers.cron import CronExpression
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    ("*/15 * * * *", datetime(2024, 5, 6, 10, 7), datetime(2024, 5, 6, 10, 15)),
+    ("*/15 * * * *", datetime(2024, 5, 6, 10, 15), datetime(2024, 5, 6, 10, 30)),
+    ("0 9 * * 1-5", datetime(2024, 5, 10, 9, 0), datetime(2024, 5, 13, 9, 0)),
+    ("0 0 1 * *", datetime(2024, 12, 31, 23, 59), datetime(2025, 1, 1, 0, 0)),
+    ("0 12 29 2 *", datetime(2024, 3, 1), datetime(2028, 2, 29, 12, 0)),
+    ("5/20 * * * *", datetime(2024, 5, 6, 10, 26), datetime(2024, 5, 6, 10, 45)),
+    ("0 8 * * 7", datetime(2024, 5, 6), datetime(2024, 5, 12, 8, 0)),
+    ("0 8 * * 0", datetime(2024, 5, 6), datetime(2024, 5, 12, 8, 0)),
+])
+def test_next_after(expression: str, moment: datetime, expected: datetime) -> None:
+    assert CronExpression(expression).nextAfter(moment) == expected
+
+
+def test_day_of_month_or_day_of_week() -> None:
+    # Like cron, the 13th or any Friday.
+    cron = CronExpression("0 0 13 * 5")
+    assert cron.matchesDay(datetime(2024, 5, 13))  # Monday the 13th
+    assert cron.matchesDay(datetime(2024, 5, 10))  # Friday the 10th
+    assert not cron.matchesDay(datetime(2024, 5, 11))
+
+
+@pytest.mark.parametrize("expression", ["0 0 */1 * 5", "0 0 1-31 * 5"])
+def test_a_day_of_month_covering_every_day_is_not_a_restriction(expression: str) -> None:
+    # Like "0 0 * * 5", only the Fridays.
+    cron = CronExpression(expression)
+    assert cron.matchesDay(datetime(2024, 5, 10))
+    assert not cron.matchesDay(datetime(2024, 5, 13))
+
+
+@pytest.mark.parametrize("expression", ["0 0 13 * */1", "0 0 13 * 0-7"])
+def test_a_day_of_week_covering_every_day_is_not_a_restriction(expression: str) -> None:
+    # Like "0 0 13 * *", only the 13th.
+    cron = CronExpression(expression)
+    assert cron.matchesDay(datetime(2024, 5, 13))
+    assert not cron.matchesDay(datetime(2024, 5, 10))
+
+
+@pytest.mark.parametrize("expression, minutes", [
+    ("55/1 * * * *", {55, 56, 57, 58, 59}),
+    ("55/2 * * * *", {55, 57, 59}),
+    ("55 * * * *", {55}),
+])
+def test_a_start_with_a_step_runs_to_the_max(expression: str, minutes: set[int]) -> None:
+    assert CronExpression(expression).minutes == minutes
+
+
+def test_list_and_range() -> None:
+    cron = CronExpression("0,30 8-9 * * *")
+    assert cron.minutes == {0, 30}
+    assert cron.hours == {8, 9}
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+    "1-x * * * *",
+])
+def test_invalid_expression(expression: str) -> None:
+    with pytest.raises(Exception):
+        CronExpression(expression)
+
+
+def test_never_matching_expression() -> None:
+    with pytest.raises(Exception, match="never matches"):
+        CronExpression("0 0 31 2 *").nextAfter(datetime(2024, 1, 1))
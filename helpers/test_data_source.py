@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from helpers.data_source import fillPlaceholders, iterRows, placeholderColumns
+
+
+def test_iter_rows_of_a_csv_file(tmp_path: Path) -> None:
+    filename = tmp_path / "users.csv"
+    filename.write_text('user,password\nalice,"a,1"\nbob,b2\n', encoding="utf8")
+    assert list(iterRows(str(filename))) == [
+        {"user": "alice", "password": "a,1"},
+        {"user": "bob", "password": "b2"},
+    ]
+
+
+def test_iter_rows_of_a_jsonl_file(tmp_path: Path) -> None:
+    filename = tmp_path / "users.jsonl"
+    filename.write_text('{"user": "alice", "age": 30}\n\n{"user": "bob", "age": null}\n', encoding="utf8")
+    assert list(iterRows(str(filename))) == [
+        {"user": "alice", "age": "30"},
+        {"user": "bob", "age": ""},
+    ]
+
+
+def test_iter_rows_rejects_a_line_that_is_not_an_object(tmp_path: Path) -> None:
+    filename = tmp_path / "users.jsonl"
+    filename.write_text('{"user": "alice"}\n["bob"]\n', encoding="utf8")
+    with pytest.raises(Exception, match="line 2"):
+        list(iterRows(str(filename)))
+
+
+def test_iter_rows_rejects_an_unknown_extension(tmp_path: Path) -> None:
+    filename = tmp_path / "users.xlsx"
+    filename.write_text("", encoding="utf8")
+    with pytest.raises(Exception, match="unsupported data file"):
+        list(iterRows(str(filename)))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{user}", "alice"),
+    ("Hello {user}, you are {age}", "Hello alice, you are 30"),
+    ("{{user}}", "{user}"),
+    ("{{{user}}}", "{alice}"),
+    ('{"a": 1}', '{"a": 1}'),
+    ("{ user }", "{ user }"),
+    ("no placeholder", "no placeholder"),
+])
+def test_fill_placeholders(text: str, expected: str) -> None:
+    assert fillPlaceholders(text, row={"user": "alice", "age": "30"}) == expected
+
+
+def test_fill_placeholders_with_a_missing_column() -> None:
+    with pytest.raises(Exception, match="column \\(email\\) is not in the data file"):
+        fillPlaceholders("{email}", row={"user": "alice"})
+
+
+def test_placeholder_columns() -> None:
+    assert placeholderColumns("{user} and {first name} but not {{age}} nor {1}") == ["user", "first name"]
@@ -0,0 +1,122 @@
+import pytest
+
+from helpers.dom import (
+    SelectorError,
+    UnsupportedSelectorError,
+    compileSelector,
+    parseHTML,
+    querySelectorAll,
+)
+
+PAGE = parseHTML("""
+<div id="main" class="content wide">
+    <ul lang="en-US">
+        <li class="item first" data-id="1">One</li>
+        <li class="item" data-id="2" data-tags="red big">Two</li>
+        <li class="item last" data-id="30">Three</li>
+    </ul>
+    <p>intro</p>
+    <p class="note">note</p>
+    <span>after</span>
+    <form>
+        <input type="checkbox" name="agree" checked>
+        <input type="text" name="email" disabled>
+    </form>
+</div>
+""")
+
+
+def ids(selector: str) -> list[str]:
+    return [node.attributes.get("data-id", node.attributes.get("name", node.tag)) for node in querySelectorAll(PAGE, selector)]
+
+
+@pytest.mark.parametrize("selector, expected", [
+    ("li", ["1", "2", "30"]),
+    ("*[data-id]", ["1", "2", "30"]),
+    ("#main li.first", ["1"]),
+    (".item.last", ["30"]),
+    ("LI.item", ["1", "2", "30"]),
+    ("[data-id='2']", ["2"]),
+    ('[data-id="2"]', ["2"]),
+    ("[data-id=2]", ["2"]),
+    ("[data-tags~=big]", ["2"]),
+    ("[lang|=en]", ["ul"]),
+    ("[data-id^=3]", ["30"]),
+    ("[data-id$=0]", ["30"]),
+    ("[data-id*='0']", ["30"]),
+    ("[data-id^='']", []),
+    ("div > ul > li", ["1", "2", "30"]),
+    ("div > li", []),
+    ("li + li", ["2", "30"]),
+    ("ul ~ p", ["p", "p"]),
+    ("p + p.note", ["p"]),
+    ("li:first-child, span", ["1", "span"]),
+    ("li:last-child", ["30"]),
+    ("li:nth-child(2)", ["2"]),
+    ("li:nth-child(odd)", ["1", "30"]),
+    ("li:nth-child(2n+1)", ["1", "30"]),
+    ("li:nth-child(-n+2)", ["1", "2"]),
+    ("li:nth-last-child(1)", ["30"]),
+    ("p:nth-of-type(2)", ["p"]),
+    ("p:first-of-type", ["p"]),
+    ("li:not(.first)", ["2", "30"]),
+    ("li:not(:nth-child(2))", ["1", "30"]),
+    ("input:checked", ["agree"]),
+    ("input:disabled", ["email"]),
+    ("input:enabled", ["agree"]),
+])
+def test_query_selector_all(selector: str, expected: list[str]) -> None:
+    assert ids(selector) == expected
+
+
+@pytest.mark.parametrize("selector", [
+    "",
+    "div >",
+    "div > > p",
+    ", p",
+    "div,",
+    "li:nth-child(x)",
+    "[data-id=",
+    "#",
+])
+def test_invalid_selector(selector: str) -> None:
+    with pytest.raises(SelectorError):
+        compileSelector(selector)
+
+
+@pytest.mark.parametrize("selector", ["a:hover", "div:has(p)", "input:focus"])
+def test_unsupported_pseudo_class(selector: str) -> None:
+    with pytest.raises(UnsupportedSelectorError):
+        compileSelector(selector)
+
+
+def test_visible_text_skips_the_hidden_parts_and_collapses_the_spaces() -> None:
+    document = parseHTML("""
+        <div id="card">
+            <h1>  Title   here </h1>
+            <p>first<br>second<span style="display: none">hidden</span></p>
+            <script>var x = 1;</script>
+            <p hidden>never</p>
+        </div>
+        <div style="display:none"><p id="inside">inside a hidden parent</p></div>
+    """)
+    assert querySelectorAll(document, "#card")[0].visibleText() == "Title here\nfirst\nsecond"
+    assert querySelectorAll(document, "#inside")[0].visibleText() == ""
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Log in", True),
+    ("LOG IN", True),
+    ("Login", True),
+    ("Log out", False),
+    ("secret", True),
+    ("", True),
+])
+def test_may_have_text_never_rejects_a_match(value: str, expected: bool) -> None:
+    button = querySelectorAll(parseHTML('<button>Log <i style="display:none">secret</i> in</button>'), "button")[0]
+    assert button.mayHaveText(value) == expected
+
+
+def test_may_have_text_rejects_the_hidden_elements() -> None:
+    button = querySelectorAll(parseHTML('<button style="display:none">Log in</button>'), "button")[0]
+    assert not button.mayHaveText("Log in")
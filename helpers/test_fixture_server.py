@@ -0,0 +1,68 @@
+import shutil
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from helpers.fixture_server import FixtureServer
+from helpers.resource_policy import ResourcePolicy
+
+PAGE = """<html><body>
+<button id="start">Start</button>
+<img src="a.png"><img src="b.png"><img src="c.png">
+</body></html>"""
+IMAGE_DELAY = 0.5
+
+
+@pytest.fixture
+def folder(tmp_path: Path) -> Path:
+    (tmp_path / "page.html").write_text(PAGE)
+    for name in ["a.png", "b.png", "c.png"]:
+        (tmp_path / name).write_bytes(b"\x89PNG")
+    return tmp_path
+
+
+def fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.read()
+
+
+def test_serves_the_folder_and_records_the_requests(folder: Path):
+    with FixtureServer(folder=str(folder)) as server:
+        assert fetch(server.url("page.html")).decode() == PAGE
+        assert fetch(server.url("/a.png?v=1")) == b"\x89PNG"
+    assert server.requests == ["/page.html", "/a.png?v=1"]
+
+
+def test_delays_the_files_by_extension(folder: Path):
+    with FixtureServer(folder=str(folder), delay_by_extension={".PNG": 0.3}) as server:
+        start = time.perf_counter()
+        fetch(server.url("page.html"))
+        page_time = time.perf_counter() - start
+        start = time.perf_counter()
+        fetch(server.url("a.png"))
+        image_time = time.perf_counter() - start
+    assert page_time < 0.2
+    assert image_time >= 0.3
+
+
+@pytest.mark.skipif(shutil.which("firefox") is None or shutil.which("geckodriver") is None,
+    reason="the load time is measured with a real Firefox")
+def test_blocking_the_images_speeds_up_the_page_load(folder: Path):
+    from orm.driver import Driver
+
+    load_times: dict[bool, float] = {}
+    for block_images in [False, True]:
+        driver = Driver(dry_run=False, high_light_mode=False, headless=True,
+            resource_policy=ResourcePolicy(block_images=block_images, proxies={}, auto_config_url=""))
+        try:
+            with FixtureServer(folder=str(folder), delay_by_extension={".png": IMAGE_DELAY}) as server:
+                start = time.perf_counter()
+                driver.goto(server.url("page.html"))
+                load_times[block_images] = time.perf_counter() - start
+            print("block images: {}, load time: {:.3f}s, requests: {}".format(block_images, load_times[block_images], server.requests))
+            assert any(path.endswith(".png") for path in server.requests) != block_images
+        finally:
+            driver.close()
+    assert load_times[True] + IMAGE_DELAY / 2 < load_times[False]
@@ -0,0 +1,72 @@
+import base64
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from helpers.resource_policy import ResourcePolicy
+
+BLOCKED = "PROXY 127.0.0.1:9"
+
+# PAC_RUNNER evaluates the PAC script with the dnsDomainIs helper Firefox gives it.
+PAC_RUNNER = """
+var dnsDomainIs = function (host, domain) { return host.length >= domain.length && host.substring(host.length - domain.length) === domain; };
+eval(process.argv[1]);
+console.log(JSON.stringify(JSON.parse(process.argv[2]).map(function (url) {
+    return FindProxyForURL(url, new URL(url).hostname);
+})));
+"""
+
+
+def pacScript(policy: ResourcePolicy) -> str:
+    url = policy.preferences()["network.proxy.autoconfig_url"]
+    return base64.b64decode(url.split(",", 1)[1]).decode("utf8")
+
+
+def findProxies(policy: ResourcePolicy, urls: list[str]) -> list[str]:
+    if shutil.which("node") is None:
+        pytest.skip("node is needed to run the PAC script")
+    result = subprocess.run(["node", "-e", PAC_RUNNER, pacScript(policy), json.dumps(urls)],
+        capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def test_blocked_domains_are_sent_to_a_dead_proxy_and_the_rest_goes_direct():
+    policy = ResourcePolicy(blocked_domains=["Tracker.com"], proxies={}, auto_config_url="")
+    assert findProxies(policy, [
+        "https://tracker.com/a.js",
+        "https://cdn.tracker.com/a.js",
+        "https://nottracker.com/",
+        "https://example.com/",
+    ]) == [BLOCKED, BLOCKED, "DIRECT", "DIRECT"]
+
+
+def test_the_other_domains_go_through_the_system_proxies():
+    policy = ResourcePolicy(
+        blocked_domains=["tracker.com"],
+        proxies={"http": "http://proxy.corp:8080", "https": "http://proxy.corp:8443", "no": "localhost,*.intra.corp,.lan"},
+        auto_config_url="")
+    assert findProxies(policy, [
+        "https://tracker.com/a.js",
+        "http://example.com/",
+        "https://example.com/",
+        "https://wiki.intra.corp/",
+        "http://printer.lan/",
+        "http://localhost:8000/",
+    ]) == [BLOCKED, "PROXY proxy.corp:8080", "PROXY proxy.corp:8443", "DIRECT", "DIRECT", "DIRECT"]
+
+
+def test_socks_and_all_proxies_are_chained():
+    policy = ResourcePolicy(blocked_domains=["tracker.com"], proxies={"all": "socks5://127.0.0.1:1080"}, auto_config_url="")
+    assert findProxies(policy, ["http://example.com/", "https://example.com/"]) == ["SOCKS5 127.0.0.1:1080", "SOCKS5 127.0.0.1:1080"]
+
+
+def test_no_pac_replaces_the_proxy_auto_config_of_the_system(capsys):
+    policy = ResourcePolicy(block_images=True, blocked_domains=["tracker.com"], proxies={}, auto_config_url="http://wpad.corp/proxy.pac")
+    assert policy.preferences() == {"permissions.default.image": 2}
+    assert "http://wpad.corp/proxy.pac" in capsys.readouterr().out
+
+
+def test_no_pac_without_blocked_domains():
+    assert "network.proxy.type" not in ResourcePolicy(block_fonts=True, proxies={}, auto_config_url="").preferences()
@@ -0,0 +1,86 @@
+from typing import Callable
+
+from helpers.ui_bus import UIUpdateBus
+
+
+class FakeWidget:
+    """FakeWidget keeps the callback of after, so the test runs the frames itself, without Tk."""
+    def __init__(self) -> None:
+        self.scheduled: Callable[[], None] | None = None
+
+
+    def after(self, _: int, callback: Callable[[], None]) -> None:
+        self.scheduled = callback
+
+
+    def nextFrame(self) -> None:
+        callback, self.scheduled = self.scheduled, None
+        callback()
+
+
+def test_only_the_latest_update_of_a_key_is_applied() -> None:
+    widget = FakeWidget()
+    bus = UIUpdateBus(widget=widget)
+    applied: list[str] = []
+    for i in range(100):
+        bus.post("progress", lambda i=i: applied.append("progress {}".format(i)))
+    bus.post("label", lambda: applied.append("label"))
+    widget.nextFrame()
+    assert applied == ["progress 99", "label"]
+
+
+def test_updates_are_applied_in_the_order_of_their_latest_post() -> None:
+    widget = FakeWidget()
+    bus = UIUpdateBus(widget=widget)
+    applied: list[str] = []
+    bus.post("a", lambda: applied.append("a1"))
+    bus.post("b", lambda: applied.append("b"))
+    bus.post("a", lambda: applied.append("a2"))
+    widget.nextFrame()
+    assert applied == ["b", "a2"]
+
+
+def test_a_failing_update_does_not_stop_the_bus() -> None:
+    widget = FakeWidget()
+    bus = UIUpdateBus(widget=widget)
+    applied: list[str] = []
+
+    def fail() -> None:
+        raise NameError("name 'e' is not defined")
+
+    bus.post("broken", fail)
+    bus.post("label", lambda: applied.append("label"))
+    widget.nextFrame()
+    assert applied == ["label"]
+
+    # The next frame is still scheduled and applies the later updates.
+    assert widget.scheduled is not None
+    bus.post("label", lambda: applied.append("label again"))
+    widget.nextFrame()
+    assert applied == ["label", "label again"]
+
+
+def test_a_failing_update_is_reported_to_its_channel() -> None:
+    widget = FakeWidget()
+    bus = UIUpdateBus(widget=widget)
+    failures: list[str] = []
+    channel = bus.channel(onFailed=lambda e: failures.append(str(e)))
+
+    def fail() -> None:
+        raise ValueError("bad value")
+
+    channel.post("label", fail)
+    widget.nextFrame()
+    assert failures == ["bad value"]
+
+
+def test_the_channels_of_a_bus_do_not_share_their_keys() -> None:
+    widget = FakeWidget()
+    bus = UIUpdateBus(widget=widget)
+    applied: list[str] = []
+    first, second = bus.channel(), bus.channel()
+    first.post("label", lambda: applied.append("first"))
+    second.post("label", lambda: applied.append("second"))
+    first.post("label", lambda: applied.append("first again"))
+    widget.nextFrame()
+    assert applied == ["second", "first again"]
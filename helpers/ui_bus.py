@@ -0,0 +1,97 @@
+from typing import Callable, Hashable
+import threading
+import tkinter as tk
+
+from configs.ui_configs import UI_FRAME_RATE
+
+class UIUpdateBus:
+    def __init__(self, widget: tk.Misc, frame_rate: int = UI_FRAME_RATE) -> None:
+        """
+        UIUpdateBus is how the worker threads change the UI.
+        Tk is not thread-safe, so the workers post their updates here,
+        and the Tk main loop applies them frame_rate times per second.
+
+        Each update has a key, like the widget it changes.
+        If a key is posted again before the next frame, only the latest update of that key is applied,
+        so a fast loop doesn't flood the UI with progress and label changes that nobody can see.
+        The updates are applied in the order of their latest post,
+        so when 2 keys change the same widget, the last posted one wins, like it would without the bus.
+
+        The app has 1 bus for all its templates, each of them posts through its own channel, see channel.
+        The frames keep going while nothing is posted: arming the next frame from post would call Tk
+        from the worker threads, which Tk doesn't allow.
+
+        It must be created on the UI thread.
+        """
+        self.widget: tk.Misc = widget
+        self.interval: int = max(1, int(1000 / frame_rate))
+        self.__lock = threading.Lock()
+        self.__pending: dict[Hashable, tuple[Callable[[], None], Callable[[Exception], None] | None]] = {}
+        self.widget.after(self.interval, self.__drain)
+
+
+    # post queues the update, replacing the pending update of the same key.
+    # onFailed is called on the UI thread if the update raises, e.g. to show the error on the template's result label.
+    # It's safe to call from any thread.
+    def post(self, key: Hashable, update: Callable[[], None], onFailed: Callable[[Exception], None] | None = None) -> None:
+        with self.__lock:
+            # Re-insert the key so the update is applied in the order of its latest post.
+            self.__pending.pop(key, None)
+            self.__pending[key] = (update, onFailed)
+
+
+    # channel returns the poster of 1 owner, e.g. 1 template, whose keys never collide with the keys of the other owners.
+    def channel(self, onFailed: Callable[[Exception], None] | None = None) -> "UIChannel":
+        return UIChannel(bus=self, onFailed=onFailed)
+
+
+    # __drain applies the pending updates, on the UI thread.
+    # A failing update is reported to its onFailed, so it can't stop the updates after it nor the next frames.
+    def __drain(self) -> None:
+        try:
+            with self.__lock:
+                pending = self.__pending
+                self.__pending = {}
+
+            for key, (update, onFailed) in pending.items():
+                try:
+                    update()
+                except tk.TclError as e:
+                    # The widget could be destroyed in the meantime, e.g. a removed row.
+                    print("skip the UI update ({}) due to: {}".format(key, e))
+                except Exception as e:
+                    print("failed to apply the UI update ({}) due to: {}".format(key, e))
+                    self.__reportFailure(onFailed=onFailed, error=e)
+        finally:
+            try:
+                self.widget.after(self.interval, self.__drain)
+            except tk.TclError:
+                # The widget is destroyed, so is the UI of the bus.
+                pass
+
+
+    def __reportFailure(self, onFailed: Callable[[Exception], None] | None, error: Exception) -> None:
+        if onFailed is None:
+            return
+        try:
+            onFailed(error)
+        except Exception as e:
+            print("failed to report the failed UI update due to: {}".format(e))
+
+
+class UIChannel:
+    def __init__(self, bus: UIUpdateBus, onFailed: Callable[[Exception], None] | None = None) -> None:
+        """
+        UIChannel posts the updates of 1 owner to the shared UIUpdateBus.
+        Its keys are only compared with its own keys, so 2 templates can both post a RESULT_LABEL_KEY.
+        It has no timer of its own, so it costs nothing until something is posted.
+
+        :onFailed: is called on the UI thread with the error of a failed update.
+        """
+        self.bus: UIUpdateBus = bus
+        self.onFailed: Callable[[Exception], None] | None = onFailed
+
+
+    # post queues the update, see UIUpdateBus.post. It's safe to call from any thread.
+    def post(self, key: Hashable, update: Callable[[], None]) -> None:
+        self.bus.post(key=(id(self), key), update=update, onFailed=self.onFailed)
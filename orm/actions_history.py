@@ -1,10 +1,17 @@
 from enum import StrEnum
 from orm.driver import Driver
+from orm.pacing import Pacing
+from orm.retry_policy import RetryPolicy
+from typing import Callable
+import copy
 import time
 # from uuid import uuid4, UUID
 
 from configs.ui_configs import DEFAULT_FAILED_RESULT
+from configs.automation_configs import DRY_RUN_ACTION_DURATION
 from helpers.action import sleepWithLog
+from helpers.cancellation import CancellationToken, Cancelled
+from helpers.data_source import fillPlaceholders
 
 class ActionType(StrEnum):
     OLD_TEXT_INPUT = "Text input"
@@ -36,7 +43,16 @@ class Action:
             skippable: bool = False,
             # Normally, we don't need to provide failed_reason,
             # I need to initiate it so Python can translate from dict to class. 
-            failed_reason: str = DEFAULT_FAILED_RESULT) -> None:
+            failed_reason: str = DEFAULT_FAILED_RESULT,
+            # pacing overrides the template's pacing after this action, see orm.pacing.Pacing.
+            # Like skippable, it's assigned manually in the json file.
+            pacing: dict | None = None,
+            # restart_point marks the step where a failed repeat restarts from, with ResumeMode.RESTART_POINT.
+            # Like skippable, it's assigned manually in the json file.
+            restart_point: bool = False,
+            # retry is how many times the action is tried before it fails, see orm.retry_policy.RetryPolicy.
+            # Like skippable, it's assigned manually in the json file.
+            retry: dict | None = None) -> None:
         # This __id will be used for differentiating rows.
         # The History tab's remove button performs removal by value.
         # So in case if there are 2 actions with identical values,
@@ -55,6 +71,9 @@ class Action:
         self.value: str = value
         self.failed_reason: str = failed_reason
         self.skippable: bool = skippable
+        self.pacing: Pacing | None = Pacing.fromDict(pacing)
+        self.restart_point: bool = restart_point
+        self.retry: RetryPolicy | None = RetryPolicy.fromDict(retry)
 
     
     def __str__(self) -> str:
@@ -129,60 +148,32 @@ class Action:
     # executeAction performs the automation action on the browser based on the action content.
     # It's expected for this action to take a long time to execute,
     # so remember to use thread to call this function.
-    def executeAction(self, driver: Driver) -> None:
+    # The token stops the action's sleep and waits as soon as it's cancelled, raising Cancelled.
+    # The action is retried following its retry policy, onRetry is called before each retry
+    # with the retry number and the error of the previous attempt.
+    # It returns the number of retries.
+    def executeAction(
+            self,
+            driver: Driver,
+            token: CancellationToken | None = None,
+            onRetry: Callable[[int, Exception], None] | None = None) -> int:
         if driver.dry_run:
-            time.sleep(0.5)
+            if token is None:
+                time.sleep(DRY_RUN_ACTION_DURATION)
+            else:
+                token.sleep(DRY_RUN_ACTION_DURATION)
 
+        retries = 0
         try:
-            match self.action_type:
-                case ActionType.TEXT_INPUT:
-                    css_selector = self.css
-                    value = self.value
-                    
-                    if css_selector == "" or value == "":
-                        raise Exception("css_selector and value are expected for the Text Input action")
-                    else:
-                        driver.textInput(selector=css_selector, value=value)
-                case ActionType.CLICK_BY_NAME:
-                    # raise Exception("forced fail")
-                    if self.name == "":
-                        raise Exception("name is expected for the Click by Name action")
-                    else:
-                        driver.clickByName(name=self.name)
-                case ActionType.CLICK_BY_SELECTOR:
-                    css_selector = self.css
-                    
-                    if css_selector == "":
-                        raise Exception("css_selector is expected for the Click by CSS action")
-                    else:
-                        driver.clickByCSS(selector=css_selector)
-                case ActionType.CLICK_BY_VALUE:
-                    css_selector = self.css
-                    html_attribute = self.html_attribute
-                    value = self.value
-                    
-                    if css_selector == "" or value == "":
-                        raise Exception("css_selector and value are expected for the Click by Value action")
-                    else:
-                        if html_attribute != "":
-                            driver.clickByAttribute(selector=css_selector, html_attribute=html_attribute, value=value)
-                        else:
-                            driver.clickByValue(selector=css_selector, value=value)
-                case ActionType.SELECT_DROPDOWN:
-                    css_selector = self.css
-                    value = self.value
-                    
-                    if css_selector == "" or value == "":
-                        raise Exception("css_selector and value are expected for the Select Dropdown action")
-                    else:
-                        driver.select(selector=css_selector, value=value)
-                case ActionType.SWITCH_TAB:
-                    if not self.value.isdigit():
-                        raise Exception("value for switching tab must be a number")
-                    driver.switchTab(tab_index=int(self.value))
-                case ActionType.SLEEP:
-                    sleepWithLog(duration=float(self.value))
+            with driver.cancellable(token):
+                retries = self.__executeWithRetry(driver=driver, token=token, onRetry=onRetry)
         except Exception as e:
+            # The Driver wraps the errors of its waits, so a cancelled wait can look like any other error.
+            # A step that only ran out of its own time failed like any other step, so a skippable one is skipped,
+            # but a pause or the end of the run stops the run.
+            if token is not None and token.isCancelled() and not (self.skippable and token.timedOut()):
+                self.failed_reason = "cancelled: {}".format(token.why())
+                raise Cancelled(token.why()) from e
             self.failed_reason = "{}".format(e)
             if self.skippable:
                 print("Got this error but skippable so ignore: {}".format(e))
@@ -195,6 +186,104 @@ class Action:
         
         # If the action reaches to the end without any problem, then mark it as successful.
         self.failed_reason = ""
+        return retries
+
+
+    # __executeWithRetry runs the action until it succeeds or runs out of attempts, and returns the number of retries.
+    # The error of the last attempt is raised.
+    def __executeWithRetry(
+            self,
+            driver: Driver,
+            token: CancellationToken | None,
+            onRetry: Callable[[int, Exception], None] | None) -> int:
+        policy = self.retry or RetryPolicy()
+        retry = 0
+        while True:
+            try:
+                self.__execute(driver=driver, token=token)
+                return retry
+            except Exception as e:
+                if retry+1 >= policy.attempts or (token is not None and token.isCancelled()):
+                    raise e
+                retry += 1
+                print("retry {}/{} of {} in {}s due to: {}".format(retry, policy.attempts-1, self.action_type, policy.delay(retry), e))
+                if onRetry is not None:
+                    onRetry(retry, e)
+
+            if token is None:
+                time.sleep(policy.delay(retry))
+            else:
+                token.sleep(policy.delay(retry))
+            if policy.refresh:
+                # The laggy page may never finish loading, refresh it and try again.
+                try:
+                    driver.refresh()
+                except Exception as e:
+                    if token is not None:
+                        token.raiseIfCancelled()
+                    print("failed to refresh before the retry due to: {}".format(e))
+
+
+    # __execute runs the action once.
+    def __execute(self, driver: Driver, token: CancellationToken | None) -> None:
+        match self.action_type:
+            case ActionType.TEXT_INPUT:
+                css_selector = self.css
+                value = self.value
+                
+                if css_selector == "" or value == "":
+                    raise Exception("css_selector and value are expected for the Text Input action")
+                else:
+                    driver.textInput(selector=css_selector, value=value)
+            case ActionType.CLICK_BY_NAME:
+                # raise Exception("forced fail")
+                if self.name == "":
+                    raise Exception("name is expected for the Click by Name action")
+                else:
+                    driver.clickByName(name=self.name)
+            case ActionType.CLICK_BY_SELECTOR:
+                css_selector = self.css
+                
+                if css_selector == "":
+                    raise Exception("css_selector is expected for the Click by CSS action")
+                else:
+                    driver.clickByCSS(selector=css_selector)
+            case ActionType.CLICK_BY_VALUE:
+                css_selector = self.css
+                html_attribute = self.html_attribute
+                value = self.value
+                
+                if css_selector == "" or value == "":
+                    raise Exception("css_selector and value are expected for the Click by Value action")
+                else:
+                    if html_attribute != "":
+                        driver.clickByAttribute(selector=css_selector, html_attribute=html_attribute, value=value)
+                    else:
+                        driver.clickByValue(selector=css_selector, value=value)
+            case ActionType.SELECT_DROPDOWN:
+                css_selector = self.css
+                value = self.value
+                
+                if css_selector == "" or value == "":
+                    raise Exception("css_selector and value are expected for the Select Dropdown action")
+                else:
+                    driver.select(selector=css_selector, value=value)
+            case ActionType.SWITCH_TAB:
+                if not self.value.isdigit():
+                    raise Exception("value for switching tab must be a number")
+                driver.switchTab(tab_index=int(self.value))
+            case ActionType.SLEEP:
+                sleepWithLog(duration=float(self.value), token=token)
+
+
+    # withRow returns a copy of the action with the {column} placeholders filled by the row of a data file.
+    def withRow(self, row: dict[str, str]) -> "Action":
+        action = copy.copy(self)
+        action.name = fillPlaceholders(self.name, row)
+        action.css = fillPlaceholders(self.css, row)
+        action.html_attribute = fillPlaceholders(self.html_attribute, row)
+        action.value = fillPlaceholders(self.value, row)
+        return action
 
 
     # encode is for the UI's save feature, dumping data from class to JSON file.
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, asdict
+from pathlib import Path
+import hashlib
+import json
+
+from configs.automation_configs import CHECKPOINT_FOLDER
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Checkpoint is where an unfinished template run resumes from.
+    It's keyed by the template's ID in its store (TemplateEntry.id), not by its name,
+    so 2 templates with the same name never resume from each other's progress.
+
+    :repeat: int: the number of repeats that are done (or failed) already.
+    :step: int: the index of the step that the next repeat starts from.
+    :step_count: int: the number of steps of the template when the checkpoint was taken.
+    :plan_hash: str: the hash of the steps when the checkpoint was taken, see ExecutionPlan.plan_hash,
+    the checkpoint is ignored if the template has changed since then.
+    """
+    repeat: int
+    step: int
+    step_count: int
+    plan_hash: str = ""
+
+
+    # filename returns the checkpoint file of the template.
+    # The ID can be a path (the JSON store) so it's hashed into a file name.
+    @staticmethod
+    def filename(template_key: str) -> str:
+        return CHECKPOINT_FOLDER + "/" + hashlib.sha1(template_key.encode("utf8")).hexdigest() + ".json"
+
+
+    # load returns the checkpoint of the template, None if there's no usable one.
+    @staticmethod
+    def load(template_key: str) -> "Checkpoint | None":
+        try:
+            with open(Checkpoint.filename(template_key), "r") as f:
+                return Checkpoint(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print("ignore the broken checkpoint of {} due to: {}".format(template_key, e))
+            return None
+
+
+    def save(self, template_key: str) -> None:
+        Path(CHECKPOINT_FOLDER).mkdir(parents=True, exist_ok=True)
+        with open(Checkpoint.filename(template_key), "w") as f:
+            json.dump(asdict(self), indent=4, fp=f)
+
+
+    @staticmethod
+    def clear(template_key: str) -> None:
+        Path(Checkpoint.filename(template_key)).unlink(missing_ok=True)
+
+
+    # move moves the checkpoints along with their templates, when the IDs of the templates change
+    # (the JSON store's IDs change when the templates are renamed or moved), as {old ID: new ID}.
+    # All the checkpoints are read before any is written, so a template can take the old ID of another one.
+    @staticmethod
+    def move(keys: dict[str, str]) -> None:
+        checkpoints = {new_key: Checkpoint.load(old_key) for old_key, new_key in keys.items() if old_key != new_key}
+        for old_key, new_key in keys.items():
+            if old_key != new_key:
+                Checkpoint.clear(old_key)
+        for new_key, checkpoint in checkpoints.items():
+            if checkpoint is not None:
+                checkpoint.save(new_key)
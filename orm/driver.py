@@ -1,36 +1,217 @@
 from configs.automation_configs import (
     SLEEP_TIME_AFTER_LOAD,
+    PAGE_LOAD_STRATEGY,
+    PAGE_LOAD_CONDITIONS,
+    PAGE_LOAD_TIMEOUT,
+    NETWORK_IDLE_TIME,
+    PageLoadStrategy,
+    LoadCondition,
     ELEMENT_LOADING_TIMEOUT,
+    ELEMENT_POLL_INTERVAL,
+    ELEMENT_WAIT_STRATEGY,
+    WaitStrategy,
 
     HIGHLIGHT_ELEMENT_DURATION,
+    IN_BROWSER_LOOKUP,
+    HEADLESS,
+    FAST_START,
+    FAST_START_PREFERENCES,
+    BLOCK_IMAGES,
+    BLOCK_FONTS,
+    BLOCK_MEDIA,
+    BLOCKED_DOMAINS,
+    BROWSER_WAIT_SLICE,
+)
+from helpers.cancellation import CancellationToken, Cancelled
+from helpers.metrics import DriverMetrics
+from helpers.resource_policy import ResourcePolicy
+from helpers.browser_scripts import (
+    FIND_MATCH_SCRIPT,
+    WAIT_FOR_SELECTOR_SCRIPT,
+    READY_STATE_SCRIPT,
+    NETWORK_IDLE_SCRIPT,
+    HIGHLIGHT_SCRIPT,
+    PREFLIGHT_SCRIPT,
 )
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support.select import Select
 from selenium.webdriver.remote.webelement import WebElement
-from typing import List
+from typing import Any, Callable, Iterator, List
+from contextlib import contextmanager
+import functools
+import math
 import time
 
+# READY_STATE_OF_STRATEGY is the document.readyState reached when driver.get() returns for each strategy.
+READY_STATE_OF_STRATEGY: dict[PageLoadStrategy, str] = {
+    PageLoadStrategy.NORMAL: "complete",
+    PageLoadStrategy.EAGER: "interactive",
+    PageLoadStrategy.NONE: "",
+}
+READY_STATE_RANKS: dict[str, int] = {"": 0, "interactive": 1, "complete": 2}
+
 class Driver:
-    def __init__(self, dry_run: bool, high_light_mode: bool) -> None:
+    def __init__(
+            self,
+            dry_run: bool,
+            high_light_mode: bool,
+            in_browser_lookup: bool = IN_BROWSER_LOOKUP,
+            wait_strategy: WaitStrategy = ELEMENT_WAIT_STRATEGY,
+            element_loading_timeout: float = ELEMENT_LOADING_TIMEOUT,
+            poll_interval: float = ELEMENT_POLL_INTERVAL,
+            page_load_strategy: PageLoadStrategy = PAGE_LOAD_STRATEGY,
+            load_conditions: List[LoadCondition] = PAGE_LOAD_CONDITIONS,
+            page_load_timeout: float = PAGE_LOAD_TIMEOUT,
+            headless: bool = HEADLESS,
+            fast_start: bool = FAST_START,
+            resource_policy: ResourcePolicy | None = None,
+            web_driver: Any = None) -> None:
+        """
+        :resource_policy: the resources the browser shouldn't download,
+        the BLOCK_* settings of configs/automation_configs.py by default.
+        :web_driver: an already started WebDriver to use instead of starting Firefox,
+        like the orm.simulated_driver.SimulatedWebDriver for the offline benchmark.
+        """
         self.high_light_mode=high_light_mode
+        # metrics keeps the wall time, the WebDriver commands and the wait time of every public method.
+        self.metrics: DriverMetrics = DriverMetrics()
+        # command_count and wait_time are the running totals of this Driver, used by __measure.
+        self.command_count: int = 0
+        self.wait_time: float = 0
+        # __window_handles caches the tabs, so switchTab doesn't have to ask the browser for them every time.
+        # None means unknown, it'll be fetched on the next use.
+        self.__window_handles: List[str] | None = None
+        self.headless=headless
+        self.fast_start=fast_start
+        if resource_policy is None:
+            resource_policy = ResourcePolicy(
+                block_images=BLOCK_IMAGES,
+                block_fonts=BLOCK_FONTS,
+                block_media=BLOCK_MEDIA,
+                blocked_domains=BLOCKED_DOMAINS)
+        self.resource_policy: ResourcePolicy = resource_policy
+        # startup_time is how long it took to start the browser, in seconds.
+        # It's used to compare the startup configurations.
+        self.startup_time: float = 0
+        # page_load_strategy and load_conditions are the default way goto waits for the page.
+        # Both can be overridden per navigation.
+        self.page_load_strategy=page_load_strategy
+        self.load_conditions=load_conditions
+        self.page_load_timeout=page_load_timeout
+        # last_load_timings keeps how long each step of the last goto took, in seconds.
+        self.last_load_timings: dict[str, float] = {}
+        # wait_strategy, element_loading_timeout and poll_interval decide how the Driver waits for an element.
+        self.wait_strategy=wait_strategy
+        self.element_loading_timeout=element_loading_timeout
+        self.poll_interval=poll_interval
+        # in_browser_lookup resolves the Click by Value/Attribute matching inside the browser
+        # with one script call instead of reading every candidate from python.
+        self.in_browser_lookup=in_browser_lookup
+        # cancellation stops the waits of the running step, see cancellable.
+        self.cancellation: CancellationToken | None = None
 
         if dry_run:
             self.dry_run=True
             self.high_light_mode=False
             print("Initiate dry browser...")
             return
-        print("Initiating Firefox browser. Please wait...")
         self.dry_run=False
-        self.driver = webdriver.Firefox()
+        start = time.perf_counter()
+        if web_driver is not None:
+            print("Using the given browser ({})...".format(type(web_driver).__name__))
+            self.driver = web_driver
+        else:
+            print("Initiating Firefox browser. Please wait...")
+            self.driver = webdriver.Firefox(options=self.__browserOptions())
+        self.__installCommandCounter()
+        # The waits are async scripts, give them a bit more time than their own timeout
+        # so the script itself reports the timeout instead of the browser.
+        self.driver.set_script_timeout(max(self.element_loading_timeout, self.page_load_timeout) + 1)
+        self.startup_time = time.perf_counter() - start
+        print("Browser is ready after {:.3f}s (headless: {}, fast start: {}, page load strategy: {}, resources: {})".format(
+            self.startup_time, self.headless, self.fast_start, self.page_load_strategy, self.resource_policy))
+
+
+    # __installCommandCounter counts every WebDriver command sent to the browser.
+    # All the commands, including the WebElement ones, go through the WebDriver's execute.
+    def __installCommandCounter(self) -> None:
+        execute = self.driver.execute
+
+        def countingExecute(*args, **kwargs):
+            self.command_count += 1
+            return execute(*args, **kwargs)
+        self.driver.execute = countingExecute
+
+
+    # __browserOptions builds the Firefox options from the Driver's startup configuration.
+    def __browserOptions(self) -> webdriver.FirefoxOptions:
+        options = webdriver.FirefoxOptions()
+        options.page_load_strategy = self.page_load_strategy
+        if self.headless:
+            options.add_argument("-headless")
+        if self.fast_start:
+            for key, value in FAST_START_PREFERENCES.items():
+                options.set_preference(key, value)
+        for key, value in self.resource_policy.preferences().items():
+            options.set_preference(key, value)
+        return options
+
+
+    # cancellable makes the waits of the Driver stop as soon as the token is cancelled or expired,
+    # until the end of the with block.
+    @contextmanager
+    def cancellable(self, token: CancellationToken | None) -> Iterator[None]:
+        previous = self.cancellation
+        self.cancellation = token
+        try:
+            yield
+        finally:
+            self.cancellation = previous
+
+
+    # __sleep is time.sleep, interrupted by the cancellation.
+    def __sleep(self, duration: float) -> None:
+        if self.cancellation is None:
+            time.sleep(duration)
+        else:
+            self.cancellation.sleep(duration)
+
+
+    # __timeout caps the timeout by the cancellation's deadline.
+    def __timeout(self, timeout: float) -> float:
+        if self.cancellation is None:
+            return timeout
+        return self.cancellation.limit(timeout)
+
+
+    # __waitInBrowser runs an async waiting script, whose last argument is its timeout in milliseconds.
+    # The browser can't be interrupted from here, so with a cancellation the script is run in slices
+    # of BROWSER_WAIT_SLICE, checking the cancellation between 2 slices.
+    # It returns the script's result, False on timeout.
+    def __waitInBrowser(self, script: str, timeout: float, *args) -> Any:
+        if self.cancellation is None:
+            return self.driver.execute_async_script(script, *args, int(timeout*1000))
+
+        deadline = time.perf_counter() + self.__timeout(timeout)
+        while True:
+            self.cancellation.raiseIfCancelled()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            # Rounded up, so the last slice is never a 0 ms wait that returns right away and spins until the deadline.
+            result = self.driver.execute_async_script(script, *args, math.ceil(min(remaining, BROWSER_WAIT_SLICE)*1000))
+            if result:
+                return result
 
 
     # __check_dry_run is the wrapper that aborts the action
     # if the Driver is in the dry_run mode.
     def __check_dry_run(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             self: Driver = args[0]
             if self.dry_run:
@@ -41,18 +222,210 @@ class Driver:
         return wrapper
 
 
+    # __measure records the wall time, the number of WebDriver commands
+    # and the time spent waiting of every call to the Driver's metrics.
+    # The nested calls are included, e.g. clickByCSS includes its getElementByCSS.
+    def __measure(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self: Driver = args[0]
+            commands_before = self.command_count
+            wait_time_before = self.wait_time
+            start = time.perf_counter()
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self.metrics.record(
+                    method=func.__name__,
+                    wall_time=time.perf_counter() - start,
+                    commands=self.command_count - commands_before,
+                    wait_time=self.wait_time - wait_time_before,
+                    failed=failed)
+        return wrapper
+
+
+    @__measure
     @__check_dry_run
-    def goto(self, link: str):
-        # goto redirect the browser to the given link.
+    def goto(
+            self,
+            link: str,
+            page_load_strategy: PageLoadStrategy | None = None,
+            load_conditions: List[LoadCondition] | None = None,
+            sentinel_selector: str = ""):
+        """
+        goto redirect the browser to the given link and waits until the page is ready.
+
+        :page_load_strategy: overrides the Driver's page_load_strategy for this navigation.
+        :load_conditions: overrides the Driver's load_conditions for this navigation.
+        :sentinel_selector: the selector that LoadCondition.SENTINEL waits for.
+        """
+        if page_load_strategy is None:
+            page_load_strategy = self.page_load_strategy
+        if load_conditions is None:
+            load_conditions = self.load_conditions
+
+        timings: dict[str, float] = {}
+        start = time.perf_counter()
+
+        step_start = time.perf_counter()
         self.driver.get(link)
-        time.sleep(SLEEP_TIME_AFTER_LOAD)
+        timings["navigation"] = time.perf_counter() - step_start
+
+        # The browser's page load strategy is fixed when the browser starts,
+        # so a stricter strategy for this navigation is done by waiting for the ready state.
+        target_ready_state = READY_STATE_OF_STRATEGY[page_load_strategy]
+        if LoadCondition.READY_STATE in load_conditions:
+            target_ready_state = "complete"
+        if READY_STATE_RANKS[target_ready_state] > READY_STATE_RANKS[READY_STATE_OF_STRATEGY[self.page_load_strategy]]:
+            step_start = time.perf_counter()
+            self.__waitForReadyState(target=target_ready_state)
+            timings[LoadCondition.READY_STATE] = time.perf_counter() - step_start
+
+        if LoadCondition.SENTINEL in load_conditions and sentinel_selector != "":
+            step_start = time.perf_counter()
+            self.__waitFor(
+                selector=sentinel_selector,
+                find=lambda x: x.find_element(By.CSS_SELECTOR, sentinel_selector),
+                message="timeout waiting for the sentinel: {}".format(sentinel_selector))
+            timings[LoadCondition.SENTINEL] = time.perf_counter() - step_start
+
+        if LoadCondition.NETWORK_IDLE in load_conditions:
+            step_start = time.perf_counter()
+            if not self.__waitInBrowser(NETWORK_IDLE_SCRIPT, self.page_load_timeout, int(NETWORK_IDLE_TIME*1000)):
+                print("network is still busy after {}s, continue anyway".format(self.page_load_timeout))
+            timings[LoadCondition.NETWORK_IDLE] = time.perf_counter() - step_start
+
+        if LoadCondition.FIXED_SLEEP in load_conditions:
+            step_start = time.perf_counter()
+            self.__sleep(SLEEP_TIME_AFTER_LOAD)
+            timings[LoadCondition.FIXED_SLEEP] = time.perf_counter() - step_start
+
+        timings["total"] = time.perf_counter() - start
+        self.last_load_timings = timings
+        # The sentinel is waited by __waitFor, which counts its wait time already.
+        self.wait_time += sum(timings[condition] for condition in LoadCondition if condition in timings and condition != LoadCondition.SENTINEL)
+        print("loaded {} in {:.3f}s: {}".format(link, timings["total"], timings))
+
+
+    # __waitForReadyState waits until document.readyState reaches the target state.
+    # With the "none" strategy, the script can land on the previous page while it's unloading,
+    # so the script is retried until the new page answers or the page_load_timeout is over.
+    def __waitForReadyState(self, target: str) -> None:
+        deadline = time.perf_counter() + self.__timeout(self.page_load_timeout)
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutException("page is not {} after {}s".format(target, self.page_load_timeout))
+            try:
+                if self.__waitInBrowser(READY_STATE_SCRIPT, remaining, target):
+                    return
+            except TimeoutException:
+                raise
+            except Exception as e:
+                if self.cancellation is not None:
+                    self.cancellation.raiseIfCancelled()
+                print("retry waiting for ready state due to: ({})".format(e))
+                self.__sleep(self.poll_interval)
+
+
+    # __waitFor waits until find returns something truthy and returns that result.
+    # With the OBSERVER strategy, the browser tells us the moment the selector matches an element,
+    # so we don't lose up to a poll interval for every lookup.
+    # If the observer script can't run on the page, it falls back to polling every poll_interval.
+    def __waitFor(self, selector: str, find: Callable[[webdriver.Firefox], Any], message: str) -> Any:
+        start = time.perf_counter()
+        try:
+            return self.__waitForElement(selector=selector, find=find, message=message)
+        finally:
+            self.wait_time += time.perf_counter() - start
+
+
+    # The observer and the polling share 1 deadline, the polling only gets what the observer left.
+    def __waitForElement(self, selector: str, find: Callable[[webdriver.Firefox], Any], message: str) -> Any:
+        deadline = time.perf_counter() + self.__timeout(self.element_loading_timeout)
+        if self.wait_strategy == WaitStrategy.OBSERVER:
+            try:
+                appeared = self.__waitInBrowser(WAIT_FOR_SELECTOR_SCRIPT, self.element_loading_timeout, selector)
+            except Cancelled:
+                raise
+            except Exception as e:
+                print("observer wait is not available, fallback to polling: ({})".format(e))
+            else:
+                if not appeared:
+                    raise TimeoutException(message)
+
+                # The element can be gone between the 2 calls, poll for the rest of the case.
+                try:
+                    result = find(self.driver)
+                    if result:
+                        return result
+                except NoSuchElementException:
+                    pass
+
+        if self.cancellation is None:
+            # WebDriverWait still tries once when there's no time left.
+            remaining = max(deadline - time.perf_counter(), 0)
+            return WebDriverWait(driver=self.driver, timeout=remaining, poll_frequency=self.poll_interval).until(find, message=message)
+
+        # Same as WebDriverWait, but the sleep between 2 polls is interrupted by the cancellation.
+        while True:
+            try:
+                result = find(self.driver)
+                if result:
+                    return result
+            except NoSuchElementException:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self.cancellation.raiseIfCancelled()
+                raise TimeoutException(message)
+            self.__sleep(min(self.poll_interval, remaining))
+
+
+    # refresh reloads the current page, and waits for it like goto does.
+    @__measure
+    @__check_dry_run
+    def refresh(self) -> None:
+        self.driver.refresh()
+        if LoadCondition.READY_STATE in self.load_conditions and READY_STATE_OF_STRATEGY[self.page_load_strategy] != "complete":
+            start = time.perf_counter()
+            try:
+                self.__waitForReadyState(target="complete")
+            finally:
+                self.wait_time += time.perf_counter() - start
+
+
+    # waitForSelector waits until the selector matches an element, without touching the element.
+    @__measure
+    @__check_dry_run
+    def waitForSelector(self, selector: str) -> None:
+        self.__waitFor(
+            selector=selector,
+            find=lambda x: x.find_elements(By.CSS_SELECTOR, selector),
+            message="timeout waiting for the selector: {}".format(selector))
+
+
+    # preflight checks all the selectors on the current page at once, without waiting for any of them.
+    # It returns 1 {selector, count, visible, error} per selector, see PREFLIGHT_SCRIPT.
+    @__measure
+    @__check_dry_run
+    def preflight(self, selectors: List[str]) -> List[dict]:
+        return self.driver.execute_script(PREFLIGHT_SCRIPT, selectors)
 
 
+    @__measure
     @__check_dry_run
     def getElementByName(self, name: str) -> WebElement:
-        # Ikariam is very laggy, so if it's timeout, let's refresh once and try again.
+        # Ikariam is very laggy, the action's RetryPolicy can refresh the page and try again.
         try:
-            elem = WebDriverWait(driver=self.driver, timeout=ELEMENT_LOADING_TIMEOUT).until(lambda x: x.find_element(By.NAME, name), message="timeout finding input for name: " + name)
+            elem = self.__waitFor(
+                selector='[name="{}"]'.format(name.replace("\\", "\\\\").replace('"', '\\"')),
+                find=lambda x: x.find_element(By.NAME, name),
+                message="timeout finding input for name: " + name)
             self.highLightElements(elements=[elem])
         except TimeoutException as timeoutEx:
             print("timeoutEx getElementByName: ({})".format(timeoutEx.msg))
@@ -64,6 +437,7 @@ class Driver:
         return elem
     
 
+    @__measure
     @__check_dry_run
     def clickByName(self, name: str) -> None:
         print("executing click by name")
@@ -73,11 +447,15 @@ class Driver:
             raise Exception("failed to click element by name ({}) due to: {}".format(name, e))
         
 
+    @__measure
     @__check_dry_run
     def getElementByCSS(self, selector: str) -> WebElement:
-        # Ikariam is very laggy, so if it's timeout, let's refresh once and try again.
+        # Ikariam is very laggy, the action's RetryPolicy can refresh the page and try again.
         try:
-            elem = WebDriverWait(driver=self.driver, timeout=ELEMENT_LOADING_TIMEOUT).until(lambda x: x.find_element(By.CSS_SELECTOR, selector), message="timeout finding the selector for: {}".format(selector))
+            elem = self.__waitFor(
+                selector=selector,
+                find=lambda x: x.find_element(By.CSS_SELECTOR, selector),
+                message="timeout finding the selector for: {}".format(selector))
             self.highLightElements(elements=[elem])
         except TimeoutException as timeoutEx:
             print("timeoutEx getElementByName: ({})".format(timeoutEx.msg))
@@ -89,6 +467,7 @@ class Driver:
         return elem
 
 
+    @__measure
     @__check_dry_run
     def clickByCSS(self, selector: str) -> None:
         print("executing click by selector")
@@ -98,17 +477,24 @@ class Driver:
             raise Exception("failed to click element by css ({}) due to: {}".format(selector, e))
 
 
+    @__measure
     @__check_dry_run
     def getElementByValue(self, selector: str, value: str) -> WebElement:
+        if self.in_browser_lookup:
+            return self.__findMatchInBrowser(selector=selector, html_attribute="", value=value)
+
         try:
-            elements = WebDriverWait(driver=self.driver, timeout=ELEMENT_LOADING_TIMEOUT).until(lambda x: x.find_elements(by=By.CSS_SELECTOR, value=selector), message="timeout finding the selector for: {}".format(selector))
+            elements = self.__waitFor(
+                selector=selector,
+                find=lambda x: x.find_elements(by=By.CSS_SELECTOR, value=selector),
+                message="timeout finding the selector for: {}".format(selector))
             self.highLightElements(elements=elements)
         except TimeoutException as timeoutEx:
             print("timeoutEx getElementByValue: ({})".format(timeoutEx.msg))
             raise TimeoutException("not found elements list by selector ({})".format(selector))
         except Exception as e:
             print("funny exception getElementByValue: ({})".format(e))
-            raise Exception("failed to list element by selector ({}): {}".format(selector))
+            raise Exception("failed to list element by selector ({})".format(selector))
         
         for e in elements:
             print(e.text)
@@ -118,6 +504,7 @@ class Driver:
         raise Exception("selector ({}) - value ({}) not found".format(selector, value))
 
 
+    @__measure
     @__check_dry_run
     def clickByValue(self, selector: str, value: str):
         print("executing click by value")
@@ -127,30 +514,84 @@ class Driver:
             raise Exception("failed to click element by value ({})-({}) due to: {}".format(selector, value, e))
 
     
+    # isAlive tells us if the browser still answers.
+    # A crashed or closed browser needs to be replaced by a new one.
+    # It asks for the window handles, not the current one, which fails when a template closed its current tab
+    # although the browser is fine.
+    def isAlive(self) -> bool:
+        if self.dry_run:
+            return True
+
+        try:
+            self.driver.window_handles
+        except Exception:
+            return False
+        return True
+
+
+    # countTabs asks the browser for the number of tabs and refreshes the tab cache.
+    @__measure
     def countTabs(self) -> int:
         if self.dry_run:
             return 0
 
-        return len(self.driver.window_handles)
+        return len(self.__windowHandles(refresh=True))
+
+
+    # __windowHandles returns the cached window handles, fetching them if they're unknown or refresh is True.
+    def __windowHandles(self, refresh: bool = False) -> List[str]:
+        if refresh or self.__window_handles is None:
+            self.__window_handles = self.driver.window_handles
+        return self.__window_handles
 
 
+    # invalidateTabs forgets the cached tabs, for when something else may open or close a tab.
+    def invalidateTabs(self) -> None:
+        self.__window_handles = None
+
+
+    # switchTab switches to the tab at tab_index.
+    # The tabs are cached, so switching costs 1 command.
+    # The switch is always sent, the page (or the user) can change the current tab without the Driver knowing.
+    @__measure
     @__check_dry_run
     def switchTab(self, tab_index: int):
         print("switching tab")
         try:
-            current_tab_counts = self.countTabs()
-            if tab_index >= current_tab_counts:
-                raise Exception("tab index must be less than {}".format(current_tab_counts)) 
-            
-            self.driver.switch_to.window(self.driver.window_handles[tab_index])
+            handles = self.__windowHandles()
+            if tab_index >= len(handles):
+                # The tab could be opened by a click since the last time we looked.
+                handles = self.__windowHandles(refresh=True)
+                if tab_index >= len(handles):
+                    raise Exception("tab index must be less than {}".format(len(handles)))
+
+            handle = handles[tab_index]
+            try:
+                self.driver.switch_to.window(handle)
+            except Exception as e:
+                # The cached tab may be closed already, look at the tabs again and retry once.
+                print("retry switching tab with fresh tabs due to: ({})".format(e))
+                self.invalidateTabs()
+                handles = self.__windowHandles(refresh=True)
+                if tab_index >= len(handles):
+                    raise Exception("tab index must be less than {}".format(len(handles)))
+                self.driver.switch_to.window(handles[tab_index])
         except Exception as e:
+            self.invalidateTabs()
             raise Exception("failed to switch tab to index {} due to: {}".format(tab_index, e))
 
 
+    @__measure
     @__check_dry_run
     def getByAttribute(self, selector: str, html_attribute: str, value: str) -> WebElement:
+        if self.in_browser_lookup:
+            return self.__findMatchInBrowser(selector=selector, html_attribute=html_attribute, value=value)
+
         try:
-            elements = WebDriverWait(driver=self.driver, timeout=ELEMENT_LOADING_TIMEOUT).until(lambda x: x.find_elements(by=By.CSS_SELECTOR, value=selector), message="timeout finding the selector for: {}".format(selector))
+            elements = self.__waitFor(
+                selector=selector,
+                find=lambda x: x.find_elements(by=By.CSS_SELECTOR, value=selector),
+                message="timeout finding the selector for: {}".format(selector))
             self.highLightElements(elements=elements)
         except TimeoutException as timeoutEx:
             print("timeoutEx getByAttribute: ({})".format(timeoutEx.msg))
@@ -180,6 +621,46 @@ class Driver:
         raise Exception("selector ({}) - attribute ({}) - value ({}) not found".format(selector, html_attribute, value))
     
 
+    # __findMatchInBrowser is the in-browser version of getElementByValue (html_attribute is empty)
+    # and getByAttribute (html_attribute is provided).
+    # The matching is done by FIND_MATCH_SCRIPT, so it costs 1 round trip per poll
+    # instead of 1 round trip per candidate element.
+    # The visible text is still read with WebElement.text, but only for the few elements whose text can be the value.
+    def __findMatchInBrowser(self, selector: str, html_attribute: str, value: str) -> WebElement:
+        # Keep polling until the selector matches at least 1 element,
+        # the same way find_elements is waited for.
+        def findMatch(x: webdriver.Firefox) -> dict | None:
+            result = x.execute_script(FIND_MATCH_SCRIPT, selector, html_attribute, value)
+            if result["count"] == 0:
+                return None
+            return result
+
+        try:
+            result: dict = self.__waitFor(selector=selector, find=findMatch, message="timeout finding the selector for: {}".format(selector))
+        except TimeoutException as timeoutEx:
+            print("timeoutEx findMatchInBrowser: ({})".format(timeoutEx.msg))
+            raise TimeoutException("not found elements list by selector ({})".format(selector))
+        except Exception as e:
+            print("funny exception findMatchInBrowser: ({})".format(e))
+            raise Exception("failed to list element by selector ({})".format(selector))
+
+        if self.high_light_mode:
+            self.highLightElements(elements=self.driver.find_elements(by=By.CSS_SELECTOR, value=selector))
+
+        element: WebElement | None = result["element"]
+        if html_attribute == "":
+            # The first candidate with the exact text in the document order, like the python loop.
+            element = next((candidate for candidate in result["candidates"] if candidate.text == value), None)
+        if element is None:
+            if html_attribute == "":
+                raise Exception("selector ({}) - value ({}) not found".format(selector, value))
+            raise Exception("selector ({}) - attribute ({}) - value ({}) not found".format(selector, html_attribute, value))
+
+        print("got {} match out of {} elements".format(result["kind"], result["count"]))
+        return element
+
+
+    @__measure
     @__check_dry_run
     def clickByAttribute(self, selector: str, html_attribute: str, value: str) -> None:
         print("executing click by attribute")
@@ -190,6 +671,7 @@ class Driver:
             raise Exception("failed to click element by attribute ({}) due to: {}".format(selector, e))
 
 
+    @__measure
     @__check_dry_run
     def textInput(self, selector: str, value: str) -> None:
         print("typing by selector")
@@ -200,6 +682,7 @@ class Driver:
             raise Exception("failed to text input to by selector ({}) due to: {}".format(selector, e))
 
 
+    @__measure
     @__check_dry_run
     def select(self, selector: str, value: str) -> None:
         print("executing select dropdown")
@@ -215,8 +698,11 @@ class Driver:
             select_element.select_by_value(value=value)
 
     
+    @__measure
     @__check_dry_run
     def executeScript(self, script: str):
+        # The script can open or close tabs (window.open, window.close), so the tab cache can't be trusted anymore.
+        self.invalidateTabs()
         self.driver.execute_script(script=script)
 
 
@@ -226,20 +712,12 @@ class Driver:
         self.driver.quit()
 
 
+    # highLightElements outlines the elements for HIGHLIGHT_ELEMENT_DURATION seconds.
+    # The outline is removed by a timer in the browser, so the action continues right away.
+    @__measure
     @__check_dry_run
     def highLightElements(self, elements: List[WebElement]):
-        if not self.high_light_mode:
+        if not self.high_light_mode or len(elements) == 0:
             return
-        
-        def moveToView(element: WebElement):
-            self.driver.execute_script("arguments[0].scrollIntoView();", element)
 
-        def applyStyle(element: WebElement, style: str):
-            self.driver.execute_script("arguments[0].setAttribute('style', arguments[1]);", element, style)
-        
-        for element in elements:
-            original_style = element.get_attribute('style')
-            moveToView(element=element)
-            applyStyle(element=element, style="outline:dashed;outline-offset:4px;")
-            time.sleep(HIGHLIGHT_ELEMENT_DURATION)
-            applyStyle(element=element, style=original_style)
+        self.driver.execute_script(HIGHLIGHT_SCRIPT, elements, int(HIGHLIGHT_ELEMENT_DURATION*1000))
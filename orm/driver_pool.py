@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+import threading
+import weakref
+
+from orm.driver import Driver
+
+class DriverPool:
+    def __init__(self, size: int, dry_run: bool, high_light_mode: bool, **driver_options: Any) -> None:
+        """
+        DriverPool owns up to `size` browsers and leases 1 browser to each running Template,
+        so 2 templates running at the same time don't drive the same window.
+        If all the browsers are busy, the next lease waits until one is released.
+        A lease with an owner gets the browser of the owner's last lease back, while it's alive,
+        so the preflight and the replay of a template check the page its last run left.
+
+        :size: int: the maximum number of browsers running at the same time.
+        :driver_options: the rest of the Driver's arguments, applied to every browser of the pool.
+        """
+        if size < 1:
+            raise Exception("the pool needs at least 1 browser, got {}".format(size))
+
+        self.size: int = size
+        self.dry_run: bool = dry_run
+        self.high_light_mode: bool = high_light_mode
+        self.driver_options: dict[str, Any] = driver_options
+
+        self.__condition = threading.Condition()
+        # __idle contains the browsers waiting for their next lease.
+        self.__idle: list[Driver] = []
+        # __drivers contains every browser that is alive, leased or not.
+        self.__drivers: list[Driver] = []
+        # __starting counts the browsers that are being started, they already take a slot of the pool.
+        self.__starting: int = 0
+        self.__closed: bool = False
+        # __last_drivers keeps the browser of the last lease of each owner, see lease.
+        self.__last_drivers: weakref.WeakKeyDictionary[object, Driver] = weakref.WeakKeyDictionary()
+
+        # Start the first browser right away, like how the app used to do,
+        # so the first run doesn't have to wait for Firefox to start.
+        self.release(self.acquire())
+
+
+    # __newDriver starts a new browser and links it to its first (empty) tab.
+    def __newDriver(self) -> Driver:
+        driver = Driver(dry_run=self.dry_run, high_light_mode=self.high_light_mode, **self.driver_options)
+        driver.switchTab(0)
+        return driver
+
+
+    # acquire takes an idle browser, or starts a new one if the pool is not full yet.
+    # If every browser is busy, acquire blocks until one of them is released.
+    # The idle browsers can crash while waiting, so each one is checked before it's handed out.
+    # With an owner, acquire waits for the browser of the owner's last lease if it's still alive.
+    def acquire(self, owner: object | None = None) -> Driver:
+        while True:
+            driver = self.__take(owner=owner)
+            if driver is None:
+                break
+            if driver.isAlive():
+                self.__remember(owner=owner, driver=driver)
+                return driver
+            print("idle browser is not responding, replacing it...")
+            self.__discard(driver)
+
+        # Starting Firefox takes seconds, so don't hold the lock while doing it.
+        try:
+            driver = self.__newDriver()
+        except Exception:
+            with self.__condition:
+                self.__starting -= 1
+                self.__condition.notify()
+            raise
+
+        with self.__condition:
+            self.__starting -= 1
+            self.__drivers.append(driver)
+        self.__remember(owner=owner, driver=driver)
+        return driver
+
+
+    # __take takes an idle browser, or returns None after taking a slot for a new one.
+    def __take(self, owner: object | None) -> Driver | None:
+        with self.__condition:
+            while True:
+                if self.__closed:
+                    raise Exception("the browser pool is closed")
+                preferred = self.__last_drivers.get(owner) if owner is not None else None
+                if preferred is not None and preferred in self.__drivers:
+                    if preferred in self.__idle:
+                        self.__idle.remove(preferred)
+                        return preferred
+                elif len(self.__idle) > 0:
+                    return self.__idle.pop()
+                elif len(self.__drivers) + self.__starting < self.size:
+                    self.__starting += 1
+                    return None
+                self.__condition.wait()
+
+
+    def __remember(self, owner: object | None, driver: Driver) -> None:
+        if owner is None:
+            return
+        with self.__condition:
+            self.__last_drivers[owner] = driver
+
+
+    # __discard closes a crashed browser and frees its slot for a new one.
+    def __discard(self, driver: Driver) -> None:
+        try:
+            driver.close()
+        except Exception as e:
+            print("failed to close the crashed browser: ({})".format(e))
+
+        with self.__condition:
+            if driver in self.__drivers:
+                self.__drivers.remove(driver)
+            self.__condition.notify_all()
+
+
+    # release gives the browser back to the pool.
+    # If the browser has crashed, it's thrown away and a new one will be started for the next lease.
+    def release(self, driver: Driver) -> None:
+        if not driver.isAlive():
+            print("browser is not responding, recycling it...")
+            self.__discard(driver)
+            return
+
+        with self.__condition:
+            if not self.__closed:
+                self.__idle.append(driver)
+            # notify_all, the owner of this browser may be waiting for it behind the others.
+            self.__condition.notify_all()
+
+
+    # lease is the "with" version of acquire and release.
+    @contextmanager
+    def lease(self, owner: object | None = None) -> Iterator[Driver]:
+        driver = self.acquire(owner=owner)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+
+    # close shuts down every browser of the pool, leased or not.
+    def close(self) -> None:
+        with self.__condition:
+            self.__closed = True
+            drivers = self.__drivers
+            self.__drivers = []
+            self.__idle = []
+            self.__condition.notify_all()
+
+        for driver in drivers:
+            driver.close()
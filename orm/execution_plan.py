@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from pathlib import Path
+import copy
+import hashlib
+import json
+
+from configs.automation_configs import ResumeMode
+from orm.actions_history import Action
+from orm.checkpoint import Checkpoint
+from orm.pacing import Pacing
+
+@dataclass(frozen=True)
+class PlanStep:
+    """
+    PlanStep is 1 action of the compiled template.
+
+    :index: int: the position of the row in the template's table when the plan was compiled.
+    :action: Action: a private copy of the row's action, so editing the row during the run changes nothing.
+    """
+    index: int
+    action: Action
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    ExecutionPlan is the snapshot of a template taken when Run is pressed.
+    It's compiled on the UI thread, so the worker thread never has to read a widget.
+
+    :start_repeat: int: the number of repeats done by the previous runs, see Checkpoint.
+    :start_step: int: the step that the first repeat of this run starts from.
+    :data_file: str: the CSV/JSONL file whose rows drive the run, each row runs the steps once, instead of the repeats.
+    :plan_hash: str: the hash of the steps, a checkpoint only resumes the plan with the same steps.
+    """
+    steps: tuple[PlanStep, ...]
+    repeat: int
+    delay: int
+    pacing: Pacing
+    resume_mode: ResumeMode = ResumeMode.RESTART
+    start_repeat: int = 0
+    start_step: int = 0
+    data_file: str = ""
+    plan_hash: str = ""
+
+
+    # compile validates the run settings and takes the snapshot of the actions.
+    # The run resumes from the checkpoint if it still fits the template.
+    # The template is expected to pass validateTemplate first, see TemplateValidationError.
+    @staticmethod
+    def compile(
+            actions: list[Action],
+            repeat: str,
+            delay: str,
+            pacing: Pacing,
+            resume_mode: ResumeMode = ResumeMode.RESTART,
+            checkpoint: Checkpoint | None = None,
+            data_file: str = "") -> "ExecutionPlan":
+        if not repeat.strip().isdigit():
+            raise Exception("repeat count must be a number, got ({})".format(repeat))
+        if not delay.strip().isdigit():
+            raise Exception("delay must be a number, got ({})".format(delay))
+        if data_file != "" and not Path(data_file).is_file():
+            raise Exception("data file ({}) is not found".format(data_file))
+
+        plan_hash = stepsHash(actions=actions)
+        start_repeat = 0
+        start_step = 0
+        if (resume_mode != ResumeMode.RESTART and checkpoint is not None
+                and checkpoint.plan_hash == plan_hash
+                and checkpoint.step_count == len(actions) and checkpoint.step < len(actions)
+                and checkpoint.repeat < int(repeat)):
+            start_repeat = checkpoint.repeat
+            start_step = checkpoint.step
+
+        return ExecutionPlan(
+            steps=tuple(PlanStep(index=i, action=copy.copy(action)) for i, action in enumerate(actions)),
+            repeat=int(repeat),
+            delay=int(delay),
+            pacing=pacing,
+            resume_mode=resume_mode,
+            start_repeat=start_repeat,
+            start_step=start_step,
+            data_file=data_file,
+            plan_hash=plan_hash,
+        )
+
+
+    # taskCount is the number of steps executed by a full run, for the progress bar.
+    def taskCount(self) -> int:
+        return self.repeat * len(self.steps)
+
+
+    # taskDoneCount is the number of steps done by the previous runs, for the progress bar.
+    def taskDoneCount(self) -> int:
+        return self.start_repeat * len(self.steps) + self.start_step
+
+
+    # resumeStep returns the step that the next repeat starts from after the given step failed.
+    def resumeStep(self, failed_step: PlanStep) -> int:
+        match self.resume_mode:
+            case ResumeMode.FAILED_STEP:
+                return failed_step.index
+            case ResumeMode.RESTART_POINT:
+                for index in range(failed_step.index, -1, -1):
+                    if self.steps[index].action.restart_point:
+                        return index
+        return 0
+
+
+    # checkpoint returns the checkpoint to resume the run from the given repeat and step.
+    def checkpoint(self, repeat: int, step: int) -> Checkpoint:
+        return Checkpoint(repeat=repeat, step=step, step_count=len(self.steps), plan_hash=self.plan_hash)
+
+
+    # pacingAfter returns the pacing after the step, the step's own pacing wins over the template's.
+    def pacingAfter(self, step: PlanStep) -> Pacing:
+        if step.action.pacing is not None:
+            return step.action.pacing
+        return self.pacing
+
+
+    # nextStep returns the step after the given one, None for the last step.
+    def nextStep(self, step: PlanStep) -> PlanStep | None:
+        if step.index + 1 >= len(self.steps):
+            return None
+        return self.steps[step.index + 1]
+
+
+# stepsHash is the hash of what the actions do, without the results of their last run.
+# An edited step changes the hash even if the number of steps stays the same.
+def stepsHash(actions: list[Action]) -> str:
+    steps = [{key: value for key, value in action.encode().items() if key != "failed_reason"} for action in actions]
+    content = json.dumps(steps, default=lambda o: o.encode(), sort_keys=True)
+    return hashlib.sha256(content.encode("utf8")).hexdigest()
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+
+from configs.automation_configs import (
+    PacingMode,
+    STEP_PACING_MODE,
+    STEP_PACING_DURATION,
+)
+
+@dataclass(frozen=True)
+class Pacing:
+    """
+    Pacing is the wait after a step, before the next step of the template starts.
+    The template has 1 pacing for all its steps, and each action can override it with its own.
+
+    :mode: PacingMode: how to wait.
+    :duration: float: the seconds to sleep, only used by PacingMode.FIXED.
+    """
+    mode: PacingMode = STEP_PACING_MODE
+    duration: float = STEP_PACING_DURATION
+
+
+    # fromDict reads the pacing saved in the JSON file, None stays None.
+    @staticmethod
+    def fromDict(data: dict | None) -> "Pacing | None":
+        if data is None:
+            return None
+        mode = data.get("mode", STEP_PACING_MODE)
+        if mode not in list(PacingMode):
+            raise Exception("unknown pacing mode ({}), expected one of {}".format(mode, [m.value for m in PacingMode]))
+        duration = float(data.get("duration", STEP_PACING_DURATION))
+        if duration < 0:
+            raise Exception("pacing duration must not be negative, got ({})".format(duration))
+        return Pacing(mode=PacingMode(mode), duration=duration)
+
+
+    # encode is for the save feature, see Action.encode.
+    def encode(self) -> dict[str, any]:
+        return {
+            "mode": self.mode.value,
+            "duration": self.duration,
+        }
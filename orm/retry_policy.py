@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+
+from configs.automation_configs import (
+    BackoffCurve,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_INTERVAL,
+    RETRY_MAX_INTERVAL,
+)
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    RetryPolicy is how many times a step is tried before it fails, and how long to wait in between.
+
+    :attempts: int: the number of attempts, including the first one, 1 means no retry.
+    :backoff: BackoffCurve: how the wait grows from 1 retry to the next.
+    :interval: float: the wait (in seconds) before the first retry.
+    :refresh: bool: refresh the page before each retry, for the laggy pages that never finish loading.
+    """
+    attempts: int = RETRY_ATTEMPTS
+    backoff: BackoffCurve = RETRY_BACKOFF
+    interval: float = RETRY_INTERVAL
+    refresh: bool = False
+
+
+    # fromDict reads the retry policy saved in the JSON file, None stays None.
+    @staticmethod
+    def fromDict(data: dict | None) -> "RetryPolicy | None":
+        if data is None:
+            return None
+        attempts = int(data.get("attempts", RETRY_ATTEMPTS))
+        if attempts < 1:
+            raise Exception("retry attempts must be at least 1, got ({})".format(attempts))
+        backoff = data.get("backoff", RETRY_BACKOFF)
+        if backoff not in list(BackoffCurve):
+            raise Exception("unknown retry backoff ({}), expected one of {}".format(backoff, [b.value for b in BackoffCurve]))
+        interval = float(data.get("interval", RETRY_INTERVAL))
+        if interval < 0:
+            raise Exception("retry interval must not be negative, got ({})".format(interval))
+        return RetryPolicy(
+            attempts=attempts,
+            backoff=BackoffCurve(backoff),
+            interval=interval,
+            refresh=bool(data.get("refresh", False)),
+        )
+
+
+    # delay returns the wait before the given retry, the first retry is 1.
+    def delay(self, retry: int) -> float:
+        match self.backoff:
+            case BackoffCurve.LINEAR:
+                delay = self.interval * retry
+            case BackoffCurve.EXPONENTIAL:
+                delay = self.interval * (2 ** (retry - 1))
+            case _:
+                delay = self.interval
+        return min(delay, RETRY_MAX_INTERVAL)
+
+
+    # encode is for the save feature, see Action.encode.
+    def encode(self) -> dict[str, any]:
+        return {
+            "attempts": self.attempts,
+            "backoff": self.backoff.value,
+            "interval": self.interval,
+            "refresh": self.refresh,
+        }
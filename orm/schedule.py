@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from datetime import datetime
+import math
+
+from configs.automation_configs import (
+    ScheduleMode,
+    OverlapPolicy,
+    SCHEDULE_OVERLAP_POLICY,
+)
+from helpers.cron import CronExpression
+
+@dataclass(frozen=True)
+class Schedule:
+    """
+    Schedule is when the scheduler starts a template, it's saved in the template's JSON file as "schedule".
+
+    :mode: ScheduleMode: fixed rate, cron or delay.
+    :interval: float: the seconds between 2 starts (fixed rate), or between the end of a run and the next start (delay).
+    :cron: str: the cron expression, only used by the cron mode.
+    :align: bool: align the fixed rate to the clock, counted from midnight, e.g. every 900s at :00, :15, :30 and :45.
+    :overlap: OverlapPolicy: what to do if the template is still running at its next start.
+    :enabled: bool: the disabled schedules are kept in the file, but never started.
+    """
+    mode: ScheduleMode
+    interval: float = 0
+    cron: str = ""
+    align: bool = False
+    overlap: OverlapPolicy = SCHEDULE_OVERLAP_POLICY
+    enabled: bool = True
+
+
+    # fromDict reads the schedule saved in the JSON file, None stays None.
+    @staticmethod
+    def fromDict(data: dict | None) -> "Schedule | None":
+        if data is None:
+            return None
+        mode = data.get("mode", "")
+        if mode not in list(ScheduleMode):
+            raise Exception("unknown schedule mode ({}), expected one of {}".format(mode, [m.value for m in ScheduleMode]))
+        overlap = data.get("overlap", SCHEDULE_OVERLAP_POLICY)
+        if overlap not in list(OverlapPolicy):
+            raise Exception("unknown overlap policy ({}), expected one of {}".format(overlap, [o.value for o in OverlapPolicy]))
+
+        schedule = Schedule(
+            mode=ScheduleMode(mode),
+            interval=float(data.get("interval", 0)),
+            cron=data.get("cron", ""),
+            align=bool(data.get("align", False)),
+            overlap=OverlapPolicy(overlap),
+            enabled=bool(data.get("enabled", True)),
+        )
+        if schedule.mode == ScheduleMode.CRON:
+            # Fail on load instead of on the first start.
+            CronExpression(schedule.cron)
+        elif schedule.interval <= 0:
+            raise Exception("the {} schedule needs an interval greater than 0, got ({})".format(schedule.mode, schedule.interval))
+        return schedule
+
+
+    # encode is for the save feature, see Action.encode.
+    def encode(self) -> dict[str, any]:
+        data: dict[str, any] = {
+            "mode": self.mode.value,
+            "overlap": self.overlap.value,
+            "enabled": self.enabled,
+        }
+        if self.mode == ScheduleMode.CRON:
+            data["cron"] = self.cron
+        else:
+            data["interval"] = self.interval
+        if self.mode == ScheduleMode.FIXED_RATE:
+            data["align"] = self.align
+        return data
+
+
+    def __str__(self) -> str:
+        match self.mode:
+            case ScheduleMode.CRON:
+                return "cron ({})".format(self.cron)
+            case ScheduleMode.FIXED_RATE:
+                return "every {}s{}".format(self.interval, " aligned to the clock" if self.align else "")
+        return "{}s after each run".format(self.interval)
+
+
+    # firstRun returns the first start (a time.time() timestamp) after the schedule is armed at now.
+    def firstRun(self, now: float) -> float:
+        match self.mode:
+            case ScheduleMode.CRON:
+                return CronExpression(self.cron).nextAfter(datetime.fromtimestamp(now)).timestamp()
+            case ScheduleMode.FIXED_RATE if self.align:
+                midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+                return midnight + (math.floor((now - midnight) / self.interval) + 1) * self.interval
+        return now + self.interval
+
+
+    # nextRun returns the start after the previous one, None if it depends on the end of the run (delay mode).
+    # The starts missed while the app was busy or asleep are skipped, instead of running them all at once.
+    def nextRun(self, previous: float, now: float) -> float | None:
+        match self.mode:
+            case ScheduleMode.CRON:
+                return CronExpression(self.cron).nextAfter(datetime.fromtimestamp(max(previous, now))).timestamp()
+            case ScheduleMode.FIXED_RATE:
+                # Counted from the previous planned start instead of the actual one, so it doesn't drift.
+                next_run = previous + self.interval
+                if next_run <= now:
+                    next_run += (math.floor((now - next_run) / self.interval) + 1) * self.interval
+                return next_run
+        return None
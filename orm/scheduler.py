@@ -0,0 +1,115 @@
+from typing import Callable
+import threading
+import time
+
+from configs.automation_configs import (
+    ScheduleMode,
+    OverlapPolicy,
+)
+from orm.schedule import Schedule
+
+class ScheduledJob:
+    def __init__(self, name: str, schedule: Schedule, start: Callable[[], None], isRunning: Callable[[], bool]) -> None:
+        """
+        ScheduledJob is 1 template armed in the Scheduler.
+
+        :start: starts a run of the template, it's called from the scheduler's thread.
+        :isRunning: tells us if the template is running, for the overlap policy.
+        """
+        self.name: str = name
+        self.schedule: Schedule = schedule
+        self.start: Callable[[], None] = start
+        self.isRunning: Callable[[], bool] = isRunning
+        # next_time is the next start (a time.time() timestamp), None while waiting for the end of a run (delay mode).
+        self.next_time: float | None = None
+        # pending is a start queued behind the current run, see OverlapPolicy.QUEUE.
+        self.pending: bool = False
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        """
+        Scheduler starts the templates at the time of their Schedule.
+        It has 1 thread sleeping until the closest start with a single timed wait,
+        instead of waking up every now and then to check the time.
+        The wait is only interrupted when a job is added, removed or finished.
+        """
+        self.__condition = threading.Condition()
+        self.__jobs: list[ScheduledJob] = []
+        self.__closed: bool = False
+        self.__thread = threading.Thread(target=self.__loop, daemon=True)
+        self.__thread.start()
+
+
+    # add arms the schedule, the job's first start is computed from now.
+    def add(self, name: str, schedule: Schedule, start: Callable[[], None], isRunning: Callable[[], bool]) -> ScheduledJob:
+        job = ScheduledJob(name=name, schedule=schedule, start=start, isRunning=isRunning)
+        with self.__condition:
+            job.next_time = schedule.firstRun(now=time.time())
+            self.__jobs.append(job)
+            self.__condition.notify_all()
+        print("{} is scheduled {}, next run at {}".format(name, schedule, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job.next_time))))
+        return job
+
+
+    def remove(self, job: ScheduledJob) -> None:
+        with self.__condition:
+            if job in self.__jobs:
+                self.__jobs.remove(job)
+            self.__condition.notify_all()
+
+
+    # runFinished must be called when a run of the job is over, scheduled or not.
+    # It starts the queued run, or plans the next start of the delay mode.
+    def runFinished(self, job: ScheduledJob) -> None:
+        with self.__condition:
+            if job not in self.__jobs:
+                return
+            if job.pending:
+                job.pending = False
+                print("{} starts its queued run".format(job.name))
+                job.start()
+            elif job.schedule.mode == ScheduleMode.DELAY:
+                job.next_time = time.time() + job.schedule.interval
+            self.__condition.notify_all()
+
+
+    def close(self) -> None:
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+
+    def __loop(self) -> None:
+        with self.__condition:
+            while not self.__closed:
+                waiting_jobs = [job for job in self.__jobs if job.next_time is not None]
+                if len(waiting_jobs) == 0:
+                    self.__condition.wait()
+                    continue
+
+                job = min(waiting_jobs, key=lambda job: job.next_time)
+                timeout = job.next_time - time.time()
+                if timeout > 0:
+                    self.__condition.wait(timeout=timeout)
+                    # Woken up either on time or by a change of the jobs, check again.
+                    continue
+
+                self.__fire(job=job)
+
+
+    # __fire starts the job, or applies the overlap policy if it's still running.
+    def __fire(self, job: ScheduledJob) -> None:
+        now = time.time()
+        if not job.isRunning():
+            print("{} starts on schedule".format(job.name))
+            job.start()
+        elif job.schedule.overlap == OverlapPolicy.QUEUE:
+            print("{} is still running, its scheduled run is queued".format(job.name))
+            job.pending = True
+        else:
+            print("{} is still running, skip its scheduled run".format(job.name))
+
+        job.next_time = job.schedule.nextRun(previous=job.next_time, now=now)
+        if job.next_time is not None:
+            print("{} next run at {}".format(job.name, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job.next_time))))
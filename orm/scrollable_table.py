@@ -1,16 +1,18 @@
 import tkinter as tk
 from tkinter import ttk
 from typing import List, Callable
+from functools import partial
 import threading
 import json
 import re
 
-from orm.driver import Driver
+from orm.driver_pool import DriverPool
 from orm.actions_history import (
     ActionType,
     Action,
 )
 from helpers.ui import StyledEntry
+from helpers.ui_bus import UIChannel
 from configs.ui_configs import (
     ResultText,
     SYSTEM_DEFAULT_COLOR,
@@ -20,6 +22,11 @@ from configs.ui_configs import (
     SUCCESS_BG_COLOR,
 )
 
+# rowKey is the ui_bus key of the row's run state, so only its latest state is drawn on each frame.
+def rowKey(row: "HistoryActionRow") -> tuple[str, int]:
+    return ("row", id(row))
+
+
 class TableHeader:
     def __init__(self, text: str, weight: int) -> None:
         self.text = text
@@ -30,24 +37,38 @@ class HistoryActionRow:
     def __init__(
             self,
             master: tk.Frame,
-            driver: Driver,
+            driver_pool: DriverPool,
             action: Action,
             headers: List[TableHeader],
             result_label: tk.Label,
+            ui_bus: UIChannel,
             onDeleteCallback: Callable[[Action], None],
+            lease_owner: object | None = None,
+            onChangeCallback: Callable[[], None] | None = None,
         ) -> None:
         """
         Calling ActionRow will do create an instance of ActionRow, also render it on the screen.
 
         :result_label: tk.Label: the label where the action shows the automation result.
-        :driver: orm.driver.Driver: the browser where the automation will be executed.
+        :driver_pool: orm.driver_pool.DriverPool: the browsers where the automation will be executed.
+        :ui_bus: helpers.ui_bus.UIChannel: how the replay thread shows the result on the UI.
+        :lease_owner: the owner of the browser lease, so the replay runs on the browser of its template's last run,
+        see DriverPool.lease.
         :onDeleteCallback: is the function that will be executed when the row is deleted.
+        :onChangeCallback: is the function that will be executed when the row is edited, see dirty.
         """
         self.master: tk.Frame = master
-        self.driver: Driver = driver
+        self.driver_pool: DriverPool = driver_pool
         self.action: Action = action
         self.result_label: tk.Label = result_label
+        self.ui_bus: UIChannel = ui_bus
+        self.lease_owner: object | None = lease_owner
         self.onDeleteCallback: Callable[[HistoryActionRow], None] = onDeleteCallback
+        self.onChangeCallback: Callable[[], None] | None = onChangeCallback
+        # dirty tells us that the entries were edited since the action was last saved,
+        # so the action must be updated from the entries before saving it again.
+        self.dirty: bool = False
+        self.__entry_variables: list[tk.StringVar] = []
 
         # I intentionally keep the cell separately instead of grouping them under the same widget
         # so I have rooms for customization if needed to.
@@ -59,6 +80,10 @@ class HistoryActionRow:
 
         # Replay button
         def replay_in_thread() -> None:
+            # Read the entries here, the replay thread must not touch the widgets.
+            self.updateAction()
+            self.markRunning()
+
             def replay() -> None:
                 try:
                     self.retriggerHistoryAction()
@@ -133,6 +158,10 @@ class HistoryActionRow:
         if not action.needValue(): # Then check if I need to disable the entry
             self.value_entry.config(state="readonly")
 
+        # Watch the entries after filling them, so only the edits mark the row as dirty.
+        for entry in (self.css_selector_entry, self.html_attribute_entry, self.value_entry):
+            self.__watchEntry(entry=entry)
+
         # Reposition buttons
         reposition_buttons_frame: tk.Frame = tk.Frame(master=self.row_frame, padx=1)
         reposition_buttons_frame.grid(row=0, column=5, sticky=tk.E + tk.W)
@@ -151,6 +180,23 @@ class HistoryActionRow:
         self.remove_button.grid(row=0, column=len(headers)-1, sticky=tk.E + tk.W)
 
 
+    # __watchEntry marks the row as dirty whenever the entry's text changes,
+    # including the pastes and the edits made with the mouse.
+    def __watchEntry(self, entry: ttk.Entry) -> None:
+        variable = tk.StringVar(master=self.row_frame, value=entry.get())
+        entry.configure(textvariable=variable)
+        variable.trace_add("write", lambda *_: self.markDirty())
+        # Keep the variable alive as long as the row.
+        self.__entry_variables.append(variable)
+
+
+    # markDirty tells the table that this row has changed.
+    def markDirty(self) -> None:
+        self.dirty = True
+        if self.onChangeCallback is not None:
+            self.onChangeCallback()
+
+
     def updateOnMoveUp(self, onMoveUp: Callable[[], None]) -> None:
         self.move_up_button.config(command=onMoveUp)
 
@@ -202,10 +248,27 @@ class HistoryActionRow:
         """retriggerHistoryAction triggered the action that was executed from the past.
         It will also update the retrigger attempt as the latest version in the history.
         It's expected for this action to take a long time to execute,
-        so remember to use thread to call this function.
+        so remember to use thread to call this function,
+        after calling updateAction and markRunning from the UI thread.
+
+        A browser is leased from the pool just for this action,
+        the one of the template's last run if it's still alive.
+        The result is posted to the ui_bus, since this function doesn't run on the UI thread.
+        The template runs don't use this function, see Template.executePlan.
         """
-        self.updateAction()
+        try:
+            with self.driver_pool.lease(owner=self.lease_owner) as driver:
+                self.action.executeAction(driver=driver)
+        except Exception as e:
+            self.ui_bus.post(rowKey(self), partial(self.markResult, failed_reason="{}".format(e)))
+            raise(e)
+        else:
+            self.ui_bus.post(rowKey(self), partial(self.markResult, failed_reason=""))
+
 
+    # markRunning shows on the UI that the action is running.
+    # It must be called from the UI thread, the other threads post it to the ui_bus.
+    def markRunning(self) -> None:
         # Block the execute button to prevent double clicking
         # and the remove button to avoid breaking change to the UI. 
         self.freeze()
@@ -213,16 +276,18 @@ class HistoryActionRow:
         # Update the result bar to yellow hinting that it's running. 
         self.result_label.configure(background=IN_PROGRESS_BG_COLOR, text=ResultText.IN_PROGRESS)
 
-        try:
-            self.action.executeAction(driver=self.driver)
-        except Exception as e:
+
+    # markResult shows the result of the action on the UI, an empty failed_reason means success.
+    # It must be called from the UI thread, the other threads post it to the ui_bus.
+    def markResult(self, failed_reason: str) -> None:
+        self.action.failed_reason = failed_reason
+        if failed_reason != "":
             # Update the result label with error if there's an error
-            self.result_label.configure(background=FAILED_BG_COLOR, text=ResultText.FAILED.format(e))
+            self.result_label.configure(background=FAILED_BG_COLOR, text=ResultText.FAILED.format(failed_reason))
             self.replay_button_border.config(
                 highlightbackground="red",
                 highlightcolor="red",
             )
-            raise(e)
         else:
             # Else, mark it as done.
             self.result_label.configure(background=SUCCESS_BG_COLOR, text=ResultText.SUCCESS)
@@ -230,8 +295,7 @@ class HistoryActionRow:
                 highlightbackground="green",
                 highlightcolor="green",
             )
-        finally:
-            self.unfreeze()
+        self.unfreeze()
 
     
     # freeze disables the run and the remove button
@@ -261,8 +325,8 @@ class HistoryActionRow:
                 highlightbackground=SYSTEM_DEFAULT_COLOR,
                 highlightcolor=SYSTEM_DEFAULT_COLOR,
             )
-
-        self.action.action_type = action_type
+            self.action.action_type = action_type
+            self.markDirty()
 
         # Disable all the entries of the row.
         # self.name_entry.config(state="readonly")
@@ -306,18 +370,27 @@ class ScrollableActionTable:
     def __init__(
         self,
         master: tk.Frame,
-        driver: Driver,
+        driver_pool: DriverPool,
         result_label: tk.Label,
-        enable_add_row_button: bool = False) -> None:
+        ui_bus: UIChannel,
+        lease_owner: object | None = None,
+        enable_add_row_button: bool = False,
+        onChangeCallback: Callable[[], None] | None = None) -> None:
         """
         :master: tk.Frame: The Frame where the Table will be placed.
-        :driver: orm.driver.Driver: The mock browser that run the automation command from the table.
+        :driver_pool: orm.driver_pool.DriverPool: The mock browsers that run the automation command from the table.
         :result_label: tk.Label: The label that shows the result of the automation command.
+        :ui_bus: helpers.ui_bus.UIChannel: how the rows replayed in a thread update the UI.
+        :lease_owner: the owner of the browser leases of the replayed rows, see DriverPool.lease.
+        :onChangeCallback: is the function that will be executed when a row is added, removed, moved or edited.
         """
         self.master = master
-        self.driver = driver
+        self.driver_pool = driver_pool
         self.result_label: tk.Label = result_label
+        self.ui_bus: UIChannel = ui_bus
+        self.lease_owner: object | None = lease_owner
         self.rows: list[HistoryActionRow] = []
+        self.onChangeCallback: Callable[[], None] | None = onChangeCallback
 
         # Initiating the canvas for the scrollable table.
         self.main_canvas: tk.Canvas = tk.Canvas(master=master)
@@ -364,11 +437,14 @@ class ScrollableActionTable:
     def addHistoryActionRow(self, action: Action) -> None:
         action_row = HistoryActionRow(
             master=self.history_table_frame,
-            driver=self.driver,
+            driver_pool=self.driver_pool,
             action=action,
             headers=self.headers,
             result_label=self.result_label,
+            ui_bus=self.ui_bus,
             onDeleteCallback=self.__removeRow,
+            lease_owner=self.lease_owner,
+            onChangeCallback=self.__onChange,
         )
 
         def onMoveUp() -> None:
@@ -412,9 +488,12 @@ class ScrollableActionTable:
             ),
             # action_index=len(self.rows),
             headers=self.headers,
-            driver=self.driver,
+            driver_pool=self.driver_pool,
             result_label=self.result_label,
+            ui_bus=self.ui_bus,
             onDeleteCallback=self.__removeRow,
+            lease_owner=self.lease_owner,
+            onChangeCallback=self.__onChange,
         )
         
         def onMoveUp() -> None:
@@ -429,6 +508,7 @@ class ScrollableActionTable:
         action_row.row_frame.grid(row=len(self.rows)+1, columnspan=len(self.headers), sticky=tk.E+tk.W)
 
         self.rows.append(action_row)
+        self.__onChange()
         # Scroll to the bottom after adding new row.
         # update_idletasks is crucial because
         # canvas needs to recalculate its new height
@@ -504,6 +584,13 @@ class ScrollableActionTable:
     # This will be passed around as the callback function. 
     def __removeRow(self, row: HistoryActionRow) -> None:
         self.rows.remove(row)
+        self.__onChange()
+
+
+    # __onChange tells the owner of the table that the rows have changed, e.g. to save them later.
+    def __onChange(self) -> None:
+        if self.onChangeCallback is not None:
+            self.onChangeCallback()
 
 
     # moveRowUpBy moves the row up by delta row on the table
@@ -535,6 +622,7 @@ class ScrollableActionTable:
 
         self.rows.remove(target_row)
         self.rows.insert(current_index-delta, target_row)
+        self.__onChange()
 
 
     # moveRowDownBy moves the row down by delta row on the table
@@ -565,3 +653,4 @@ class ScrollableActionTable:
 
         self.rows.remove(target_row)
         self.rows.insert(current_index+delta, target_row)
+        self.__onChange()
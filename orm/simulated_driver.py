@@ -0,0 +1,529 @@
+from pathlib import Path
+from typing import Any, Callable, List
+from urllib.parse import urljoin, urlparse, unquote
+import random
+import re
+import time
+
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    InvalidSelectorException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+from helpers.browser_scripts import (
+    FIND_MATCH_SCRIPT,
+    WAIT_FOR_SELECTOR_SCRIPT,
+    READY_STATE_SCRIPT,
+    NETWORK_IDLE_SCRIPT,
+    HIGHLIGHT_SCRIPT,
+    PREFLIGHT_SCRIPT,
+)
+from helpers.dom import (
+    Node,
+    SelectorError,
+    parseHTML,
+    querySelectorAll,
+)
+
+# The simulated browser is a stand-in for webdriver.Firefox,
+# so the Driver, the templates and the lookup strategies can be benchmarked and tested without a browser:
+#
+#   browser = SimulatedWebDriver(fixture_dir="./fixtures", latency=LatencyModel(round_trip=0.002))
+#   driver = Driver(dry_run=False, high_light_mode=False, web_driver=browser)
+#   driver.goto("page.html")
+#   driver.clickByCSS("#submit")
+#   print(browser.command_count)
+#
+# The fixtures are plain HTML files, loaded into an in-process DOM (helpers/dom.py).
+# An element with the data-sim-appear-after="<seconds>" attribute is only on the page
+# that many seconds after the page is loaded, to simulate the slow pages.
+
+# BLANK_PAGE is the page of a new tab.
+BLANK_PAGE = "about:blank"
+# The private use characters are the special keys (Keys.ENTER, Keys.TAB, ...), they don't type anything.
+_SPECIAL_KEYS = re.compile("[\ue000-\uf8ff]")
+_WINDOW_OPEN = re.compile(r"""window\.open\(\s*(?:(['"])(?P<url>.*?)\1)?""")
+_BOOLEAN_ATTRIBUTES = {
+    "async", "autofocus", "autoplay", "checked", "controls", "default", "defer", "disabled", "formnovalidate",
+    "hidden", "ismap", "loop", "multiple", "muted", "nomodule", "novalidate", "open", "readonly", "required",
+    "reversed", "selected",
+}
+
+
+class LatencyModel:
+    def __init__(self, round_trip: float = 0, jitter: float = 0, page_load: float = 0, seed: int | None = None) -> None:
+        """
+        LatencyModel is the time that the simulated browser spends on each command,
+        like the HTTP round trip between selenium and geckodriver.
+
+        :round_trip: float: the seconds spent by every command.
+        :jitter: float: a random extra up to this many seconds on every command.
+        :page_load: float: the extra seconds spent by every page load.
+        :seed: the seed of the jitter, to replay the same run.
+        """
+        self.round_trip: float = round_trip
+        self.jitter: float = jitter
+        self.page_load: float = page_load
+        self.random: random.Random = random.Random(seed)
+
+
+    # delay returns how long the next command takes.
+    def delay(self, extra: float = 0) -> float:
+        jitter = self.random.uniform(0, self.jitter) if self.jitter > 0 else 0
+        return self.round_trip + jitter + extra
+
+
+class SimulatedElement:
+    def __init__(self, browser: "SimulatedWebDriver", node: Node) -> None:
+        """SimulatedElement is the WebElement of the simulated browser."""
+        self.parent: SimulatedWebDriver = browser
+        self.node: Node = node
+
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SimulatedElement) and other.node is self.node
+
+
+    def __hash__(self) -> int:
+        return id(self.node)
+
+
+    @property
+    def tag_name(self) -> str:
+        self.parent.execute("getElementTagName")
+        return self.node.tag
+
+
+    @property
+    def text(self) -> str:
+        self.parent.execute("getElementText")
+        return self.node.visibleText()
+
+
+    def get_attribute(self, name: str) -> str | None:
+        self.parent.execute("getElementAttribute")
+        return self.parent.attributeOf(self.node, name)
+
+
+    def get_dom_attribute(self, name: str) -> str | None:
+        self.parent.execute("getElementAttribute")
+        return self.node.attributes.get(name)
+
+
+    def is_displayed(self) -> bool:
+        self.parent.execute("isElementDisplayed")
+        return self.node.isDisplayed()
+
+
+    def is_enabled(self) -> bool:
+        self.parent.execute("isElementEnabled")
+        return "disabled" not in self.node.attributes
+
+
+    def is_selected(self) -> bool:
+        self.parent.execute("isElementSelected")
+        return self.node.selected or self.node.checked
+
+
+    def click(self) -> None:
+        self.parent.execute("clickElement")
+        self.parent.click(self.node)
+
+
+    def send_keys(self, *value: str) -> None:
+        self.parent.execute("sendKeysToElement")
+        if not self.node.isDisplayed():
+            raise ElementNotInteractableException("element is not reachable by keyboard")
+        self.node.value += _SPECIAL_KEYS.sub("", "".join(value))
+
+
+    def clear(self) -> None:
+        self.parent.execute("clearElement")
+        self.node.value = ""
+
+
+    def find_element(self, by: str = By.ID, value: str | None = None) -> "SimulatedElement":
+        self.parent.execute("findChildElement")
+        elements = self.parent.find(self.node, by, value)
+        if len(elements) == 0:
+            raise NoSuchElementException("Unable to locate element: {}".format(value))
+        return elements[0]
+
+
+    def find_elements(self, by: str = By.ID, value: str | None = None) -> List["SimulatedElement"]:
+        self.parent.execute("findChildElements")
+        return self.parent.find(self.node, by, value)
+
+
+class SimulatedWindow:
+    def __init__(self, handle: str) -> None:
+        self.handle: str = handle
+        self.url: str = BLANK_PAGE
+        self.document: Node = parseHTML("")
+        self.loaded_at: float = time.perf_counter()
+
+
+class _SwitchTo:
+    def __init__(self, browser: "SimulatedWebDriver") -> None:
+        self.browser: SimulatedWebDriver = browser
+
+
+    def window(self, window_name: str) -> None:
+        self.browser.execute("switchToWindow")
+        if window_name not in self.browser.windows:
+            raise NoSuchWindowException("no window with handle {}".format(window_name))
+        self.browser.current = self.browser.windows[window_name]
+
+
+class SimulatedWebDriver:
+    def __init__(
+            self,
+            fixtures: dict[str, str] | None = None,
+            fixture_dir: str = "",
+            latency: LatencyModel | None = None) -> None:
+        """
+        SimulatedWebDriver answers the WebDriver commands used by the Driver from the local HTML fixtures.
+
+        :fixtures: dict[str, str]: the HTML of each URL, checked first.
+        :fixture_dir: str: the folder of the HTML files, for the URL that is not in fixtures.
+        A "file://" URL is always read from the disk.
+        :latency: LatencyModel: the time spent by each command, no latency by default.
+        """
+        self.fixtures: dict[str, str] = fixtures if fixtures is not None else {}
+        self.fixture_dir: str = fixture_dir
+        self.latency: LatencyModel = latency if latency is not None else LatencyModel()
+        # command_count is the number of commands sent to the simulated browser, like the WebDriver round trips.
+        self.command_count: int = 0
+
+        self.__window_counter: int = 0
+        self.windows: dict[str, SimulatedWindow] = {}
+        self.current: SimulatedWindow = self.__openWindow()
+        self.switch_to: _SwitchTo = _SwitchTo(browser=self)
+        self.script_timeout: float = 30
+
+
+    # execute is where every command goes through, like RemoteWebDriver.execute.
+    # It counts the command and waits for the simulated latency.
+    def execute(self, driver_command: str, params: dict | None = None) -> None:
+        if len(self.windows) == 0:
+            raise WebDriverException("the simulated browser is closed")
+        self.command_count += 1
+        delay = self.latency.delay(extra=self.latency.page_load if driver_command in ("get", "refresh") else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+
+    def __openWindow(self) -> SimulatedWindow:
+        window = SimulatedWindow(handle="sim-window-{}".format(self.__window_counter))
+        self.__window_counter += 1
+        self.windows[window.handle] = window
+        return window
+
+
+    # __readFixture returns the HTML of the URL.
+    def __readFixture(self, url: str) -> str:
+        if url == BLANK_PAGE:
+            return ""
+        if url in self.fixtures:
+            return self.fixtures[url]
+
+        parsed = urlparse(url)
+        if parsed.scheme == "file":
+            path = Path(unquote(parsed.path))
+        else:
+            path = Path(self.fixture_dir) / unquote(parsed.path).lstrip("/")
+        if not path.is_file():
+            raise WebDriverException("no fixture for the URL ({})".format(url))
+        return path.read_text(encoding="utf8")
+
+
+    def __load(self, window: SimulatedWindow, url: str) -> None:
+        html = self.__readFixture(url)
+        window.url = url
+        window.document = parseHTML(html)
+        window.loaded_at = time.perf_counter()
+
+
+    # isAttached tells us if the element is on the page already, see data-sim-appear-after.
+    def isAttached(self, node: Node) -> bool:
+        elapsed = time.perf_counter() - self.current.loaded_at
+        current: Node | None = node
+        while current is not None:
+            appear_after = current.attributes.get("data-sim-appear-after")
+            if appear_after is not None and elapsed < float(appear_after):
+                return False
+            current = current.parent
+        return True
+
+
+    def querySelectorAll(self, root: Node, selector: str) -> list[Node]:
+        return querySelectorAll(root=root, selector=selector, include=self.isAttached)
+
+
+    # find is the shared find_elements of the browser and the elements.
+    def find(self, root: Node, by: str, value: str | None) -> List[SimulatedElement]:
+        value = value if value is not None else ""
+        match by:
+            case By.CSS_SELECTOR:
+                selector = value
+            case By.ID:
+                selector = '[id="{}"]'.format(value)
+            case By.NAME:
+                selector = '[name="{}"]'.format(value)
+            case By.CLASS_NAME:
+                selector = "." + value
+            case By.TAG_NAME:
+                selector = value
+            case By.XPATH:
+                return [SimulatedElement(browser=self, node=node) for node in self.__findOptionsByXPath(root, value)]
+            case _:
+                raise InvalidSelectorException("the simulated browser doesn't support finding by {}".format(by))
+
+        try:
+            nodes = self.querySelectorAll(root=root, selector=selector)
+        except SelectorError as e:
+            raise InvalidSelectorException("{}".format(e))
+        return [SimulatedElement(browser=self, node=node) for node in nodes]
+
+
+    # __findOptionsByXPath supports the 2 XPath that selenium's Select uses to select by visible text.
+    # The other XPath are not supported.
+    def __findOptionsByXPath(self, root: Node, xpath: str) -> list[Node]:
+        match = re.fullmatch(r"""\.//option\[(normalize-space\(\.\) = |contains\(\.,)(?:"([^"]*)"|'([^']*)')\)?\]""", xpath)
+        if match is None:
+            raise InvalidSelectorException("the simulated browser doesn't support the XPath ({})".format(xpath))
+
+        text = match.group(2) if match.group(2) is not None else match.group(3)
+        options = self.querySelectorAll(root=root, selector="option")
+        if match.group(1).startswith("normalize-space"):
+            return [node for node in options if " ".join(node.textContent().split()) == text]
+        return [node for node in options if text in node.textContent()]
+
+
+    # attributeOf mimics the getAttribute atom of WebElement.get_attribute:
+    # the boolean attributes are "true" or None, and the form values are the live ones.
+    def attributeOf(self, node: Node, name: str) -> str | None:
+        name = name.lower()
+        if name in _BOOLEAN_ATTRIBUTES:
+            if name == "selected":
+                return "true" if node.selected else None
+            if name == "checked":
+                return "true" if node.checked else None
+            return "true" if name in node.attributes else None
+        if name == "value":
+            if node.tag == "option" and "value" not in node.attributes:
+                return node.textContent().strip()
+            if node.tag in ("input", "textarea", "option", "button", "select"):
+                if node.tag == "select":
+                    selected = next((option for option in self.querySelectorAll(node, "option") if option.selected), None)
+                    return self.attributeOf(selected, "value") if selected is not None else ""
+                return node.value
+        if name == "index" and node.tag == "option":
+            select = node.parent
+            while select is not None and select.tag != "select":
+                select = select.parent
+            if select is not None:
+                return str(self.querySelectorAll(select, "option").index(node))
+        if name in ("href", "src") and name in node.attributes:
+            return urljoin(self.current.url, node.attributes[name])
+        return node.attributes.get(name)
+
+
+    # click performs the default action of the element.
+    def click(self, node: Node) -> None:
+        if not node.isDisplayed():
+            raise ElementNotInteractableException("element ({}) could not be scrolled into view".format(node.tag))
+
+        if node.tag == "option":
+            select = node.parent
+            while select is not None and select.tag != "select":
+                select = select.parent
+            if select is not None and "multiple" in select.attributes:
+                node.selected = not node.selected
+                return
+            if select is not None:
+                for option in self.querySelectorAll(select, "option"):
+                    option.selected = False
+            node.selected = True
+            return
+
+        if node.tag == "input" and node.attributes.get("type", "").lower() == "checkbox":
+            node.checked = not node.checked
+            return
+        if node.tag == "input" and node.attributes.get("type", "").lower() == "radio":
+            node.checked = True
+            return
+
+        # Follow the link, if the element is inside one.
+        link: Node | None = node
+        while link is not None and not (link.tag == "a" and "href" in link.attributes):
+            link = link.parent
+        if link is not None:
+            url = urljoin(self.current.url, link.attributes["href"])
+            if link.attributes.get("target") == "_blank":
+                self.__load(self.__openWindow(), url)
+            else:
+                self.__load(self.current, url)
+
+
+    # WebDriver commands.
+
+    def get(self, url: str) -> None:
+        self.execute("get")
+        self.__load(self.current, url)
+
+
+    def refresh(self) -> None:
+        self.execute("refresh")
+        self.__load(self.current, self.current.url)
+
+
+    def find_element(self, by: str = By.ID, value: str | None = None) -> SimulatedElement:
+        self.execute("findElement")
+        elements = self.find(self.current.document, by, value)
+        if len(elements) == 0:
+            raise NoSuchElementException("Unable to locate element: {}".format(value))
+        return elements[0]
+
+
+    def find_elements(self, by: str = By.ID, value: str | None = None) -> List[SimulatedElement]:
+        self.execute("findElements")
+        return self.find(self.current.document, by, value)
+
+
+    @property
+    def window_handles(self) -> List[str]:
+        self.execute("getWindowHandles")
+        return list(self.windows.keys())
+
+
+    @property
+    def current_window_handle(self) -> str:
+        self.execute("getCurrentWindowHandle")
+        if self.current.handle not in self.windows:
+            raise NoSuchWindowException("the current window is closed")
+        return self.current.handle
+
+
+    @property
+    def current_url(self) -> str:
+        self.execute("getCurrentUrl")
+        return self.current.url
+
+
+    @property
+    def title(self) -> str:
+        self.execute("getTitle")
+        titles = querySelectorAll(self.current.document, "title")
+        return titles[0].textContent().strip() if len(titles) > 0 else ""
+
+
+    def set_script_timeout(self, time_to_wait: float) -> None:
+        self.execute("setTimeouts")
+        self.script_timeout = time_to_wait
+
+
+    # close closes the current window like WebDriver.close, the browser keeps running with its other windows.
+    def close(self) -> None:
+        self.execute("closeWindow")
+        self.windows.pop(self.current.handle, None)
+
+
+    def quit(self) -> None:
+        self.execute("quit")
+        self.windows = {}
+
+
+    # execute_script runs the scripts of helpers/browser_scripts.py in python.
+    # The other scripts are not supported, except for window.open.
+    def execute_script(self, script: str, *args: Any) -> Any:
+        self.execute("executeScript")
+        try:
+            if script == FIND_MATCH_SCRIPT:
+                return self.__findMatch(*args)
+            if script == HIGHLIGHT_SCRIPT:
+                return None
+            if script == PREFLIGHT_SCRIPT:
+                return self.__preflight(*args)
+        except SelectorError as e:
+            raise JavascriptException("SyntaxError: {}".format(e))
+
+        window_open = _WINDOW_OPEN.search(script)
+        if window_open is not None:
+            self.__load(self.__openWindow(), window_open.group("url") or BLANK_PAGE)
+            return None
+        raise JavascriptException("the simulated browser can't run this script: {}".format(script[:80]))
+
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        self.execute("executeAsyncScript")
+        try:
+            if script == WAIT_FOR_SELECTOR_SCRIPT:
+                selector, timeout = args[0], args[1] / 1000
+                return self.__waitUntil(lambda: len(self.querySelectorAll(self.current.document, selector)) > 0, timeout)
+        except SelectorError as e:
+            raise JavascriptException("SyntaxError: {}".format(e))
+        # The fixtures are loaded at once, they are always complete and idle.
+        if script == READY_STATE_SCRIPT or script == NETWORK_IDLE_SCRIPT:
+            return True
+        raise JavascriptException("the simulated browser can't run this script: {}".format(script[:80]))
+
+
+    # __waitUntil checks the condition every millisecond, like the MutationObserver would react to the change.
+    def __waitUntil(self, condition: Callable[[], bool], timeout: float) -> bool:
+        if timeout > self.script_timeout:
+            raise TimeoutException("script timeout")
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+
+    # __preflight is PREFLIGHT_SCRIPT in python.
+    def __preflight(self, selectors: list[str]) -> list[dict]:
+        results = []
+        for selector in selectors:
+            result = {"selector": selector, "count": 0, "visible": 0, "error": ""}
+            try:
+                nodes = self.querySelectorAll(self.current.document, selector)
+            except SelectorError as e:
+                result["error"] = "SyntaxError: {}".format(e)
+                results.append(result)
+                continue
+            result["count"] = len(nodes)
+            result["visible"] = len([node for node in nodes if node.isDisplayed()])
+            results.append(result)
+        return results
+
+
+    # __findMatch is FIND_MATCH_SCRIPT in python.
+    def __findMatch(self, selector: str, html_attribute: str, value: str) -> dict:
+        nodes = self.querySelectorAll(self.current.document, selector)
+        result = {"count": len(nodes), "element": None, "candidates": [], "kind": ""}
+
+        def found(node: Node, kind: str) -> dict:
+            result["element"] = SimulatedElement(browser=self, node=node)
+            result["kind"] = kind
+            return result
+
+        if html_attribute == "":
+            result["kind"] = "text"
+            result["candidates"] = [SimulatedElement(browser=self, node=node) for node in nodes if node.mayHaveText(value)]
+            return result
+
+        attributes = [self.attributeOf(node, html_attribute) for node in nodes]
+        for node, attribute in zip(nodes, attributes):
+            if attribute == value:
+                return found(node, "strict")
+        for node, attribute in zip(nodes, attributes):
+            if attribute is not None and value in attribute:
+                return found(node, "partial")
+        return result
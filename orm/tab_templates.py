@@ -1,28 +1,96 @@
-from tkinter import ttk, simpledialog
+from tkinter import ttk, simpledialog, filedialog
 import tkinter as tk
 import threading
 from pathlib import Path
-import os
-import re
 import time
 import json
-from tqdm import tqdm
+from functools import partial
+import dataclasses
+import copy
+from typing import Callable
 
+from configs.automation_configs import (
+    METRICS_FOLDER,
+    RESULTS_FOLDER,
+    PacingMode,
+    ResumeMode,
+    RESUME_MODE,
+    STEP_TIMEOUT,
+)
 from configs.ui_configs import (
     ResultText,
+    FAILED_BG_COLOR,
+    SUCCESS_BG_COLOR,
+    TEMPLATE_BACKGROUND_PARSING,
+    TEMPLATE_AUTOSAVE_DELAY,
 )
+from helpers.cancellation import CancellationToken, Cancelled
+from helpers.data_source import iterRows
 from helpers.ui import StyledEntry
+from helpers.ui_bus import UIChannel, UIUpdateBus
 from orm.driver import Driver
+from orm.driver_pool import DriverPool
+from orm.execution_plan import (
+    ExecutionPlan,
+    PlanStep,
+)
+from orm.checkpoint import Checkpoint
+from orm.pacing import Pacing
+from orm.retry_policy import RetryPolicy
+from orm.schedule import Schedule
+from orm.scheduler import Scheduler, ScheduledJob
+from orm.template_autosave import TemplateAutosaver
+from orm.template_bundle import exportTemplates, importTemplates
+from orm.template_settings import TemplateSettings
+from orm.template_store import TemplateEntry, TemplateStore, openTemplateStore
+from orm.template_validator import TemplateValidationError, validateTemplate
+from orm.actions_history import ActionType
 from orm.scrollable_table import (
     Action,
+    HistoryActionRow,
     ScrollableActionTable,
+    rowKey,
 )
 
+# The keys of the UI updates posted to the Template's ui_bus.
+# Only the latest update of each key is applied on each frame.
+RESULT_LABEL_KEY = "result label"
+PROGRESS_KEY = "progress"
+REPEAT_COUNT_KEY = "repeat count"
+RUN_STATE_KEY = "run state"
+THROUGHPUT_KEY = "throughput"
+SCHEDULED_RUN_KEY = "scheduled run"
+PARSED_KEY = "parsed"
+
 class Template:
-    def __init__(self, master: ttk.Notebook, driver: Driver, name: str) -> None:
+    def __init__(
+            self,
+            master: ttk.Notebook,
+            driver_pool: DriverPool,
+            scheduler: Scheduler,
+            ui_bus: UIUpdateBus,
+            store: TemplateStore,
+            entry: TemplateEntry,
+            is_new: bool = False,
+            onChange: Callable[[], None] | None = None) -> None:
         self.master: ttk.Notebook = master
-        self.name: str = name
-        self.driver: Driver = driver
+        self.name: str = entry.name
+        # store is where the template is loaded from and saved to, entry is the template in that store.
+        # Only the result label is built right away, the rest of the tab is built when it's first opened or run, see ensureLoaded.
+        self.store: TemplateStore = store
+        self.entry: TemplateEntry = entry
+        self.__loaded: bool = False
+        # dirty tells us that the template was edited since its last save, onChange is called on each edit.
+        self.dirty: bool = False
+        self.onChange: Callable[[], None] | None = onChange
+        # __data is the parsed file, kept until the rows are built.
+        self.__data: dict[str, any] | None = None
+        # driver_pool leases the browser that this template runs on.
+        self.driver_pool: DriverPool = driver_pool
+        # scheduler starts this template on its schedule, if it has one.
+        self.scheduler: Scheduler = scheduler
+        self.schedule: Schedule | None = None
+        self.scheduled_job: ScheduledJob | None = None
         # continue_next_step hints us if the template is running or not.
         # True means that the Template is running.
         # False means that the Template is either terminated or not running.
@@ -51,9 +119,41 @@ class Template:
         self.middle_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
 
         # [1]
+        # The result label is built right away, it's where a template that fails to load tells why.
         self.result_label: tk.Label = tk.Label(master=self.top_frame, background="#e5e0df", height=1, padx=10, pady=10, text="Waiting for command")
         self.result_label.pack(padx=10, pady=10, fill="x")
 
+        # Until the tab is built, it only shows what the store knows about the template.
+        self.__placeholder: tk.Label | None = tk.Label(master=self.middle_frame, text=_placeholderText(entry=entry))
+        self.__placeholder.pack(padx=10, pady=10)
+
+        # cancellation is the token of the current run, urgentPause cancels it.
+        self.cancellation: CancellationToken = CancellationToken()
+        # delay is the delay of the template's file, it fills the delay entry when the tab is built.
+        self.__delay: str = "0"
+        # pacing is the wait between 2 steps, it's set in the template's JSON file.
+        self.pacing: Pacing = Pacing()
+        # resume_mode is where a failed repeat resumes from, it's set in the template's JSON file.
+        self.resume_mode: ResumeMode = RESUME_MODE
+        # data_file is the CSV/JSONL file that drives the run, set in the template's JSON file.
+        # Empty means the template runs its repeats with its own values.
+        self.data_file: str = ""
+
+        # ui_bus is how the worker threads change the UI of this template, through the bus shared by all the templates.
+        self.ui_bus: UIChannel = ui_bus.channel(onFailed=self.__onUpdateFailed)
+        # The rows of the last compiled plan, PlanStep.index points to this list.
+        self.__plan_rows: list[HistoryActionRow] = []
+
+        if is_new:
+            self.__build(actions=[])
+            self.__loaded = True
+
+
+    # __build builds the header's entries, the progress bar and the table with the rows of the actions.
+    def __build(self, actions: list[Action]) -> None:
+        self.__placeholder.destroy()
+        self.__placeholder = None
+
         # Frame for the the "Repeat count" entry and the Progress bar.
         progress_bar_frame: tk.Frame = tk.Frame(master=self.top_frame)
         progress_bar_frame.pack(fill="x", padx=10, pady=10)
@@ -75,156 +175,643 @@ class Template:
         tk.Label(master=progress_bar_frame, textvariable=self.delay_timer_variable, width=12, anchor=tk.E, ).grid(row=0, column=2, sticky=tk.W + tk.E)
         self.delay_timer_entry: ttk.Entry = StyledEntry(master=progress_bar_frame)
         self.delay_timer_entry.grid(row=0, column=3, sticky=tk.W, padx=5)
-        self.delay_timer_entry.insert(index=0, string="0")
+        # The delay of the file is not an edit, the trace is added after it.
+        self.__delay_variable: tk.StringVar = tk.StringVar(master=self.main_ui, value=self.__delay)
+        self.delay_timer_entry.configure(textvariable=self.__delay_variable)
+        self.__delay_variable.trace_add("write", lambda *_: self.markDirty())
 
         self.progress_percent = tk.IntVar()
         self.progress_bar: ttk.Progressbar = ttk.Progressbar(master=progress_bar_frame, orient=tk.HORIZONTAL, variable=self.progress_percent)
         self.progress_bar.grid(row=0, column=4, sticky=tk.W + tk.E)
 
-        self.delay_thread = threading.Event()
-
         # [2]
         # Now actually filling in the table of the middle_frame.
         self.action_table: ScrollableActionTable = ScrollableActionTable(
             master=self.middle_frame,
-            driver=self.driver,
+            driver_pool=self.driver_pool,
             result_label=self.result_label,
-            enable_add_row_button=True)
+            ui_bus=self.ui_bus,
+            lease_owner=self,
+            enable_add_row_button=True,
+            onChangeCallback=self.markDirty)
+        for action in actions:
+            self.action_table.addHistoryActionRow(action=action)
 
 
-    # retriggerAllRows rerun ALL the actions in the table in the sequential manner.
-    # retriggerAllRows takes a lot of time to execute so it needs to be put into a thread!
-    def retriggerAllRows(self) -> None:
-        # Reset the repeat count on the UI.
-        # And mark that this template is running.
-        self.repeat_count_label_variable.set("Repeat: 0/")
-        self.continue_next_step = True
-        self.repeat_count_entry.config(state="readonly")
-        self.delay_timer_entry.config(state="readonly")
-        self.action_table.add_row_button.config(state="disabled")
+    # compilePlan takes the snapshot of the table and the run settings.
+    # It reads the widgets, so it must be called from the UI thread.
+    def compilePlan(self) -> ExecutionPlan:
+        # Update current rows from the UI before taking the snapshot.
+        self.__plan_rows = list(self.action_table.rows)
+        for row in self.__plan_rows:
+            row.updateAction()
+
+        # Report all the mistakes of the template at once, before any browser work starts.
+        problems = validateTemplate(
+            actions=[row.action for row in self.__plan_rows],
+            repeat=self.repeat_count_entry.get(),
+            delay=self.delay_timer_entry.get(),
+            data_file=self.data_file)
+        for problem in problems:
+            print("template ({}) {}".format(self.name, problem))
+        errors = [problem for problem in problems if not problem.warning]
+        if len(errors) > 0:
+            raise TemplateValidationError(problems=errors)
+
+        return ExecutionPlan.compile(
+            actions=[row.action for row in self.__plan_rows],
+            repeat=self.repeat_count_entry.get(),
+            delay=self.delay_timer_entry.get(),
+            pacing=self.pacing,
+            resume_mode=self.resume_mode,
+            checkpoint=Checkpoint.load(template_key=self.entry.id),
+            data_file=self.data_file)
+
+
+    # executePlan reruns ALL the actions of the plan in the sequential manner.
+    # executePlan takes a lot of time to execute so it needs to be put into a thread!
+    # It never touches the widgets, all the UI changes are posted to the ui_bus.
+    # The token stops the run, including the sleep or the wait in progress, as soon as it's cancelled.
+    def executePlan(self, plan: ExecutionPlan, token: CancellationToken) -> None:
+        # Lease a browser for the whole run, so the other templates running at the same time
+        # won't drive the same window. If all browsers are busy, wait for our turn.
+        self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text=ResultText.WAITING_FOR_BROWSER))
+        try:
+            with self.driver_pool.lease(owner=self) as driver:
+                driver.metrics.reset()
+                try:
+                    if plan.data_file != "":
+                        self.__runRows(driver=driver, plan=plan, token=token)
+                    else:
+                        self.__runRepeats(driver=driver, plan=plan, token=token)
+                finally:
+                    self.__dumpMetrics(driver=driver)
+        except Exception as e:
+            # e is gone once the except block ends, so the text is made now, not when the bus applies it.
+            message = ResultText.FAILED.format(e)
+            self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text=message))
+        finally:
+            # Mark that this template is done running.
+            self.continue_next_step = False
+            self.ui_bus.post(RUN_STATE_KEY, self.__onRunFinished)
 
-        repeat = int(self.repeat_count_entry.get())
-        delay_timer = int(self.delay_timer_entry.get())
 
-        total_task_count = repeat * len(self.action_table.rows)
-        task_done_count = 0
-        for i in range(repeat):
-            if not self.continue_next_step:
-                self.result_label.configure(text="Paused")
+    # __runRepeats runs the whole plan repeat times on the leased driver.
+    # A run resumed from a checkpoint skips the repeats and the steps that are done already.
+    def __runRepeats(self, driver: Driver, plan: ExecutionPlan, token: CancellationToken) -> None:
+        total_task_count = plan.taskCount()
+        task_done_count = plan.taskDoneCount()
+        start_step = plan.start_step
+        if plan.start_repeat > 0 or start_step > 0:
+            print("{} resumes from the repeat {}, step {}".format(self.name, plan.start_repeat+1, start_step+1))
+
+        for i in range(plan.start_repeat, plan.repeat):
+            if not self.continue_next_step or token.isCancelled():
+                self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text="Paused"))
                 break
 
             success_attempt = False
-            for row in self.action_table.rows:
+            # next_checkpoint is where to resume if the run stops after this repeat.
+            next_checkpoint = plan.checkpoint(repeat=i+1, step=0)
+            for step in plan.steps[start_step:]:
+                self.ui_bus.post(rowKey(self.__plan_rows[step.index]), partial(self.__onStepStarted, step))
                 try:
-                    row.retriggerHistoryAction()
-                except Exception:
+                    # Each step gets its own deadline, cancelled with the run.
+                    step.action.executeAction(
+                        driver=driver,
+                        token=token.child(timeout=STEP_TIMEOUT),
+                        onRetry=partial(self.__onStepRetry, driver, step))
+                except Exception as e:
+                    driver.metrics.recordStep(step=self.__stepName(step), failed=True)
+                    self.ui_bus.post(rowKey(self.__plan_rows[step.index]), partial(self.__onStepFinished, step, "{}".format(e)))
                     success_attempt = False
+                    if isinstance(e, Cancelled) and token.isCancelled():
+                        # Paused in the middle of the step, the repeat isn't over yet.
+                        next_checkpoint = plan.checkpoint(repeat=i, step=step.index)
+                    else:
+                        next_checkpoint = plan.checkpoint(repeat=i+1, step=plan.resumeStep(failed_step=step))
                     break
                 else:
+                    driver.metrics.recordStep(step=self.__stepName(step), failed=False)
+                    self.ui_bus.post(rowKey(self.__plan_rows[step.index]), partial(self.__onStepFinished, step, ""))
                     success_attempt = True
                 finally:
                     task_done_count += 1
-                    self.progress_percent.set(int(100*task_done_count/total_task_count))
-                    # This retriggerAllRows process can be turned off by calling urgentPause.
-                    if not self.continue_next_step:
-                        break
-                    else:
-                        time.sleep(0.5)
+                    self.ui_bus.post(PROGRESS_KEY, partial(self.progress_percent.set, int(100*task_done_count/total_task_count)))
+
+                # This executePlan process can be turned off by calling urgentPause.
+                if not self.continue_next_step:
+                    if step.index+1 < len(plan.steps):
+                        success_attempt = False
+                        next_checkpoint = plan.checkpoint(repeat=i, step=step.index+1)
+                    break
+                try:
+                    self.__pace(driver=driver, plan=plan, step=step, token=token)
+                except Cancelled:
+                    if step.index+1 < len(plan.steps):
+                        success_attempt = False
+                        next_checkpoint = plan.checkpoint(repeat=i, step=step.index+1)
+                    break
+
+            start_step = next_checkpoint.step
+            self.__saveCheckpoint(plan=plan, checkpoint=next_checkpoint)
 
             # If the template executes properly from the beginning to the end,
             # let it sleep for a moment until its next turn.
-            if success_attempt and self.continue_next_step and delay_timer > 0:
-                update_frequency = 0.1
-                self.delay_thread.clear()
-                for _ in tqdm(range(int(delay_timer/update_frequency))):
-                    # Using delay_thread so I can interrupt this sleeping by calling an event
-                    # instead of killing thread forcefully.
-                    self.delay_thread.wait(timeout=update_frequency)
-                self.result_label.configure(text=ResultText.SUCCESS)
+            if success_attempt and self.continue_next_step and plan.delay > 0:
+                try:
+                    # A single timed wait, the token interrupts this sleeping instead of killing thread forcefully.
+                    print("{} waits {}s, next repeat at {}".format(self.name, plan.delay, time.strftime("%H:%M:%S", time.localtime(time.time()+plan.delay))))
+                    token.sleep(plan.delay)
+                except Cancelled:
+                    continue
+                self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text=ResultText.SUCCESS))
 
             # Update the retry attempt count on the UI after a cycle is done. 
-            self.repeat_count_label_variable.set("Repeat: {}/".format(i+1))
-                    
+            self.ui_bus.post(REPEAT_COUNT_KEY, partial(self.repeat_count_label_variable.set, "Repeat: {}/".format(i+1)))
+
+
+    # __runRows runs the steps once for each row of the plan's data file, filling the {column} placeholders of the actions.
+    # A failed row doesn't stop the run, the result of every row is written to a JSONL file in the RESULTS_FOLDER.
+    def __runRows(self, driver: Driver, plan: ExecutionPlan, token: CancellationToken) -> None:
+        Path(RESULTS_FOLDER).mkdir(parents=True, exist_ok=True)
+        results_filename = RESULTS_FOLDER + "/" + self.name + "_" + time.strftime("%Y%m%d_%H%M%S") + ".jsonl"
+        print("{} runs the rows of {}, the results are written to {}".format(self.name, plan.data_file, results_filename))
+
+        start = time.perf_counter()
+        done_count = 0
+        failed_count = 0
+        with open(results_filename, "w", encoding="utf8") as results:
+            for row_number, row in enumerate(iterRows(plan.data_file), start=1):
+                if not self.continue_next_step or token.isCancelled():
+                    self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text="Paused"))
+                    break
+
+                failed_step: PlanStep | None = None
+                failed_reason = ""
+                for step in plan.steps:
+                    self.ui_bus.post(rowKey(self.__plan_rows[step.index]), partial(self.__onStepStarted, step))
+                    try:
+                        step.action.withRow(row).executeAction(
+                            driver=driver,
+                            token=token.child(timeout=STEP_TIMEOUT),
+                            onRetry=partial(self.__onStepRetry, driver, step))
+                    except Exception as e:
+                        driver.metrics.recordStep(step=self.__stepName(step), failed=True)
+                        self.ui_bus.post(rowKey(self.__plan_rows[step.index]), partial(self.__onStepFinished, step, "{}".format(e)))
+                        failed_step = step
+                        failed_reason = "{}".format(e)
+                        break
+                    else:
+                        driver.metrics.recordStep(step=self.__stepName(step), failed=False)
+                        self.ui_bus.post(rowKey(self.__plan_rows[step.index]), partial(self.__onStepFinished, step, ""))
+                    finally:
+                        self.ui_bus.post(PROGRESS_KEY, partial(self.progress_percent.set, int(100*(step.index+1)/len(plan.steps))))
+
+                    try:
+                        if not self.continue_next_step:
+                            raise Cancelled("paused")
+                        self.__pace(driver=driver, plan=plan, step=step, token=token, row=row)
+                    except Cancelled as e:
+                        # The row isn't done if it's paused before its last step.
+                        next_step = plan.nextStep(step)
+                        if next_step is not None:
+                            failed_step = next_step
+                            failed_reason = "cancelled: {}".format(e)
+                        break
 
-        # Mark that this template is done running.
-        self.continue_next_step = False
+                # Write the result right away, so a crash keeps the results of the rows done so far.
+                results.write(json.dumps({
+                    "row": row_number,
+                    "success": failed_step is None,
+                    "failed_step": failed_step.index+1 if failed_step is not None else None,
+                    "failed_reason": failed_reason,
+                    "data": row,
+                }, ensure_ascii=False) + "\n")
+                results.flush()
+
+                done_count += 1
+                if failed_step is not None:
+                    failed_count += 1
+                rows_per_minute = done_count / max(time.perf_counter() - start, 1e-9) * 60
+                self.ui_bus.post(REPEAT_COUNT_KEY, partial(self.repeat_count_label_variable.set, "Row: {}/".format(row_number)))
+                self.ui_bus.post(THROUGHPUT_KEY, partial(
+                    self.result_label.configure,
+                    text=ResultText.ROWS_PROGRESS.format(done_count, failed_count, rows_per_minute)))
+
+        print("{} is done with {} rows ({} failed) in {:.1f}s".format(self.name, done_count, failed_count, time.perf_counter() - start))
+
+
+    # __stepName is how the step is named in the metrics.
+    def __stepName(self, step: PlanStep) -> str:
+        return "{}. {} {}".format(step.index+1, step.action.action_type, step.action.css).strip()
+
+
+    # __onStepRetry counts the retry and shows it on the UI, it's called from the worker thread.
+    def __onStepRetry(self, driver: Driver, step: PlanStep, retry: int, error: Exception) -> None:
+        driver.metrics.recordRetry(step=self.__stepName(step))
+        attempts = (step.action.retry or RetryPolicy()).attempts
+        self.ui_bus.post(RESULT_LABEL_KEY, partial(self.result_label.configure, text=ResultText.RETRYING.format(retry, attempts-1, error)))
+
+
+    # __saveCheckpoint keeps where the run resumes from, the finished runs have nothing to resume.
+    def __saveCheckpoint(self, plan: ExecutionPlan, checkpoint: Checkpoint) -> None:
+        if plan.resume_mode == ResumeMode.RESTART:
+            return
+        try:
+            if checkpoint.repeat >= plan.repeat:
+                Checkpoint.clear(template_key=self.entry.id)
+            else:
+                checkpoint.save(template_key=self.entry.id)
+        except Exception as e:
+            print("failed to save the checkpoint of {} due to: {}".format(self.name, e))
+
+
+    # __pace waits between the step and the next one, following the step's pacing.
+    # It raises Cancelled if the run is cancelled in the meantime.
+    # The row of the data-driven runs fills the placeholders of the next step's selector.
+    def __pace(self, driver: Driver, plan: ExecutionPlan, step: PlanStep, token: CancellationToken, row: dict[str, str] | None = None) -> None:
+        pacing = plan.pacingAfter(step)
+        match pacing.mode:
+            case PacingMode.NONE:
+                return
+            case PacingMode.FIXED:
+                if pacing.duration > 0:
+                    token.sleep(pacing.duration)
+            case PacingMode.UNTIL_READY:
+                next_step = plan.nextStep(step)
+                if next_step is None or not next_step.action.needCSS() or next_step.action.css == "":
+                    return
+                try:
+                    next_action = next_step.action if row is None else next_step.action.withRow(row)
+                    with driver.cancellable(token):
+                        driver.waitForSelector(selector=next_action.css)
+                except Exception as e:
+                    token.raiseIfCancelled()
+                    # The next step reports the missing element itself.
+                    print("the next step's element is not ready, continue anyway: ({})".format(e))
+
+
+    # __dumpMetrics writes the Driver's latency metrics of this run to the METRICS_FOLDER.
+    def __dumpMetrics(self, driver: Driver) -> None:
+        filename = METRICS_FOLDER + "/" + self.name + "_" + time.strftime("%Y%m%d_%H%M%S") + ".json"
+        try:
+            driver.metrics.dumpJSON(filename=filename)
+            print("Metrics of the run are saved to {}".format(filename))
+            for step, stats in driver.metrics.stepSummary().items():
+                print("unstable step {}: {} retries in {} runs, {} failed".format(step, stats["retries"], stats["runs"], stats["failed"]))
+        except Exception as e:
+            print("failed to save the metrics due to: {}".format(e))
+
+
+    # __planRow returns the row of the step if it's still in the table.
+    def __planRow(self, step: PlanStep) -> HistoryActionRow | None:
+        row = self.__plan_rows[step.index]
+        if row not in self.action_table.rows:
+            return None
+        return row
+
+
+    def __onStepStarted(self, step: PlanStep) -> None:
+        row = self.__planRow(step)
+        if row is not None:
+            row.markRunning()
+
+
+    def __onStepFinished(self, step: PlanStep, failed_reason: str) -> None:
+        row = self.__planRow(step)
+        if row is not None:
+            row.markResult(failed_reason=failed_reason)
+
+
+    def __onRunStarted(self, plan: ExecutionPlan) -> None:
+        # Reset the repeat count on the UI, a resumed run starts from its checkpoint.
+        self.repeat_count_label_variable.set("Repeat: {}/".format(plan.start_repeat))
+        self.repeat_count_entry.config(state="readonly")
+        self.delay_timer_entry.config(state="readonly")
+        self.action_table.add_row_button.config(state="disabled")
+
+
+    # __onUpdateFailed shows the error of a UI update that failed, instead of leaving the label as it was.
+    def __onUpdateFailed(self, error: Exception) -> None:
+        self.result_label.configure(background=FAILED_BG_COLOR, text=ResultText.FAILED.format(error))
+
+
+    def __onRunFinished(self) -> None:
         self.repeat_count_entry.config(state="normal")
         self.delay_timer_entry.config(state="normal")
         self.action_table.add_row_button.config(state="normal")
+        if self.scheduled_job is not None:
+            self.scheduler.runFinished(job=self.scheduled_job)
 
 
-    # run executes all the actions of the template one by one.
+    # run compiles the template and executes all the actions of the plan one by one.
     def run(self) -> None:
-        execution_thread = threading.Thread(target=self.retriggerAllRows)
+        if self.continue_next_step:
+            print("{} is running already".format(self.name))
+            return
+
+        try:
+            # A malformed file is reported like a malformed row, and the scheduler still hears about it.
+            self.ensureLoaded()
+            plan = self.compilePlan()
+        except Exception as e:
+            self.result_label.configure(background=FAILED_BG_COLOR, text=ResultText.FAILED.format(e))
+            # The scheduler still waits for this run to be over.
+            if self.scheduled_job is not None:
+                self.scheduler.runFinished(job=self.scheduled_job)
+            return
+
+        # Mark that this template is running.
+        self.continue_next_step = True
+        self.cancellation = CancellationToken()
+        self.__onRunStarted(plan=plan)
+        execution_thread = threading.Thread(target=self.executePlan, args=(plan, self.cancellation))
         execution_thread.start()
 
 
-    # urgentPause stops the template's execution after its current step is finished.
+    # urgentPause stops the template's execution right away,
+    # interrupting the step's sleep or wait and the delay timer if the template's waiting for its next turn.
     def urgentPause(self) -> None:
-        # self.result_label.
         if self.continue_next_step:
             self.continue_next_step = False
             self.result_label.configure(text=ResultText.PAUSE_NOTIFICATION)
-            time.sleep(0.125)
-            self.delay_thread.set() # Pause the delay timer if the template's waiting for its next turn.
+            self.cancellation.cancel(reason="paused")
+
+    
+    # armSchedule lets the scheduler start this template on its schedule.
+    def armSchedule(self) -> None:
+        if self.schedule is None or not self.schedule.enabled or self.scheduled_job is not None:
+            return
+        self.scheduled_job = self.scheduler.add(
+            name=self.name,
+            schedule=self.schedule,
+            # The scheduler's thread can't read the widgets, the run is started from the UI thread.
+            start=lambda: self.ui_bus.post(SCHEDULED_RUN_KEY, self.run),
+            isRunning=lambda: self.continue_next_step)
+
+
+    def disarmSchedule(self) -> None:
+        if self.scheduled_job is not None:
+            self.scheduler.remove(job=self.scheduled_job)
+            self.scheduled_job = None
+
+
+    # toggleSchedule enables or disables the template's schedule, it's saved with the template.
+    def toggleSchedule(self) -> None:
+        if self.schedule is None:
+            print("{} has no schedule, add a \"schedule\" to its JSON file first".format(self.name))
+            return
+        self.schedule = dataclasses.replace(self.schedule, enabled=not self.schedule.enabled)
+        self.markDirty()
+        if self.schedule.enabled:
+            self.armSchedule()
+        else:
+            self.disarmSchedule()
+            print("{} is not scheduled anymore".format(self.name))
+
+
+    # preflight checks the selectors of all the rows on the current page of the template's browser, in 1 call,
+    # so the broken ones are found at once instead of 1 ELEMENT_LOADING_TIMEOUT at a time by running the template.
+    # The placeholders are filled by the first row of the data file.
+    def preflight(self) -> None:
+        if self.continue_next_step:
+            print("{} is running, pause it before the preflight".format(self.name))
+            return
+        if not self.loadOrReport():
+            return
+
+        first_row: dict[str, str] | None = None
+        try:
+            if self.data_file != "":
+                first_row = next(iterRows(self.data_file), None)
+        except Exception as e:
+            self.result_label.configure(background=FAILED_BG_COLOR, text=ResultText.FAILED.format(e))
+            return
+
+        # The steps using each selector, so the same selector is checked only once.
+        steps_by_selector: dict[str, list[int]] = {}
+        for index, row in enumerate(self.action_table.rows):
+            row.updateAction()
+            action = row.action
+            if first_row is not None:
+                try:
+                    action = action.withRow(first_row)
+                except Exception as e:
+                    print("{} preflight skips step {} due to: {}".format(self.name, index+1, e))
+                    continue
+            selector = _selectorOf(action)
+            if selector != "":
+                steps_by_selector.setdefault(selector, []).append(index+1)
+
+        threading.Thread(target=self.__runPreflight, args=(steps_by_selector,)).start()
+
+
+    # __runPreflight sends all the selectors to the browser, in the worker thread.
+    def __runPreflight(self, steps_by_selector: dict[str, list[int]]) -> None:
+        self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text=ResultText.WAITING_FOR_BROWSER))
+        try:
+            with self.driver_pool.lease(owner=self) as driver:
+                results = driver.preflight(selectors=list(steps_by_selector))
+        except Exception as e:
+            message = ResultText.FAILED.format(e)
+            self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(background=FAILED_BG_COLOR, text=message))
+            return
+        if results is None:
+            self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(text=ResultText.PREFLIGHT_DRY_RUN))
+            return
+
+        not_found, hidden, invalid, many = 0, 0, 0, 0
+        print("{} preflight:".format(self.name))
+        for result in results:
+            if result["error"] != "":
+                invalid += 1
+                verdict = "invalid: {}".format(result["error"])
+            elif result["count"] == 0:
+                not_found += 1
+                verdict = "not found"
+            elif result["visible"] == 0:
+                hidden += 1
+                verdict = "hidden, {} element(s)".format(result["count"])
+            elif result["count"] > 1:
+                many += 1
+                verdict = "{} elements, {} visible, the first one is used".format(result["count"], result["visible"])
+            else:
+                verdict = "ok"
+            steps = ", ".join(str(step) for step in steps_by_selector[result["selector"]])
+            print("    step {}: ({}) {}".format(steps, result["selector"], verdict))
+
+        text = ResultText.PREFLIGHT.format(len(results), not_found, hidden, invalid, many)
+        background = FAILED_BG_COLOR if not_found + hidden + invalid > 0 else SUCCESS_BG_COLOR
+        self.ui_bus.post(RESULT_LABEL_KEY, lambda: self.result_label.configure(background=background, text=text))
+
+
+    # resetCheckpoint makes the next run start from the first repeat and the first step.
+    def resetCheckpoint(self) -> None:
+        if self.continue_next_step:
+            print("{} is running, pause it before resetting".format(self.name))
+            return
+        Checkpoint.clear(template_key=self.entry.id)
+        if self.__loaded:
+            self.repeat_count_label_variable.set("Repeat: 0/")
+            self.progress_percent.set(0)
 
     
-    # loadData reads data from the JSON file
-    # and fill up the template's delay data and fill up the table with rows.
-    def loadData(self, filename: str) -> None:
+    # parse reads the template's file and converts its settings, it's meant for a background thread.
+    # Only the converted settings are applied (on the UI thread), so the schedule is armed,
+    # the rows are still built when the tab is first opened.
+    def parse(self) -> None:
+        if self.__loaded:
+            return
         try:
-            with open(filename, "r") as f:
-                data: dict[str, any] = json.load(f)
-            self.delay_timer_entry.delete(0, tk.END)
-            self.delay_timer_entry.insert(index=0, string=data["delay"])
-            actions: list[dict] = data["actions"]
-
-            for action in actions:
-                # Closure problem with python...
-                pre_migrated_action = Action(**action)
-                pre_migrated_action.updateName()
-                self.action_table.addHistoryActionRow(action=pre_migrated_action)
-        except FileNotFoundError:
-            pass
+            data = self.__readData()
         except Exception as e:
-            raise(e)
-        pass
+            print("failed to parse the template ({}) due to: {}".format(self.entry.id, e))
+            return
+        settings = TemplateSettings.fromDict(data=data, source=self.name)
+        self.ui_bus.post(PARSED_KEY, partial(self.__onParsed, data, settings))
 
 
-    # save exports the template to json.
-    def save(self, filename: str) -> None:
-        print("Saving...")
+    def __onParsed(self, data: dict[str, any], settings: TemplateSettings) -> None:
+        # The tab could be opened while the file was being parsed.
+        if self.__loaded or self.__data is not None:
+            return
+        self.__data = data
+        self.__applySettings(settings=settings)
+        self.armSchedule()
+
+
+    # ensureLoaded parses the template's file if it's not parsed yet,
+    # then builds the rest of the tab and fills up the table with rows.
+    # The old files are migrated in memory, the file itself is only written by save.
+    # It raises if the file or one of its actions is malformed, the tab is then left as it was.
+    # It must be called from the UI thread.
+    def ensureLoaded(self) -> None:
+        if self.__loaded:
+            return
+        if self.__data is None:
+            self.__data = self.__readData()
+            self.__applySettings(settings=TemplateSettings.fromDict(data=self.__data, source=self.name))
+            self.armSchedule()
+
+        # Convert all the actions before building anything, so a malformed action doesn't leave half a table.
+        actions = [Action(**action) for action in self.__data["actions"]]
+        self.__build(actions=actions)
+        self.__loaded = True
+        self.__data = None
+
+
+    # loadOrReport is ensureLoaded for the UI callbacks, it shows the error on the result label instead of raising.
+    # It returns whether the template is loaded.
+    def loadOrReport(self) -> bool:
+        try:
+            self.ensureLoaded()
+            return True
+        except Exception as e:
+            print("failed to load the template ({}) due to: {}".format(self.name, e))
+            self.result_label.configure(background=FAILED_BG_COLOR, text=ResultText.FAILED.format(e))
+            return False
+
+
+    def __readData(self) -> dict[str, any]:
+        return self.store.read(entry=self.entry)
+
+
+    # __applySettings keeps the template's delay and its run settings, without the rows.
+    # It's only called before the tab is built, the delay fills the delay entry when it is.
+    # The settings are converted already, so nothing here can fail on a malformed file.
+    def __applySettings(self, settings: TemplateSettings) -> None:
+        self.__delay = settings.delay
+        self.pacing = settings.pacing
+        self.resume_mode = settings.resume_mode
+        self.schedule = settings.schedule
+        self.data_file = settings.data_file
+
+
+    # markDirty marks the template as edited, so it's saved by the next autosave.
+    def markDirty(self) -> None:
+        self.dirty = True
+        if self.onChange is not None:
+            self.onChange()
+
+
+    # snapshot exports the template for its store.
+    # It reads the widgets, so it must be called from the UI thread, the store can be written from any thread.
+    # It returns None if the template's file is not even parsed yet, so there's nothing to save.
+    def snapshot(self) -> dict[str, any] | None:
+        if not self.__loaded and self.__data is None:
+            return None
+
+        # The actions and the delay of a template that is not opened yet are still the ones of its file.
+        actions: list[Action | dict] = list(self.__data["actions"]) if not self.__loaded else []
+        delay = self.__delay
+        if self.__loaded:
+            # Update the edited rows from the UI and then
+            # extract a copy of the actions from all the rows, the runs keep changing the rows' actions.
+            for row in self.action_table.rows:
+                if row.dirty:
+                    row.updateAction()
+                    row.dirty = False
+                actions.append(copy.copy(row.action))
+            delay = self.delay_timer_entry.get()
 
-        # Update current rows from the UI and then
-        # extract actions from all the rows.
-        actions: list[Action] = []
-        for row in self.action_table.rows:
-            row.updateAction()
-            actions.append(row.action)
-        
         export_data: dict[str, any] = {
-            "delay": int(self.delay_timer_entry.get()),
+            "delay": int(delay),
+            "pacing": self.pacing,
+            "resume_mode": self.resume_mode.value,
+            "schedule": self.schedule,
+            "data_file": self.data_file,
             "actions": actions,
         }
 
-        # Extract actions from all the rows.
-        with open(filename, "w") as f:
-            json.dump(export_data, default=lambda o: o.encode(), indent=4, fp=f)
-        
-        print("Done saving...")
+        self.dirty = False
+        return export_data
+
+
+    # rename renames the template in its store, and moves its checkpoint if its ID changed with its name.
+    def rename(self, name: str) -> None:
+        old_id = self.entry.id
+        self.store.rename(entry=self.entry, name=name)
+        Checkpoint.move(keys={old_id: self.entry.id})
+        self.name = name
+
+
+# _placeholderText is what the tab of a template shows until it's opened, from the store's metadata only.
+def _placeholderText(entry: TemplateEntry) -> str:
+    if entry.row_count is None:
+        return "The actions are loaded when the tab is opened"
+    return "{} action(s), loaded when the tab is opened".format(entry.row_count)
+
+
+# _selectorOf returns the CSS selector that the action looks for, empty if it doesn't look for an element.
+def _selectorOf(action: Action) -> str:
+    if action.needCSS():
+        return action.css.strip()
+    if action.action_type == ActionType.CLICK_BY_NAME and action.name != "":
+        # The same selector as Driver.getElementByName waits for.
+        return '[name="{}"]'.format(action.name.replace("\\", "\\\\").replace('"', '\\"'))
+    return ""
 
 
 class TabTemplates:
-    def __init__(self, master: ttk.Notebook, driver: Driver) -> None:
+    def __init__(self, master: ttk.Notebook, driver_pool: DriverPool) -> None:
         self.master: ttk.Notebook = master
-        self.driver: Driver = driver
+        self.driver_pool: DriverPool = driver_pool
+        # scheduler starts the scheduled templates, for all the templates of this tab.
+        self.scheduler: Scheduler = Scheduler()
         
-        # Make the template folder if not exists.
-        self.history_folder = "./templates"
-        Path(self.history_folder).mkdir(parents=True, exist_ok=True)
+        # store is where the templates are saved, the template folder or the database of TEMPLATE_STORE.
+        self.store: TemplateStore = openTemplateStore()
+        # autosaver writes the edited templates to the store in the background.
+        self.autosaver: TemplateAutosaver = TemplateAutosaver(store=self.store)
+        self.__autosave_timer: str | None = None
 
         # main_ui contains everything of this tab.
         self.main_ui = tk.Frame(master=master)
+        # ui_bus is how the worker threads change the UI, it's shared by all the templates,
+        # so the UI wakes up UI_FRAME_RATE times per second however many templates there are.
+        # The import's thread adds the tabs of the imported templates through it too.
+        self.ui_bus: UIUpdateBus = UIUpdateBus(widget=self.main_ui)
         # templates contains all the templates that this tab is showing.
         self.templates: list[Template] = []
 
@@ -245,6 +832,15 @@ class TabTemplates:
         self.urgent_pause_button = tk.Button(master=self.top_frame, text="Pause", width="6", command=self.__urgentPauseTemplate)
         self.urgent_pause_button.pack(side=tk.LEFT)
 
+        self.reset_button = tk.Button(master=self.top_frame, text="Reset", width="6", command=self.__resetTemplate)
+        self.reset_button.pack(side=tk.LEFT)
+
+        self.schedule_button = tk.Button(master=self.top_frame, text="Schedule", width="8", command=self.__toggleScheduleTemplate)
+        self.schedule_button.pack(side=tk.LEFT)
+
+        self.preflight_button = tk.Button(master=self.top_frame, text="Preflight", width="8", command=self.__preflightTemplate)
+        self.preflight_button.pack(side=tk.LEFT)
+
         self.save_button = tk.Button(master=self.top_frame, text="Save", width="6", command=self.__saveCurrentTemplate)
         self.save_button.pack(side=tk.LEFT)
 
@@ -271,8 +867,11 @@ class TabTemplates:
         
         # self.debug_button.configure(command=enableDebug)
 
-        # self.export_button = tk.Button(master=self.top_frame, text="Export", width="6")
-        # self.export_button.pack(side=tk.RIGHT)
+        self.import_button = tk.Button(master=self.top_frame, text="Import", width="6", command=self.__importTemplates)
+        self.import_button.pack(side=tk.RIGHT)
+
+        self.export_button = tk.Button(master=self.top_frame, text="Export", width="6", command=self.__exportTemplates)
+        self.export_button.pack(side=tk.RIGHT)
 
         # [2] Setup the template zone for the middle_frame.
         self.template_tabs_control: ttk.Notebook = ttk.Notebook(master=self.middle_frame, padding=(0, 4, 0, 0))
@@ -288,6 +887,7 @@ class TabTemplates:
 
         # [2.2.] https://stackoverflow.com/questions/71859022/tkinter-notebook-create-new-tabs-by-clicking-on-a-plus-tab-like-every-web-brow
         self.template_tabs_control.bind(sequence="<<NotebookTabChanged>>", func=self.__onAddTabClick)
+        self.template_tabs_control.bind(sequence="<<NotebookTabChanged>>", func=self.__onTemplateSelected, add="+")
         add_new_tab_button = tk.Frame()
         self.template_tabs_control.add(child=add_new_tab_button, text="+")
 
@@ -302,17 +902,10 @@ class TabTemplates:
         if response is not None and response != "":
             # Change the name on the UI
             self.template_tabs_control.tab(self.template_tabs_control.select(), text=response)
-            # Then change the name of the file that stored the data.
+            # Then change the name in the store that keeps the data.
             current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
             current_template: Template = self.templates[current_tab_index]
-            
-            current_template_file_name = self.history_folder + "/" + str(current_tab_index) + "_" + current_template.name + ".json"
-            template_json_file = Path(current_template_file_name)
-            if template_json_file.is_file():
-                new_template_file_name = self.history_folder + "/" + str(current_tab_index) + "_" + response + ".json"
-                os.rename(current_template_file_name, new_template_file_name)
-            
-            current_template.name = response
+            current_template.rename(name=response)
 
     
     # __onAddTabClick checked if the users click on the <<New tab icon>> (aka the last tab).
@@ -329,12 +922,27 @@ class TabTemplates:
         if selected_tab == new_tab_icon:
             index = len(self.template_tabs_control.tabs()) - 1
             template_name = "Template {}".format(index + 1)
-            new_template = Template(master=self.template_tabs_control, driver=self.driver, name=template_name)
+            new_template = Template(
+                master=self.template_tabs_control,
+                driver_pool=self.driver_pool,
+                scheduler=self.scheduler,
+                ui_bus=self.ui_bus,
+                store=self.store,
+                entry=self.store.newEntry(name=template_name, position=index),
+                is_new=True,
+                onChange=self.__onTemplateChanged)
             self.template_tabs_control.insert(index, child=new_template.main_ui, text=new_template.name)
             self.template_tabs_control.select(index)
             self.templates.append(new_template)
 
     
+    # __onTemplateSelected builds the rows of the selected template the first time its tab is opened.
+    def __onTemplateSelected(self, _: tk.Event) -> None:
+        current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
+        if current_tab_index < len(self.templates):
+            self.templates[current_tab_index].loadOrReport()
+
+
     # __runTemplate run all the actions of the selected template.
     def __runTemplate(self) -> None:
         current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
@@ -349,44 +957,179 @@ class TabTemplates:
         current_template.urgentPause()
 
 
+    # __resetTemplate forgets where the selected template should resume from.
+    def __resetTemplate(self) -> None:
+        current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
+        current_template: Template = self.templates[current_tab_index]
+        current_template.resetCheckpoint()
+
+
+    # __toggleScheduleTemplate enables or disables the schedule of the selected template.
+    def __toggleScheduleTemplate(self) -> None:
+        current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
+        current_template: Template = self.templates[current_tab_index]
+        current_template.toggleSchedule()
+
+
+    # __preflightTemplate checks the selectors of the selected template on the current page.
+    def __preflightTemplate(self) -> None:
+        current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
+        current_template: Template = self.templates[current_tab_index]
+        current_template.preflight()
+
+
+    # __onTemplateChanged restarts the autosave timer on every edit,
+    # so a burst of edits is saved once, TEMPLATE_AUTOSAVE_DELAY seconds after the last one.
+    def __onTemplateChanged(self) -> None:
+        if TEMPLATE_AUTOSAVE_DELAY <= 0:
+            return
+        if self.__autosave_timer is not None:
+            self.main_ui.after_cancel(self.__autosave_timer)
+        self.__autosave_timer = self.main_ui.after(int(TEMPLATE_AUTOSAVE_DELAY*1000), self.__saveAll)
+
+
+    # __saveTemplate takes the snapshot of the template and hands it to the autosaver, so it returns right away.
+    def __saveTemplate(self, template: Template) -> None:
+        try:
+            data = template.snapshot()
+        except Exception as e:
+            print("failed to save {} due to: {}".format(template.name, e))
+            return
+        if data is None:
+            return
+        # The template is saved again by the next autosave if the write fails.
+        self.autosaver.submit(entry=template.entry, data=data, onFailed=lambda _: setattr(template, "dirty", True))
+
+
     # __saveCurrentTemplate exports the current selected template to json.
     def __saveCurrentTemplate(self) -> None:
         # TODO [19]: Duplicated template's name won't crash the saving process.
-        # It can be done by exporting this into dict (map ID -> actual Template)
-        # ID will be the diffentiator now.
-        # Though, that'll make the import feature kinda annoying, because I'll need to merge 2 json files.
+        # The SQLite store (TEMPLATE_STORE) already keys the templates by ID, this is only left for the JSON store.
         current_tab_index: int = self.template_tabs_control.index(self.template_tabs_control.select())
         current_template: Template = self.templates[current_tab_index]
-        
-        filename = self.history_folder + "/" + str(current_tab_index) + "_" + current_template.name + ".json"
-        current_template.save(filename=filename)
+        self.__syncPositions()
+        self.__saveTemplate(template=current_template)
 
 
-    # __saveAll traverse through all the templates, updates, and saves all of them. 
+    # __saveAll traverse through all the templates, and saves the edited ones.
     def __saveAll(self) -> None:
-        for i in range(len(self.templates)):
-            template = self.templates[i]
-            filename = self.history_folder + "/" + str(i) + "_" + template.name + ".json"
-            template.save(filename=filename)
+        self.__autosave_timer = None
+        self.__syncPositions()
+        for template in self.templates:
+            if template.dirty:
+                self.__saveTemplate(template=template)
+
+
+    # __syncPositions moves every template whose position in the store is not the index of its tab,
+    # edited or not, before the edited ones are saved.
+    # Otherwise an edited template saved at its tab's index could overwrite the file of a clean template still at that position.
+    def __syncPositions(self) -> None:
+        entries = [template.entry for template in self.templates]
+        if all(entry.position == index for index, entry in enumerate(entries)):
+            return
+        old_ids = [entry.id for entry in entries]
+        try:
+            self.store.reorder(entries=entries)
+            # The IDs of the JSON store are the file names, the checkpoints follow them.
+            Checkpoint.move(keys={old_id: entry.id for old_id, entry in zip(old_ids, entries)})
+        except Exception as e:
+            print("failed to move the templates to the positions of their tabs due to: {}".format(e))
+
+
+    # __exportTemplates writes all the templates to a bundle file, in the background.
+    def __exportTemplates(self) -> None:
+        filename = filedialog.asksaveasfilename(
+            title="Export the templates",
+            defaultextension=".jsonl",
+            filetypes=[("Template bundle", "*.jsonl")])
+        if not filename:
+            return
+        # Export the latest edits too.
+        self.__saveAll()
+
+        def export() -> None:
+            try:
+                self.autosaver.flush()
+                count = exportTemplates(store=self.store, filename=filename)
+                print("exported {} templates to {}".format(count, filename))
+            except Exception as e:
+                print("failed to export the templates due to: {}".format(e))
+
+        threading.Thread(target=export, daemon=True).start()
+
+
+    # __importTemplates adds the templates of a bundle file after the current ones, in the background.
+    # The templates that do the same as an existing one are skipped.
+    def __importTemplates(self) -> None:
+        filename = filedialog.askopenfilename(
+            title="Import the templates",
+            filetypes=[("Template bundle", "*.jsonl")])
+        if not filename:
+            return
+        # Compare the bundle to the latest edits too.
+        self.__saveAll()
+        position = len(self.templates)
+
+        def load() -> None:
+            try:
+                self.autosaver.flush()
+                entries, skipped, rejected = importTemplates(store=self.store, filename=filename, position=position)
+            except Exception as e:
+                print("failed to import the templates due to: {}".format(e))
+                return
+            print("imported {} templates from {}, skipped {} duplicates, rejected {} damaged ones".format(len(entries), filename, skipped, rejected))
+            self.ui_bus.post(("imported", id(entries)), partial(self.__addTemplateTabs, entries))
+
+        threading.Thread(target=load, daemon=True).start()
+
+
+    # __addTemplateTabs adds the tabs of the templates already in the store, before the <<New tab icon>>.
+    def __addTemplateTabs(self, entries: list[TemplateEntry]) -> None:
+        for entry in entries:
+            template = Template(
+                master=self.template_tabs_control,
+                driver_pool=self.driver_pool,
+                scheduler=self.scheduler,
+                ui_bus=self.ui_bus,
+                store=self.store,
+                entry=entry,
+                onChange=self.__onTemplateChanged)
+            self.template_tabs_control.insert(len(self.templates), child=template.main_ui, text=template.name)
+            self.templates.append(template)
+
+
+    # close stops the scheduler, saves the edited templates and waits for the pending saves, before the app exits.
+    def close(self) -> None:
+        # No scheduled run can start while the app is closing.
+        self.scheduler.close()
+        self.__saveAll()
+        self.autosaver.close()
+        self.store.close()
 
 
     # load pulls all the templates from the previous attempts and put them to the screen.
+    # It only reads the list of the store, the migrated templates are written on their next save.
     def load(self) -> None:
-        filename_regex = "[0-9+]_(.*).json"
-        
-        for file in os.listdir(self.history_folder):
-            file_name = os.fsdecode(file)
-            template_name = re.search(pattern=filename_regex, string=file_name).group(1)
-            
+        # The tabs are made from the entries only, each template reads its actions when its tab is opened.
+        for entry in self.store.entries():
             template = Template(
                 master=self.template_tabs_control,
-                driver=self.driver,
-                name=template_name)
-            template.loadData(filename=self.history_folder + "/" + file_name)
+                driver_pool=self.driver_pool,
+                scheduler=self.scheduler,
+                ui_bus=self.ui_bus,
+                store=self.store,
+                entry=entry,
+                onChange=self.__onTemplateChanged)
             self.template_tabs_control.add(child=template.main_ui, text=template.name)
             self.templates.append(template)
 
-            # After loading, save all to commit all the change for the migration.
-            # This step can be removed after everyone has moved to the new version.
-            print("Saving for migration")
-            self.__saveAll()
+        if TEMPLATE_BACKGROUND_PARSING:
+            threading.Thread(target=self.__parseAll, args=(list(self.templates),), daemon=True).start()
+
+
+    # __parseAll reads the files of the templates one by one, on a background thread.
+    def __parseAll(self, templates: list[Template]) -> None:
+        start = time.perf_counter()
+        for template in templates:
+            template.parse()
+        print("parsed {} templates in {:.3f}s".format(len(templates), time.perf_counter() - start))
@@ -0,0 +1,70 @@
+from typing import Any, Callable
+import threading
+
+from orm.template_store import TemplateEntry, TemplateStore
+
+class TemplateAutosaver:
+    def __init__(self, store: TemplateStore) -> None:
+        """
+        TemplateAutosaver writes the snapshots of the templates to their store on a background thread,
+        so saving never blocks the UI, even with hundreds of large templates.
+        If a template is submitted again before its previous snapshot is written,
+        only the latest snapshot is written.
+        """
+        self.store: TemplateStore = store
+        self.__condition = threading.Condition()
+        # __pending are the snapshots waiting to be written, by the id of their entry.
+        self.__pending: dict[int, tuple[TemplateEntry, dict[str, Any], Callable[[Exception], None]]] = {}
+        self.__writing: bool = False
+        self.__closed: bool = False
+        self.__thread = threading.Thread(target=self.__loop, daemon=True)
+        self.__thread.start()
+
+
+    # submit queues the snapshot of the template, replacing its pending snapshot if there's one.
+    # onFailed is called from the writer's thread if the snapshot can't be written.
+    def submit(self, entry: TemplateEntry, data: dict[str, Any], onFailed: Callable[[Exception], None]) -> None:
+        with self.__condition:
+            if self.__closed:
+                raise Exception("the autosave is closed")
+            self.__pending[id(entry)] = (entry, data, onFailed)
+            self.__condition.notify_all()
+
+
+    def __loop(self) -> None:
+        while True:
+            with self.__condition:
+                while len(self.__pending) == 0 and not self.__closed:
+                    self.__condition.wait()
+                if len(self.__pending) == 0:
+                    return
+                pending = self.__pending
+                self.__pending = {}
+                self.__writing = True
+
+            for entry, data, onFailed in pending.values():
+                try:
+                    if self.store.write(entry=entry, data=data):
+                        print("{} is saved".format(entry.name))
+                except Exception as e:
+                    print("failed to save {} due to: {}".format(entry.name, e))
+                    onFailed(e)
+
+            with self.__condition:
+                self.__writing = False
+                self.__condition.notify_all()
+
+
+    # flush waits until every submitted snapshot is written, e.g. before exporting the store.
+    def flush(self) -> None:
+        with self.__condition:
+            while len(self.__pending) > 0 or self.__writing:
+                self.__condition.wait()
+
+
+    # close writes the pending snapshots and stops the writer's thread.
+    def close(self) -> None:
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__thread.join()
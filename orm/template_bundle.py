@@ -0,0 +1,128 @@
+from typing import Any, Iterator
+import hashlib
+import json
+
+from orm.actions_history import Action
+from orm.template_file import TEMPLATE_VERSION, migrateTemplate
+from orm.template_store import TemplateEntry, TemplateStore
+
+# BUNDLE_VERSION is the version of the bundle format written by exportTemplates.
+BUNDLE_VERSION = 1
+
+# A bundle is a JSONL file, 1 record per line, so it's written and read as a stream
+# and only 1 template is in memory at a time, however many templates the bundle has:
+#
+#   {"type": "bundle", "version": 1, "template_version": 2}
+#   {"type": "template", "name": "Login", "hash": "...", "action_count": 2, "settings": {"delay": 0, ...}}
+#   {"type": "action", "action": {"action_type": "Input", "css": "#user", ...}}
+#   {"type": "action", "action": {"action_type": "Click", "css": "#submit", ...}}
+#   {"type": "template", ...}
+
+
+# contentHash is the hash of what the template does: its settings and its actions,
+# without its name, its position and the results of its last run.
+def contentHash(data: dict[str, Any]) -> str:
+    # Go through Action and the json, so an old file missing the newer fields of Action
+    # and the same template saved by this version have the same hash.
+    actions = [action if isinstance(action, Action) else Action(**action) for action in data["actions"]]
+    template: dict[str, Any] = json.loads(json.dumps({**data, "actions": actions}, default=lambda o: o.encode()))
+    template.pop("version", None)
+    actions = template.pop("actions")
+    for action in actions:
+        action.pop("failed_reason", None)
+    content = json.dumps({"settings": template, "actions": actions}, sort_keys=True)
+    return hashlib.sha256(content.encode("utf8")).hexdigest()
+
+
+# exportTemplates writes all the templates of the store to the bundle, and returns how many there are.
+def exportTemplates(store: TemplateStore, filename: str) -> int:
+    count = 0
+    with open(filename, "w", encoding="utf8") as f:
+        f.write(json.dumps({"type": "bundle", "version": BUNDLE_VERSION, "template_version": TEMPLATE_VERSION}) + "\n")
+        for entry in store.entries():
+            data = store.read(entry=entry)
+            settings = {key: value for key, value in data.items() if key not in ("version", "actions")}
+            f.write(json.dumps({
+                "type": "template",
+                "name": entry.name,
+                "hash": contentHash(data),
+                "action_count": len(data["actions"]),
+                "settings": settings,
+            }, default=lambda o: o.encode()) + "\n")
+            for action in data["actions"]:
+                f.write(json.dumps({"type": "action", "action": action}, default=lambda o: o.encode()) + "\n")
+            count += 1
+    return count
+
+
+# iterBundle reads the templates of the bundle one by one,
+# as (name, template's json migrated to TEMPLATE_VERSION, whether the template still matches the hash of its header).
+# The hash is checked before the migration, like it was computed by the export. A template without a hash isn't checked.
+def iterBundle(filename: str) -> Iterator[tuple[str, dict[str, Any], bool]]:
+    with open(filename, "r", encoding="utf8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("type") != "bundle":
+            raise Exception("({}) is not a template bundle".format(filename))
+        if header.get("version", 0) > BUNDLE_VERSION:
+            raise Exception("bundle ({}) has the version {}, this app only reads up to {}".format(filename, header.get("version"), BUNDLE_VERSION))
+        template_version = header.get("template_version", 1)
+
+        template: dict[str, Any] | None = None
+
+        def finish(line_number: int) -> tuple[str, dict[str, Any], bool]:
+            if len(template["data"]["actions"]) != template["action_count"]:
+                raise Exception("template ({}) before line {} of ({}) has {} actions instead of {}".format(
+                    template["name"], line_number, filename, len(template["data"]["actions"]), template["action_count"]))
+            intact = template["hash"] == "" or template["hash"] == contentHash(template["data"])
+            return template["name"], migrateTemplate(data=template["data"], source="{} ({})".format(filename, template["name"])), intact
+
+        line_number = 1
+        for line in f:
+            line_number += 1
+            if line.strip() == "":
+                continue
+            record: dict[str, Any] = json.loads(line)
+            match record.get("type"):
+                case "template":
+                    if template is not None:
+                        yield finish(line_number)
+                    template = {
+                        "name": record["name"],
+                        "hash": record.get("hash", ""),
+                        "action_count": record["action_count"],
+                        "data": {**record["settings"], "version": template_version, "actions": []},
+                    }
+                case "action":
+                    if template is None:
+                        raise Exception("action without template at line {} of ({})".format(line_number, filename))
+                    template["data"]["actions"].append(record["action"])
+                case _:
+                    raise Exception("unknown record ({}) at line {} of ({})".format(record.get("type"), line_number, filename))
+        if template is not None:
+            yield finish(line_number + 1)
+
+
+# importTemplates adds the templates of the bundle to the store, after its last position,
+# skipping the ones that do the same as a template already in the store (or earlier in the bundle),
+# and rejecting the ones that don't match their hash anymore, e.g. a truncated or hand-edited bundle.
+# It returns the entries of the imported templates, the number of skipped ones and the number of rejected ones.
+def importTemplates(store: TemplateStore, filename: str, position: int) -> tuple[list[TemplateEntry], int, int]:
+    known_hashes: set[str] = {contentHash(store.read(entry=entry)) for entry in store.entries()}
+    imported: list[TemplateEntry] = []
+    skipped = 0
+    rejected = 0
+    for name, data, intact in iterBundle(filename=filename):
+        if not intact:
+            print("reject the template ({}), it doesn't match its hash, the bundle is damaged or edited".format(name))
+            rejected += 1
+            continue
+        content_hash = contentHash(data)
+        if content_hash in known_hashes:
+            print("skip the template ({}), the same template is already there".format(name))
+            skipped += 1
+            continue
+        entry = store.newEntry(name=name, position=position + len(imported))
+        store.write(entry=entry, data=data)
+        known_hashes.add(content_hash)
+        imported.append(entry)
+    return imported, skipped, rejected
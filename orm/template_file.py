@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import Any, Callable
+import json
+import os
+
+from orm.actions_history import Action
+
+# TEMPLATE_VERSION is the version of the template's json written by this app.
+# Bump it and add a migration to _MIGRATIONS when the format changes.
+#   1: the files saved before the version existed, with the old action names (see Action.updateName).
+#   2: the "version" field.
+TEMPLATE_VERSION = 2
+
+
+# _migrateFrom1 renames the old action types, like the migration that used to rewrite all the files on startup.
+def _migrateFrom1(data: dict[str, Any]) -> None:
+    for action in data.get("actions", []):
+        migrated = Action(**action)
+        migrated.updateName()
+        action["action_type"] = migrated.action_type
+
+
+# _MIGRATIONS[version] upgrades the template's json from that version to the next one, in place.
+_MIGRATIONS: dict[int, Callable[[dict[str, Any]], None]] = {
+    1: _migrateFrom1,
+}
+
+
+# migrateTemplate upgrades the template's json to TEMPLATE_VERSION in memory, it never touches the file.
+# The migrated template is written on its next save.
+def migrateTemplate(data: dict[str, Any], source: str = "") -> dict[str, Any]:
+    version = data.get("version", 1)
+    if version > TEMPLATE_VERSION:
+        raise Exception("template ({}) has the version {}, this app only reads up to {}".format(source, version, TEMPLATE_VERSION))
+
+    if version < TEMPLATE_VERSION:
+        print("migrating template ({}) from version {} to {}".format(source, version, TEMPLATE_VERSION))
+    while version < TEMPLATE_VERSION:
+        _MIGRATIONS[version](data)
+        version += 1
+    data["version"] = TEMPLATE_VERSION
+    return data
+
+
+# readTemplateFile reads the template's json, migrated to TEMPLATE_VERSION.
+def readTemplateFile(filename: str) -> dict[str, Any]:
+    with open(filename, "r") as f:
+        data: dict[str, Any] = json.load(f)
+    return migrateTemplate(data=data, source=filename)
+
+
+# encodeTemplate returns the json of the template, as it's written to the file.
+def encodeTemplate(data: dict[str, Any]) -> str:
+    return json.dumps({"version": TEMPLATE_VERSION, **data}, default=lambda o: o.encode(), indent=4)
+
+
+# writeTemplateFile writes the template's json only if it's different from the file,
+# and tells us if it did.
+# The json is written to a temporary file first, so a crash in the middle of a save never leaves half a template.
+def writeTemplateFile(filename: str, data: dict[str, Any]) -> bool:
+    content = encodeTemplate(data=data)
+    file = Path(filename)
+    if file.is_file() and file.read_text() == content:
+        return False
+    temporary_file = Path(filename + ".tmp")
+    temporary_file.write_text(content)
+    os.replace(temporary_file, file)
+    return True
@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from configs.automation_configs import ResumeMode, RESUME_MODE
+from orm.pacing import Pacing
+from orm.schedule import Schedule
+
+@dataclass(frozen=True)
+class TemplateSettings:
+    """
+    TemplateSettings are the run settings of a template's json, without its actions.
+    They're converted and checked where the json is read, e.g. on the background parsing thread,
+    so the UI thread only copies plain values into the template.
+
+    :delay: str: the text of the delay entry.
+    :data_file: str: the CSV/JSONL file that drives the run, empty for none.
+    """
+    delay: str = "0"
+    pacing: Pacing = field(default_factory=Pacing)
+    resume_mode: ResumeMode = RESUME_MODE
+    schedule: Schedule | None = None
+    data_file: str = ""
+
+
+    # fromDict converts the settings of the template's json.
+    # A malformed setting is reported and left to its default, so it never stops the template from loading.
+    @staticmethod
+    def fromDict(data: dict[str, Any], source: str = "") -> "TemplateSettings":
+        # The templates saved before the pacing existed keep the old fixed pause.
+        converters: dict[str, Callable[[Any], Any]] = {
+            "delay": lambda value: str(int(value)),
+            "pacing": lambda value: Pacing.fromDict(value) or Pacing(),
+            "resume_mode": ResumeMode,
+            "schedule": Schedule.fromDict,
+            "data_file": lambda value: "" if value is None else str(value),
+        }
+        settings: dict[str, Any] = {}
+        for key, convert in converters.items():
+            if key not in data:
+                continue
+            try:
+                settings[key] = convert(data[key])
+            except Exception as e:
+                print("template ({}) has an invalid {} ({}), the default is used due to: {}".format(source, key, data[key], e))
+        return TemplateSettings(**settings)
@@ -0,0 +1,276 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+from configs.automation_configs import (
+    TEMPLATE_DATABASE,
+    TEMPLATE_FOLDER,
+    TEMPLATE_STORE,
+    TemplateStoreKind,
+)
+from orm.template_file import (
+    TEMPLATE_VERSION,
+    encodeTemplate,
+    migrateTemplate,
+    readTemplateFile,
+    writeTemplateFile,
+)
+
+@dataclass
+class TemplateEntry:
+    """
+    TemplateEntry is what the store knows about a template without reading its actions,
+    enough to make its tab.
+
+    :id: str: the stable ID of the template in its store, the file name for the JSON store.
+    :position: int: the index of the template's tab.
+    :row_count: int | None: the number of actions, None if the store doesn't know it without reading the template.
+    """
+    id: str
+    name: str
+    position: int
+    row_count: int | None = None
+
+
+# The empty template, for the template that is not saved yet.
+def _emptyTemplate() -> dict[str, Any]:
+    return {"version": TEMPLATE_VERSION, "delay": 0, "actions": []}
+
+
+class JSONTemplateStore:
+    def __init__(self, folder: str) -> None:
+        """
+        JSONTemplateStore keeps each template in its own "<position>_<name>.json" file of the folder.
+        The file name is the template's ID, so it changes when the template is renamed or moved.
+
+        It's safe to use from any thread.
+        """
+        self.folder: str = folder
+        self.__lock = threading.Lock()
+        Path(self.folder).mkdir(parents=True, exist_ok=True)
+
+
+    def __filename(self, name: str, position: int) -> str:
+        return self.folder + "/" + str(position) + "_" + name + ".json"
+
+
+    # entries lists the templates from their file names only, in the order of their position.
+    def entries(self) -> list[TemplateEntry]:
+        filename_regex = "^([0-9]+)_(.*)\\.json$"
+        entries: list[TemplateEntry] = []
+        for file in os.listdir(self.folder):
+            file_name = os.fsdecode(file)
+            match = re.search(pattern=filename_regex, string=file_name)
+            if match is None:
+                continue
+            entries.append(TemplateEntry(id=self.folder + "/" + file_name, name=match.group(2), position=int(match.group(1))))
+        entries.sort(key=lambda entry: (entry.position, entry.name))
+        return entries
+
+
+    def newEntry(self, name: str, position: int) -> TemplateEntry:
+        return TemplateEntry(id=self.__filename(name=name, position=position), name=name, position=position, row_count=0)
+
+
+    # read returns the template's json, migrated to TEMPLATE_VERSION.
+    def read(self, entry: TemplateEntry) -> dict[str, Any]:
+        try:
+            with self.__lock:
+                return readTemplateFile(filename=entry.id)
+        except FileNotFoundError:
+            return _emptyTemplate()
+
+
+    # write saves the template if it changed, and tells us if it did.
+    # If the template moved to another position, its old file is removed.
+    def write(self, entry: TemplateEntry, data: dict[str, Any]) -> bool:
+        with self.__lock:
+            filename = self.__filename(name=entry.name, position=entry.position)
+            written = writeTemplateFile(filename=filename, data=data)
+            if entry.id != filename and Path(entry.id).is_file():
+                os.remove(entry.id)
+            entry.id = filename
+            entry.row_count = len(data["actions"])
+            return written
+
+
+    def rename(self, entry: TemplateEntry, name: str) -> None:
+        with self.__lock:
+            filename = self.__filename(name=name, position=entry.position)
+            if Path(entry.id).is_file():
+                os.rename(entry.id, filename)
+            entry.id = filename
+            entry.name = name
+
+
+    # reorder moves the templates to their index in the list, by renaming the files of the ones that moved.
+    # The files are moved aside first, so a template never overwrites the file of another one that is moving too.
+    def reorder(self, entries: list[TemplateEntry]) -> None:
+        with self.__lock:
+            moving = [(position, entry) for position, entry in enumerate(entries) if entry.id != self.__filename(name=entry.name, position=position)]
+            moved_aside: list[tuple[str, str]] = []
+            for position, entry in moving:
+                if Path(entry.id).is_file():
+                    os.replace(entry.id, entry.id + ".moving")
+                    moved_aside.append((entry.id + ".moving", self.__filename(name=entry.name, position=position)))
+            for moving_file, filename in moved_aside:
+                os.replace(moving_file, filename)
+            for position, entry in moving:
+                entry.id = self.__filename(name=entry.name, position=position)
+                entry.position = position
+
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteTemplateStore:
+    def __init__(self, filename: str) -> None:
+        """
+        SQLiteTemplateStore keeps all the templates in 1 SQLite database.
+        Each template has a stable ID, so 2 templates can have the same name,
+        and its actions are stored 1 row per action, so a save only rewrites the actions that changed.
+        Every write is 1 transaction, a crash keeps either the old or the new template, never a mix.
+        Listing, reordering or renaming the templates never reads the actions.
+
+        It's safe to use from any thread.
+        """
+        self.filename: str = filename
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        self.__lock = threading.Lock()
+        # The background parsing reads from another thread, the lock serializes the access.
+        self.__connection = sqlite3.connect(filename, check_same_thread=False)
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        with self.__connection:
+            self.__connection.executescript("""
+                CREATE TABLE IF NOT EXISTS templates (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    settings TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS templates_by_position ON templates (position);
+                CREATE INDEX IF NOT EXISTS templates_by_name ON templates (name);
+                CREATE TABLE IF NOT EXISTS actions (
+                    template_id TEXT NOT NULL REFERENCES templates (id) ON DELETE CASCADE,
+                    step INTEGER NOT NULL,
+                    action TEXT NOT NULL,
+                    PRIMARY KEY (template_id, step)
+                ) WITHOUT ROWID;
+            """)
+
+
+    def entries(self) -> list[TemplateEntry]:
+        with self.__lock:
+            rows = self.__connection.execute("SELECT id, name, position, row_count FROM templates ORDER BY position, name").fetchall()
+        return [TemplateEntry(id=row[0], name=row[1], position=row[2], row_count=row[3]) for row in rows]
+
+
+    def newEntry(self, name: str, position: int) -> TemplateEntry:
+        return TemplateEntry(id=uuid.uuid4().hex, name=name, position=position, row_count=0)
+
+
+    # read returns the template's json, migrated to TEMPLATE_VERSION.
+    def read(self, entry: TemplateEntry) -> dict[str, Any]:
+        with self.__lock:
+            template = self.__connection.execute("SELECT version, settings FROM templates WHERE id = ?", (entry.id,)).fetchone()
+            if template is None:
+                return _emptyTemplate()
+            actions = self.__connection.execute("SELECT action FROM actions WHERE template_id = ? ORDER BY step", (entry.id,)).fetchall()
+
+        data: dict[str, Any] = json.loads(template[1])
+        data["version"] = template[0]
+        data["actions"] = [json.loads(action[0]) for action in actions]
+        return migrateTemplate(data=data, source="{} ({})".format(self.filename, entry.name))
+
+
+    # write saves the template in 1 transaction if it changed, and tells us if it did.
+    # Only the actions that changed are rewritten.
+    def write(self, entry: TemplateEntry, data: dict[str, Any]) -> bool:
+        # Go through the json, so the stored template is exactly what the JSON store would write.
+        template: dict[str, Any] = json.loads(encodeTemplate(data=data))
+        version: int = template.pop("version")
+        actions = [json.dumps(action, sort_keys=True) for action in template.pop("actions")]
+        settings = json.dumps(template, sort_keys=True)
+        # The keys are sorted, so the same template read back and written again has the same hash.
+        content_hash = hashlib.sha256("\n".join([str(version), settings, *actions]).encode("utf8")).hexdigest()
+
+        with self.__lock, self.__connection:
+            stored = self.__connection.execute("SELECT name, position, content_hash FROM templates WHERE id = ?", (entry.id,)).fetchone()
+            if stored == (entry.name, entry.position, content_hash):
+                return False
+
+            self.__connection.execute(
+                """INSERT INTO templates (id, name, position, version, settings, row_count, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET name = excluded.name, position = excluded.position, version = excluded.version,
+                settings = excluded.settings, row_count = excluded.row_count, content_hash = excluded.content_hash""",
+                (entry.id, entry.name, entry.position, version, settings, len(actions), content_hash))
+
+            stored_actions = dict(self.__connection.execute("SELECT step, action FROM actions WHERE template_id = ?", (entry.id,)).fetchall())
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO actions (template_id, step, action) VALUES (?, ?, ?)",
+                [(entry.id, step, action) for step, action in enumerate(actions) if stored_actions.get(step) != action])
+            self.__connection.execute("DELETE FROM actions WHERE template_id = ? AND step >= ?", (entry.id, len(actions)))
+        entry.row_count = len(actions)
+        return True
+
+
+    # rename only changes the name, the template's actions are not touched.
+    def rename(self, entry: TemplateEntry, name: str) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute("UPDATE templates SET name = ? WHERE id = ?", (name, entry.id))
+        entry.name = name
+
+
+    # reorder moves the templates to their index in the list, the rest of their data is not touched.
+    # The templates that are not saved yet only get their new position.
+    def reorder(self, entries: list[TemplateEntry]) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "UPDATE templates SET position = ? WHERE id = ?",
+                [(position, entry.id) for position, entry in enumerate(entries)])
+        for position, entry in enumerate(entries):
+            entry.position = position
+
+
+    # importFrom copies the templates of another store, e.g. the JSON templates into a new database.
+    def importFrom(self, store: "TemplateStore") -> int:
+        count = 0
+        for entry in store.entries():
+            self.write(entry=self.newEntry(name=entry.name, position=entry.position), data=store.read(entry=entry))
+            count += 1
+        return count
+
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
+
+
+TemplateStore = JSONTemplateStore | SQLiteTemplateStore
+
+
+# openTemplateStore opens the store picked by TEMPLATE_STORE.
+# A new database starts with a copy of the JSON templates.
+def openTemplateStore() -> TemplateStore:
+    json_store = JSONTemplateStore(folder=TEMPLATE_FOLDER)
+    if TEMPLATE_STORE == TemplateStoreKind.JSON:
+        return json_store
+
+    store = SQLiteTemplateStore(filename=TEMPLATE_DATABASE)
+    if len(store.entries()) == 0:
+        count = store.importFrom(store=json_store)
+        if count > 0:
+            print("imported {} templates from {} into {}".format(count, TEMPLATE_FOLDER, TEMPLATE_DATABASE))
+    return store
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+import re
+
+from helpers.data_source import PLACEHOLDER_REGEX, iterRows, placeholderColumns
+from helpers.dom import SelectorError, UnsupportedSelectorError, compileSelector
+from orm.actions_history import Action, ActionType
+
+# The action types that executeAction knows how to run.
+RUNNABLE_ACTION_TYPES = [
+    ActionType.TEXT_INPUT,
+    ActionType.CLICK_BY_NAME,
+    ActionType.CLICK_BY_SELECTOR,
+    ActionType.CLICK_BY_VALUE,
+    ActionType.SELECT_DROPDOWN,
+    ActionType.SWITCH_TAB,
+    ActionType.SLEEP,
+]
+
+# HTML_ATTRIBUTE_REGEX is what an HTML attribute name can be.
+HTML_ATTRIBUTE_REGEX = re.compile(r"^[^\s\"'>/=]+$")
+
+
+@dataclass(frozen=True)
+class ValidationProblem:
+    """
+    ValidationProblem is 1 mistake found in a template before it runs.
+
+    :step: int | None: the step (starting from 1) with the mistake, None for the template's settings.
+    :warning: bool: the warnings are only printed, the template still runs.
+    """
+    step: int | None
+    message: str
+    warning: bool = False
+
+
+    def __str__(self) -> str:
+        where = "template" if self.step is None else "step {}".format(self.step)
+        return "{}{}: {}".format("warning, " if self.warning else "", where, self.message)
+
+
+class TemplateValidationError(Exception):
+    def __init__(self, problems: list[ValidationProblem]) -> None:
+        """TemplateValidationError carries all the problems of the template, not only the first one."""
+        self.problems: list[ValidationProblem] = problems
+        super().__init__("{} problem(s): {}".format(len(problems), "; ".join(str(problem) for problem in problems)))
+
+
+# validateTemplate checks the whole template without a browser, and returns all its problems at once.
+def validateTemplate(actions: list[Action], repeat: str, delay: str, data_file: str = "") -> list[ValidationProblem]:
+    problems: list[ValidationProblem] = []
+    if not repeat.strip().isdigit():
+        problems.append(ValidationProblem(step=None, message="repeat count must be a number, got ({})".format(repeat)))
+    if not delay.strip().isdigit():
+        problems.append(ValidationProblem(step=None, message="delay must be a number, got ({})".format(delay)))
+    if len(actions) == 0:
+        problems.append(ValidationProblem(step=None, message="the template has no action", warning=True))
+
+    # The columns of the data file, None if there's no data file to check the placeholders against.
+    columns: list[str] | None = None
+    if data_file != "":
+        try:
+            first_row = next(iterRows(data_file), None)
+            columns = list(first_row.keys()) if first_row is not None else []
+            if first_row is None:
+                problems.append(ValidationProblem(step=None, message="data file ({}) has no row".format(data_file), warning=True))
+        except Exception as e:
+            problems.append(ValidationProblem(step=None, message="can't read the data file ({}): {}".format(data_file, e)))
+
+    for index, action in enumerate(actions):
+        problems.extend(validateAction(action=action, step=index+1, data_file=data_file, columns=columns))
+    return problems
+
+
+# validateAction checks 1 action against the rules of needCSS, needValue, needHTMLAttribute and executeAction.
+def validateAction(action: Action, step: int, data_file: str = "", columns: list[str] | None = None) -> list[ValidationProblem]:
+    problems: list[ValidationProblem] = []
+    if action.action_type == "":
+        return [ValidationProblem(step=step, message="no action is selected, the step does nothing", warning=True)]
+    if action.action_type not in RUNNABLE_ACTION_TYPES:
+        return [ValidationProblem(step=step, message="unknown action ({})".format(action.action_type))]
+
+    # The placeholders are filled by the rows of the data file.
+    # Without a data file, a {word} is just text, like before the data files existed.
+    if data_file != "" and columns is not None:
+        for field, text in (("name", action.name), ("CSS selector", action.css), ("HTML attribute", action.html_attribute), ("value", action.value)):
+            for column in placeholderColumns(text):
+                if column not in columns:
+                    problems.append(ValidationProblem(step=step, message="{} uses the column ({}) that is not in the data file".format(field, column)))
+    # Check the rest as if the placeholders were filled.
+    def filled(text: str) -> str:
+        if data_file == "":
+            return text
+        return PLACEHOLDER_REGEX.sub(lambda match: "x" if match.group(1) is not None else match.group(0)[0], text)
+
+    if action.needName() and action.name.strip() == "":
+        problems.append(ValidationProblem(step=step, message="name is expected for the {} action".format(action.action_type)))
+
+    if action.needCSS():
+        if action.css.strip() == "":
+            problems.append(ValidationProblem(step=step, message="CSS selector is expected for the {} action".format(action.action_type)))
+        else:
+            # compileSelector only knows a part of CSS (no escapes like "#\31 23", no attribute flags, no namespaces),
+            # so a selector it rejects is only a warning, the browser's querySelectorAll decides (see the preflight).
+            try:
+                compileSelector(filled(action.css))
+            except UnsupportedSelectorError as e:
+                problems.append(ValidationProblem(step=step, message="CSS selector ({}) can't be checked: {}".format(action.css, e), warning=True))
+            except SelectorError as e:
+                problems.append(ValidationProblem(step=step, message="CSS selector ({}) may be invalid: {}".format(action.css, e), warning=True))
+
+    if action.needHTMLAttribute() and action.html_attribute != "" and not HTML_ATTRIBUTE_REGEX.match(filled(action.html_attribute)):
+        problems.append(ValidationProblem(step=step, message="HTML attribute ({}) is not a valid attribute name".format(action.html_attribute)))
+
+    if action.needValue():
+        value = filled(action.value)
+        if value == "":
+            problems.append(ValidationProblem(step=step, message="value is expected for the {} action".format(action.action_type)))
+        elif action.action_type == ActionType.SWITCH_TAB and not value.isdigit():
+            problems.append(ValidationProblem(step=step, message="value for switching tab must be a number, got ({})".format(action.value)))
+        elif action.action_type == ActionType.SLEEP:
+            try:
+                if float(value) < 0:
+                    raise ValueError()
+            except ValueError:
+                problems.append(ValidationProblem(step=step, message="value for waiting must be a positive number of seconds, got ({})".format(action.value)))
+    return problems
@@ -0,0 +1,152 @@
+import math
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from configs.automation_configs import BROWSER_WAIT_SLICE
+from helpers.cancellation import CancellationToken
+from orm.driver import Driver
+from orm.simulated_driver import SimulatedWebDriver
+
+PAGE = """
+<html><body>
+    <button class="b" style="display: none">Log in</button>
+    <button class="b" data-role="sign-in-button">Log <i style="display:none">hidden</i>in</button>
+    <button class="b" data-role="login">  Log   in  </button>
+    <button class="b"><span>Log</span><br>in</button>
+    <button class="b" data-role="login-secondary">Sign up</button>
+    <div class="card"><p>Total</p><p>42</p></div>
+</body></html>
+"""
+
+
+def newDriver(in_browser_lookup: bool) -> Driver:
+    driver = Driver(
+        dry_run=False,
+        high_light_mode=False,
+        in_browser_lookup=in_browser_lookup,
+        element_loading_timeout=0.2,
+        web_driver=SimulatedWebDriver(fixtures={"page": PAGE}))
+    driver.goto("page")
+    return driver
+
+
+def elementKey(element) -> str:
+    return "{}:{}".format(element.tag_name, element.get_attribute("data-role"))
+
+
+@pytest.mark.parametrize("selector, value", [
+    ("button", "Log in"),
+    ("button", "Log\nin"),
+    ("button", "Sign up"),
+    (".card", "Total\n42"),
+    ("p", "42"),
+])
+def test_text_lookup_matches_the_python_loop(selector: str, value: str) -> None:
+    in_browser = newDriver(in_browser_lookup=True).getElementByValue(selector=selector, value=value)
+    python_loop = newDriver(in_browser_lookup=False).getElementByValue(selector=selector, value=value)
+    assert python_loop is not None
+    assert elementKey(in_browser) == elementKey(python_loop)
+    assert in_browser.text == value
+
+
+@pytest.mark.parametrize("html_attribute, value, expected", [
+    # The strict pass wins over an earlier partial match.
+    ("data-role", "login", "button:login"),
+    ("data-role", "sign-in", "button:sign-in-button"),
+    ("data-role", "secondary", "button:login-secondary"),
+])
+def test_attribute_lookup_matches_the_python_loop(html_attribute: str, value: str, expected: str) -> None:
+    for in_browser_lookup in (True, False):
+        driver = newDriver(in_browser_lookup=in_browser_lookup)
+        element = driver.getByAttribute(selector="button", html_attribute=html_attribute, value=value)
+        assert elementKey(element) == expected
+
+
+def test_text_lookup_raises_when_nothing_matches() -> None:
+    with pytest.raises(Exception, match="not found"):
+        newDriver(in_browser_lookup=True).getElementByValue(selector="button", value="Log out")
+
+
+@pytest.mark.parametrize("token", [None, CancellationToken()])
+def test_polling_after_the_observer_only_gets_the_rest_of_the_timeout(token: CancellationToken | None) -> None:
+    driver = newDriver(in_browser_lookup=False)
+    driver.element_loading_timeout = 0.5
+    browser = driver.driver
+    wait = browser.execute_async_script
+
+    # The button shows up late, then it's gone before it's looked up.
+    def slowWait(script, *args):
+        time.sleep(0.3)
+        return wait(script, *args)
+
+    def gone(*args, **kwargs):
+        raise NoSuchElementException("gone")
+
+    browser.execute_async_script = slowWait
+    browser.find_element = gone
+
+    start = time.perf_counter()
+    with driver.cancellable(token):
+        with pytest.raises(Exception, match="not found"):
+            driver.getElementByCSS(selector="button")
+    assert time.perf_counter() - start < 0.5 + 0.2
+
+
+def test_text_lookup_only_reads_the_text_of_the_candidates() -> None:
+    browser = SimulatedWebDriver(fixtures={"page": "<ul>{}</ul>".format("".join("<li>Item {}</li>".format(i) for i in range(100)))})
+    driver = Driver(dry_run=False, high_light_mode=False, in_browser_lookup=True, element_loading_timeout=0.2, web_driver=browser)
+    driver.goto("page")
+
+    commands_before = browser.command_count
+    element = driver.getElementByValue(selector="li", value="Item 99")
+    assert element.text == "Item 99"
+    # 1 wait, 1 script and the text of the few candidates, instead of 1 command per item.
+    assert browser.command_count - commands_before < 10
+
+
+def test_wait_in_browser_is_sliced_until_its_deadline() -> None:
+    browser = SimulatedWebDriver(fixtures={"page": "<p>page</p>"})
+    driver = Driver(dry_run=False, high_light_mode=False, element_loading_timeout=10, web_driver=browser)
+    driver.goto("page")
+
+    calls: list[int] = []
+    wait = browser.execute_async_script
+    browser.execute_async_script = lambda script, *args: calls.append(args[-1]) or wait(script, *args)
+
+    # The step's deadline ends the wait, with 1 call per slice and no empty slice at the end.
+    with driver.cancellable(CancellationToken(timeout=0.5)):
+        with pytest.raises(Exception):
+            driver.getElementByCSS(selector="#missing")
+    assert len(calls) <= math.ceil(0.5 / BROWSER_WAIT_SLICE) + 1
+    assert all(timeout > 0 for timeout in calls)
+
+
+def test_pause_stops_the_wait_in_browser() -> None:
+    browser = SimulatedWebDriver(fixtures={"page": "<p>page</p>"})
+    driver = Driver(dry_run=False, high_light_mode=False, element_loading_timeout=30, web_driver=browser)
+    driver.goto("page")
+
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel, kwargs={"reason": "paused"}).start()
+    start = time.perf_counter()
+    with driver.cancellable(token):
+        with pytest.raises(Exception):
+            driver.getElementByCSS(selector="#missing")
+    # At most 1 slice after the pause, instead of the whole element timeout.
+    assert time.perf_counter() - start < 0.1 + BROWSER_WAIT_SLICE + 0.1
+
+
+def test_switch_tab_switches_even_if_the_tab_changed_behind_the_driver() -> None:
+    browser = SimulatedWebDriver(fixtures={"page": "<p>page</p>"})
+    driver = Driver(dry_run=False, high_light_mode=False, web_driver=browser)
+    driver.switchTab(0)
+    driver.executeScript("window.open('page')")
+    first_tab, second_tab = browser.window_handles
+
+    # The page (or the user) moves to the other tab.
+    browser.switch_to.window(second_tab)
+    driver.switchTab(0)
+    assert browser.current_window_handle == first_tab
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from orm.driver import Driver
+from orm.driver_pool import DriverPool
+from orm.simulated_driver import SimulatedWebDriver
+
+
+# Owner stands for a Template, the owners are weakly referenced by the pool.
+class Owner:
+    pass
+
+
+def test_closing_the_current_tab_keeps_the_browser_alive() -> None:
+    browser = SimulatedWebDriver(fixtures={"page": "<p>page</p>"})
+    driver = Driver(dry_run=False, high_light_mode=False, web_driver=browser)
+    browser.execute_script("window.open('page')")
+    browser.close()
+    assert driver.isAlive()
+
+    browser.quit()
+    assert not driver.isAlive()
+
+
+def test_pool_keeps_a_browser_whose_template_closed_its_tab() -> None:
+    browser = SimulatedWebDriver(fixtures={"page": "<p>page</p>"})
+    pool = DriverPool(size=1, dry_run=False, high_light_mode=False, web_driver=browser)
+    with pool.lease() as driver:
+        browser.execute_script("window.open('page')")
+        browser.close()
+        first_driver = driver
+
+    with pool.lease() as driver:
+        assert driver is first_driver
+
+
+def test_pool_replaces_a_crashed_browser() -> None:
+    pool = DriverPool(size=1, dry_run=False, high_light_mode=False, web_driver=SimulatedWebDriver())
+    with pool.lease() as driver:
+        driver.driver.quit()
+        crashed_driver = driver
+
+    # The next browser is a new Driver, even if it's given the same (simulated) WebDriver.
+    pool.driver_options["web_driver"] = SimulatedWebDriver()
+    with pool.lease() as driver:
+        assert driver is not crashed_driver
+        assert driver.isAlive()
+
+
+def test_pool_replaces_a_browser_that_crashed_while_idle() -> None:
+    pool = DriverPool(size=1, dry_run=False, high_light_mode=False, web_driver=SimulatedWebDriver())
+    with pool.lease() as driver:
+        idle_driver = driver
+    idle_driver.driver.quit()
+
+    pool.driver_options["web_driver"] = SimulatedWebDriver()
+    with pool.lease() as driver:
+        assert driver is not idle_driver
+        assert driver.isAlive()
+
+
+def test_pool_gives_the_owner_its_last_browser_back() -> None:
+    pool = DriverPool(size=2, dry_run=True, high_light_mode=False)
+    template, other_template = Owner(), Owner()
+    with pool.lease(owner=template) as first_driver:
+        with pool.lease(owner=other_template) as second_driver:
+            assert second_driver is not first_driver
+
+    # The last released browser is the default pick, the owner gets its own back instead.
+    with pool.lease(owner=template) as driver:
+        assert driver is first_driver
+    with pool.lease(owner=other_template) as driver:
+        assert driver is second_driver
+
+
+def test_owner_waits_for_its_browser_while_another_lease_holds_it() -> None:
+    pool = DriverPool(size=2, dry_run=True, high_light_mode=False)
+    template = Owner()
+    with pool.lease(owner=template) as template_driver:
+        pass
+
+    leased: list = []
+    with pool.lease() as driver:
+        assert driver is template_driver
+        thread = threading.Thread(target=lambda: leased.append(pool.acquire(owner=template)))
+        thread.start()
+        time.sleep(0.1)
+        assert leased == []
+    thread.join(timeout=1)
+    assert leased == [template_driver]
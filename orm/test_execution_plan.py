@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import pytest
+
+import orm.checkpoint
+from configs.automation_configs import ResumeMode
+from orm.actions_history import Action, ActionType
+from orm.checkpoint import Checkpoint
+from orm.execution_plan import ExecutionPlan, stepsHash
+from orm.pacing import Pacing
+
+
+def newActions(count: int, restart_point: int | None = None) -> list[Action]:
+    return [
+        Action(action_type=ActionType.CLICK_BY_SELECTOR, name="", css="#step{}".format(i), html_attribute="", value="", restart_point=i == restart_point)
+        for i in range(count)
+    ]
+
+
+def compilePlan(actions: list[Action], resume_mode: ResumeMode, checkpoint: Checkpoint | None, repeat: str = "5") -> ExecutionPlan:
+    return ExecutionPlan.compile(actions=actions, repeat=repeat, delay="0", pacing=Pacing(), resume_mode=resume_mode, checkpoint=checkpoint)
+
+
+# PLAN_HASH is the hash of the 4 steps of newActions.
+PLAN_HASH = stepsHash(newActions(4))
+
+
+def test_the_run_resumes_from_the_checkpoint() -> None:
+    plan = compilePlan(newActions(4), ResumeMode.FAILED_STEP, Checkpoint(repeat=2, step=3, step_count=4, plan_hash=PLAN_HASH))
+    assert (plan.start_repeat, plan.start_step) == (2, 3)
+    assert plan.taskDoneCount() == 2*4 + 3
+    assert plan.taskCount() == 5*4
+    assert plan.checkpoint(repeat=3, step=0) == Checkpoint(repeat=3, step=0, step_count=4, plan_hash=PLAN_HASH)
+
+
+def test_a_step_edited_since_the_checkpoint_starts_over() -> None:
+    actions = newActions(4)
+    actions[2].css = "#edited"
+    # Same number of steps, but not the same steps.
+    plan = compilePlan(actions, ResumeMode.FAILED_STEP, Checkpoint(repeat=2, step=3, step_count=4, plan_hash=PLAN_HASH))
+    assert (plan.start_repeat, plan.start_step) == (0, 0)
+
+
+def test_the_result_of_the_last_run_does_not_change_the_plan_hash() -> None:
+    actions = newActions(4)
+    actions[1].failed_reason = "not found"
+    assert stepsHash(actions) == PLAN_HASH
+
+
+@pytest.mark.parametrize("resume_mode, checkpoint", [
+    # The restart mode never resumes.
+    (ResumeMode.RESTART, Checkpoint(repeat=2, step=3, step_count=4, plan_hash=PLAN_HASH)),
+    # The template changed since the checkpoint.
+    (ResumeMode.FAILED_STEP, Checkpoint(repeat=2, step=3, step_count=5, plan_hash=PLAN_HASH)),
+    # The checkpoint is older than the plan hash.
+    (ResumeMode.FAILED_STEP, Checkpoint(repeat=2, step=3, step_count=4)),
+    # All the repeats are done already.
+    (ResumeMode.FAILED_STEP, Checkpoint(repeat=5, step=0, step_count=4, plan_hash=PLAN_HASH)),
+    (ResumeMode.FAILED_STEP, None),
+])
+def test_the_run_starts_over_without_a_usable_checkpoint(resume_mode: ResumeMode, checkpoint: Checkpoint | None) -> None:
+    plan = compilePlan(newActions(4), resume_mode, checkpoint)
+    assert (plan.start_repeat, plan.start_step) == (0, 0)
+
+
+@pytest.mark.parametrize("resume_mode, failed_step, expected", [
+    (ResumeMode.RESTART, 3, 0),
+    (ResumeMode.FAILED_STEP, 3, 3),
+    (ResumeMode.RESTART_POINT, 3, 1),
+    (ResumeMode.RESTART_POINT, 1, 1),
+    # No restart point before the failed step.
+    (ResumeMode.RESTART_POINT, 0, 0),
+])
+def test_resume_step(resume_mode: ResumeMode, failed_step: int, expected: int) -> None:
+    plan = compilePlan(newActions(4, restart_point=1), resume_mode, None)
+    assert plan.resumeStep(failed_step=plan.steps[failed_step]) == expected
+
+
+def test_the_plan_keeps_its_own_copy_of_the_actions() -> None:
+    actions = newActions(2)
+    plan = compilePlan(actions, ResumeMode.RESTART, None)
+    actions[0].css = "#edited"
+    assert plan.steps[0].action.css == "#step0"
+
+
+def test_checkpoint_survives_a_restart(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(orm.checkpoint, "CHECKPOINT_FOLDER", str(tmp_path))
+    checkpoint = Checkpoint(repeat=1, step=2, step_count=3, plan_hash=PLAN_HASH)
+    assert Checkpoint.load(template_key="templates/0_T.json") is None
+
+    checkpoint.save(template_key="templates/0_T.json")
+    assert Checkpoint.load(template_key="templates/0_T.json") == checkpoint
+
+    Checkpoint.clear(template_key="templates/0_T.json")
+    assert Checkpoint.load(template_key="templates/0_T.json") is None
+
+
+def test_2_templates_with_the_same_name_have_their_own_checkpoint(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(orm.checkpoint, "CHECKPOINT_FOLDER", str(tmp_path))
+    Checkpoint(repeat=1, step=0, step_count=3).save(template_key="templates/0_T.json")
+    Checkpoint(repeat=2, step=0, step_count=3).save(template_key="templates/1_T.json")
+    assert Checkpoint.load(template_key="templates/0_T.json").repeat == 1
+    assert Checkpoint.load(template_key="templates/1_T.json").repeat == 2
+
+
+def test_checkpoints_move_with_their_templates(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(orm.checkpoint, "CHECKPOINT_FOLDER", str(tmp_path))
+    Checkpoint(repeat=1, step=0, step_count=3).save(template_key="0_T.json")
+    Checkpoint(repeat=2, step=0, step_count=3).save(template_key="1_T.json")
+
+    # The 2 templates swap their positions, each one takes the old ID of the other.
+    Checkpoint.move(keys={"0_T.json": "1_T.json", "1_T.json": "0_T.json"})
+    assert Checkpoint.load(template_key="0_T.json").repeat == 2
+    assert Checkpoint.load(template_key="1_T.json").repeat == 1
+
+    Checkpoint.move(keys={"1_T.json": "1_U.json"})
+    assert Checkpoint.load(template_key="1_T.json") is None
+    assert Checkpoint.load(template_key="1_U.json").repeat == 1
+
+
+def test_a_broken_checkpoint_is_ignored(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(orm.checkpoint, "CHECKPOINT_FOLDER", str(tmp_path))
+    Path(Checkpoint.filename(template_key="T")).write_text("{not json")
+    assert Checkpoint.load(template_key="T") is None
@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+import threading
+import time
+
+import pytest
+
+from configs.automation_configs import BackoffCurve, RETRY_MAX_INTERVAL
+from helpers.cancellation import CancellationToken, Cancelled
+from orm.actions_history import Action, ActionType
+from orm.retry_policy import RetryPolicy
+
+
+class FlakyDriver:
+    """FlakyDriver fails the first clicks, and counts the clicks and the refreshes."""
+    def __init__(self, failures: int) -> None:
+        self.dry_run: bool = False
+        self.failures: int = failures
+        self.clicks: int = 0
+        self.refreshes: int = 0
+
+
+    @contextmanager
+    def cancellable(self, _: CancellationToken | None):
+        yield
+
+
+    def clickByCSS(self, selector: str) -> None:
+        self.clicks += 1
+        if self.clicks <= self.failures:
+            raise Exception("not found element by css ({})".format(selector))
+
+
+    def refresh(self) -> None:
+        self.refreshes += 1
+
+
+def newAction(retry: dict | None, skippable: bool = False) -> Action:
+    return Action(action_type=ActionType.CLICK_BY_SELECTOR, name="", css="#submit", html_attribute="", value="", retry=retry, skippable=skippable)
+
+
+@pytest.mark.parametrize("backoff, expected", [
+    (BackoffCurve.CONSTANT, [2, 2, 2, 2]),
+    (BackoffCurve.LINEAR, [2, 4, 6, 8]),
+    (BackoffCurve.EXPONENTIAL, [2, 4, 8, 16]),
+])
+def test_delay_follows_the_backoff_curve(backoff: BackoffCurve, expected: list[float]) -> None:
+    policy = RetryPolicy(attempts=5, backoff=backoff, interval=2)
+    assert [policy.delay(retry) for retry in range(1, 5)] == expected
+
+
+def test_delay_is_capped() -> None:
+    assert RetryPolicy(backoff=BackoffCurve.EXPONENTIAL, interval=1).delay(retry=100) == RETRY_MAX_INTERVAL
+
+
+def test_from_dict_round_trip() -> None:
+    policy = RetryPolicy(attempts=3, backoff=BackoffCurve.LINEAR, interval=0.5, refresh=True)
+    assert RetryPolicy.fromDict(policy.encode()) == policy
+    assert RetryPolicy.fromDict(None) is None
+
+
+@pytest.mark.parametrize("data", [
+    {"attempts": 0},
+    {"backoff": "random"},
+    {"interval": -1},
+])
+def test_from_dict_rejects_invalid_policies(data: dict) -> None:
+    with pytest.raises(Exception):
+        RetryPolicy.fromDict(data)
+
+
+def test_the_step_succeeds_after_its_retries() -> None:
+    driver = FlakyDriver(failures=2)
+    retries: list[int] = []
+    action = newAction(retry={"attempts": 3, "interval": 0, "refresh": True})
+    assert action.executeAction(driver=driver, onRetry=lambda retry, _: retries.append(retry)) == 2
+    assert retries == [1, 2]
+    assert driver.clicks == 3
+    assert driver.refreshes == 2
+    assert action.failed_reason == ""
+
+
+def test_the_step_fails_with_the_error_of_its_last_attempt() -> None:
+    driver = FlakyDriver(failures=5)
+    action = newAction(retry={"attempts": 3, "interval": 0})
+    with pytest.raises(Exception, match="not found"):
+        action.executeAction(driver=driver)
+    assert driver.clicks == 3
+    assert driver.refreshes == 0
+    assert "not found" in action.failed_reason
+
+
+def test_pause_stops_the_wait_between_2_attempts() -> None:
+    driver = FlakyDriver(failures=5)
+    action = newAction(retry={"attempts": 3, "interval": 30, "backoff": "constant"})
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel, kwargs={"reason": "paused"}).start()
+    start = time.perf_counter()
+    with pytest.raises(Cancelled):
+        action.executeAction(driver=driver, token=token)
+    assert time.perf_counter() - start < 5
+    assert driver.clicks == 1
+
+
+@pytest.mark.parametrize("skippable", [False, True])
+def test_a_step_timeout_only_stops_the_run_if_the_step_is_not_skippable(skippable: bool) -> None:
+    driver = FlakyDriver(failures=5)
+    action = newAction(retry={"attempts": 3, "interval": 30, "backoff": "constant"}, skippable=skippable)
+    run_token = CancellationToken()
+    start = time.perf_counter()
+    if skippable:
+        action.executeAction(driver=driver, token=run_token.child(timeout=0.05))
+    else:
+        with pytest.raises(Cancelled):
+            action.executeAction(driver=driver, token=run_token.child(timeout=0.05))
+    assert time.perf_counter() - start < 5
+    assert not run_token.isCancelled()
+
+
+def test_pause_stops_the_run_even_on_a_skippable_step() -> None:
+    driver = FlakyDriver(failures=5)
+    action = newAction(retry={"attempts": 3, "interval": 30, "backoff": "constant"}, skippable=True)
+    run_token = CancellationToken()
+    threading.Timer(0.05, run_token.cancel, kwargs={"reason": "paused"}).start()
+    with pytest.raises(Cancelled):
+        action.executeAction(driver=driver, token=run_token.child(timeout=30))
+    assert "paused" in action.failed_reason
@@ -0,0 +1,124 @@
+from datetime import datetime
+import threading
+import time
+
+import pytest
+
+from configs.automation_configs import OverlapPolicy, ScheduleMode
+from orm.schedule import Schedule
+from orm.scheduler import Scheduler
+
+
+class FakeTemplate:
+    """FakeTemplate counts its starts, and stays running until finish is called."""
+    def __init__(self) -> None:
+        self.starts: int = 0
+        self.running: bool = False
+        self.started = threading.Event()
+
+
+    def start(self) -> None:
+        self.starts += 1
+        self.running = True
+        self.started.set()
+
+
+    def isRunning(self) -> bool:
+        return self.running
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler()
+    yield scheduler
+    scheduler.close()
+
+
+@pytest.mark.parametrize("overlap, expected_starts", [
+    (OverlapPolicy.SKIP, 1),
+    (OverlapPolicy.QUEUE, 2),
+])
+def test_overlap_policy(scheduler: Scheduler, overlap: OverlapPolicy, expected_starts: int) -> None:
+    template = FakeTemplate()
+    job = scheduler.add(name="T", schedule=Schedule(mode=ScheduleMode.FIXED_RATE, interval=0.05, overlap=overlap),
+                        start=template.start, isRunning=template.isRunning)
+    assert template.started.wait(timeout=2)
+    # Several starts are missed while the first run goes on, they count as 1 at most.
+    time.sleep(0.3)
+    assert template.starts == 1
+    assert job.pending == (overlap == OverlapPolicy.QUEUE)
+
+    # The queued run starts right at the end of the current one, without waiting for the next start.
+    scheduler.runFinished(job=job)
+    assert template.starts == expected_starts
+
+
+def test_removed_job_never_starts_its_queued_run(scheduler: Scheduler) -> None:
+    template = FakeTemplate()
+    job = scheduler.add(name="T", schedule=Schedule(mode=ScheduleMode.FIXED_RATE, interval=0.05, overlap=OverlapPolicy.QUEUE),
+                        start=template.start, isRunning=template.isRunning)
+    assert template.started.wait(timeout=2)
+    time.sleep(0.3)
+    assert job.pending
+
+    scheduler.remove(job)
+    scheduler.runFinished(job=job)
+    assert template.starts == 1
+
+
+def test_delay_mode_waits_for_the_end_of_the_run(scheduler: Scheduler) -> None:
+    template = FakeTemplate()
+    job = scheduler.add(name="T", schedule=Schedule(mode=ScheduleMode.DELAY, interval=0.05),
+                        start=template.start, isRunning=template.isRunning)
+    assert template.started.wait(timeout=2)
+    time.sleep(0.2)
+    assert template.starts == 1
+    assert job.next_time is None
+
+    template.running = False
+    template.started.clear()
+    scheduler.runFinished(job=job)
+    assert template.started.wait(timeout=2)
+    assert template.starts == 2
+
+
+def test_fixed_rate_skips_the_missed_starts() -> None:
+    schedule = Schedule(mode=ScheduleMode.FIXED_RATE, interval=10)
+    assert schedule.nextRun(previous=100, now=105) == 110
+    # Woken up late, at 135: 110, 120 and 130 are skipped instead of run at once.
+    assert schedule.nextRun(previous=100, now=135) == 140
+    assert schedule.nextRun(previous=100, now=140) == 150
+
+
+def test_fixed_rate_aligned_to_the_clock() -> None:
+    now = datetime(2024, 5, 6, 10, 7, 30).timestamp()
+    schedule = Schedule(mode=ScheduleMode.FIXED_RATE, interval=900, align=True)
+    assert schedule.firstRun(now=now) == datetime(2024, 5, 6, 10, 15).timestamp()
+    assert Schedule(mode=ScheduleMode.FIXED_RATE, interval=900).firstRun(now=now) == now + 900
+
+
+def test_cron_skips_the_missed_starts() -> None:
+    schedule = Schedule(mode=ScheduleMode.CRON, cron="0 * * * *")
+    previous = datetime(2024, 5, 6, 10, 0).timestamp()
+    now = datetime(2024, 5, 6, 13, 20).timestamp()
+    assert schedule.nextRun(previous=previous, now=now) == datetime(2024, 5, 6, 14, 0).timestamp()
+
+
+def test_from_dict_round_trip() -> None:
+    for schedule in (
+        Schedule(mode=ScheduleMode.FIXED_RATE, interval=60, align=True, overlap=OverlapPolicy.QUEUE),
+        Schedule(mode=ScheduleMode.CRON, cron="0 9 * * 1-5", enabled=False),
+        Schedule(mode=ScheduleMode.DELAY, interval=5),
+    ):
+        assert Schedule.fromDict(schedule.encode()) == schedule
+
+
+@pytest.mark.parametrize("data", [
+    {"mode": "hourly"},
+    {"mode": "cron", "cron": "* * *"},
+    {"mode": "fixed rate", "interval": 0},
+    {"mode": "delay", "interval": 5, "overlap": "cancel"},
+])
+def test_from_dict_rejects_invalid_schedules(data: dict) -> None:
+    with pytest.raises(Exception):
+        Schedule.fromDict(data)
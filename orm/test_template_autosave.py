@@ -0,0 +1,85 @@
+from pathlib import Path
+import os
+import threading
+
+from orm.template_autosave import TemplateAutosaver
+from orm.template_store import JSONTemplateStore, TemplateEntry
+
+
+def newTemplate(value: str) -> dict:
+    return {"delay": 0, "actions": [{"action_type": "Input", "name": "", "css": "#field", "html_attribute": "", "value": value}]}
+
+
+class SlowStore:
+    """SlowStore holds its first write until release is set, and records every write."""
+    def __init__(self, fail: bool = False) -> None:
+        self.writes: list[tuple[str, str]] = []
+        self.fail: bool = fail
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+
+    def write(self, entry: TemplateEntry, data: dict) -> bool:
+        self.writing.set()
+        self.release.wait(timeout=5)
+        if self.fail:
+            raise Exception("disk is full")
+        self.writes.append((entry.name, data["actions"][0]["value"]))
+        return True
+
+
+def test_only_the_latest_snapshot_is_written() -> None:
+    store = SlowStore()
+    autosaver = TemplateAutosaver(store=store)
+    first, second = TemplateEntry(id="1", name="A", position=0), TemplateEntry(id="2", name="B", position=1)
+
+    autosaver.submit(entry=first, data=newTemplate("a1"), onFailed=print)
+    assert store.writing.wait(timeout=5)
+    # The 3 snapshots of A and B submitted during the write of a1 are written as 2.
+    for value in ("a2", "a3"):
+        autosaver.submit(entry=first, data=newTemplate(value), onFailed=print)
+    autosaver.submit(entry=second, data=newTemplate("b1"), onFailed=print)
+    store.release.set()
+    autosaver.flush()
+    assert store.writes == [("A", "a1"), ("A", "a3"), ("B", "b1")]
+    autosaver.close()
+
+
+def test_a_failed_write_is_reported() -> None:
+    store = SlowStore(fail=True)
+    store.release.set()
+    autosaver = TemplateAutosaver(store=store)
+    failures: list[Exception] = []
+    autosaver.submit(entry=TemplateEntry(id="1", name="A", position=0), data=newTemplate("a"), onFailed=failures.append)
+    autosaver.flush()
+    assert [str(e) for e in failures] == ["disk is full"]
+    autosaver.close()
+
+
+def test_close_writes_the_pending_snapshots(tmp_path: Path) -> None:
+    store = JSONTemplateStore(folder=str(tmp_path))
+    autosaver = TemplateAutosaver(store=store)
+    for position, name in enumerate(("A", "B", "C")):
+        autosaver.submit(entry=store.newEntry(name=name, position=position), data=newTemplate(name), onFailed=print)
+    autosaver.close()
+    assert sorted(os.listdir(tmp_path)) == ["0_A.json", "1_B.json", "2_C.json"]
+
+
+def test_the_edited_template_is_saved_after_the_others_move_to_their_tabs(tmp_path: Path) -> None:
+    store = JSONTemplateStore(folder=str(tmp_path))
+    entries = [store.newEntry(name="T", position=position) for position in range(3)]
+    for entry, value in zip(entries, ("first", "second", "third")):
+        store.write(entry=entry, data=newTemplate(value))
+
+    # The first tab is closed, and only the third template is edited.
+    os.remove(entries[0].id)
+    tabs = entries[1:]
+    # Like TabTemplates.__saveAll: the positions are synced first, then only the edited template is written.
+    # Written at its tab's index right away, "third" would overwrite the file of the clean "second" still at position 1.
+    store.reorder(entries=tabs)
+    autosaver = TemplateAutosaver(store=store)
+    autosaver.submit(entry=tabs[1], data=newTemplate("third edited"), onFailed=print)
+    autosaver.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["0_T.json", "1_T.json"]
+    assert [store.read(entry=entry)["actions"][0]["value"] for entry in store.entries()] == ["second", "third edited"]
@@ -0,0 +1,117 @@
+from pathlib import Path
+import json
+
+import pytest
+
+from orm.actions_history import Action, ActionType
+from orm.template_bundle import contentHash, exportTemplates, importTemplates, iterBundle
+from orm.template_file import TEMPLATE_VERSION
+from orm.template_store import JSONTemplateStore
+
+
+def newTemplate(*values: str, delay: int = 0) -> dict:
+    return {"delay": delay, "actions": [
+        {"action_type": "Input", "name": "", "css": "#field", "html_attribute": "", "value": value} for value in values]}
+
+
+def newStore(folder: Path, templates: dict[str, dict]) -> JSONTemplateStore:
+    store = JSONTemplateStore(folder=str(folder))
+    for position, (name, data) in enumerate(templates.items()):
+        store.write(entry=store.newEntry(name=name, position=position), data=data)
+    return store
+
+
+def test_export_and_import_round_trip(tmp_path: Path) -> None:
+    source = newStore(tmp_path / "source", {"Login": newTemplate("alice", "secret", delay=2), "Empty": newTemplate()})
+    bundle = str(tmp_path / "bundle.jsonl")
+    assert exportTemplates(store=source, filename=bundle) == 2
+
+    target = JSONTemplateStore(folder=str(tmp_path / "target"))
+    imported, skipped, _ = importTemplates(store=target, filename=bundle, position=0)
+    assert ([entry.name for entry in imported], skipped) == (["Login", "Empty"], 0)
+    for entry, source_entry in zip(target.entries(), source.entries()):
+        assert target.read(entry=entry) == source.read(entry=source_entry)
+
+
+def test_import_skips_the_templates_already_in_the_store(tmp_path: Path) -> None:
+    bundle = str(tmp_path / "bundle.jsonl")
+    exportTemplates(store=newStore(tmp_path / "source", {"A": newTemplate("a"), "B": newTemplate("b")}), filename=bundle)
+
+    # The same content under another name is a duplicate, the same name with another content is not.
+    target = newStore(tmp_path / "target", {"Renamed A": newTemplate("a"), "B": newTemplate("b", "c")})
+    imported, skipped, _ = importTemplates(store=target, filename=bundle, position=2)
+    assert [(entry.name, entry.position) for entry in imported] == [("B", 2)]
+    assert skipped == 1
+
+
+def test_import_skips_the_duplicates_within_the_bundle(tmp_path: Path) -> None:
+    bundle = str(tmp_path / "bundle.jsonl")
+    exportTemplates(store=newStore(tmp_path / "source", {"A": newTemplate("a"), "Copy of A": newTemplate("a")}), filename=bundle)
+    imported, skipped, _ = importTemplates(store=JSONTemplateStore(folder=str(tmp_path / "target")), filename=bundle, position=0)
+    assert ([entry.name for entry in imported], skipped) == (["A"], 1)
+
+
+def test_content_hash_ignores_the_format_of_the_actions() -> None:
+    action = Action(action_type=ActionType.TEXT_INPUT, name="", css="#field", html_attribute="", value="a")
+    # An old file without the newer fields of Action, the same template in memory and a failed run of it.
+    old = newTemplate("a")
+    failed = {"version": TEMPLATE_VERSION, "delay": 0, "actions": [{**action.encode(), "failed_reason": "not found"}]}
+    assert contentHash(old) == contentHash({"delay": 0, "actions": [action]}) == contentHash(failed)
+    assert contentHash(old) != contentHash(newTemplate("a", delay=1))
+
+
+def test_iter_bundle_checks_the_action_count(tmp_path: Path) -> None:
+    bundle = tmp_path / "bundle.jsonl"
+    exportTemplates(store=newStore(tmp_path / "source", {"A": newTemplate("a", "b")}), filename=str(bundle))
+    lines = bundle.read_text(encoding="utf8").splitlines()
+    bundle.write_text("\n".join(lines[:-1]) + "\n", encoding="utf8")
+    with pytest.raises(Exception, match="has 1 actions instead of 2"):
+        list(iterBundle(filename=str(bundle)))
+
+
+def test_iter_bundle_migrates_the_old_templates(tmp_path: Path) -> None:
+    bundle = tmp_path / "bundle.jsonl"
+    records = [
+        {"type": "bundle", "version": 1, "template_version": 1},
+        {"type": "template", "name": "Old", "hash": "", "action_count": 1, "settings": {"delay": 0}},
+        {"type": "action", "action": {"action_type": "Text input", "name": "", "css": "#field", "html_attribute": "", "value": "a"}},
+    ]
+    bundle.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf8")
+    [(name, data, intact)] = list(iterBundle(filename=str(bundle)))
+    assert intact
+    assert name == "Old"
+    assert data["version"] == TEMPLATE_VERSION
+    assert data["actions"][0]["action_type"] == "Input"
+
+
+@pytest.mark.parametrize("edit", [
+    # An action edited by hand.
+    lambda record: record["action"].update(value="edited") if record["type"] == "action" else None,
+    # A setting edited by hand.
+    lambda record: record["settings"].update(delay=9) if record["type"] == "template" else None,
+])
+def test_import_rejects_a_template_that_does_not_match_its_hash(tmp_path: Path, edit) -> None:
+    bundle = tmp_path / "bundle.jsonl"
+    exportTemplates(store=newStore(tmp_path / "source", {"A": newTemplate("a", "b"), "B": newTemplate("c")}), filename=str(bundle))
+    records = [json.loads(line) for line in bundle.read_text(encoding="utf8").splitlines()]
+    # Only the 1st template (its header and its 2 actions) is edited, its action_count still matches.
+    for record in records[1:4]:
+        edit(record)
+    bundle.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf8")
+
+    imported, skipped, rejected = importTemplates(store=JSONTemplateStore(folder=str(tmp_path / "target")), filename=str(bundle), position=0)
+    assert [entry.name for entry in imported] == ["B"]
+    assert (skipped, rejected) == (0, 1)
+
+
+@pytest.mark.parametrize("content, error", [
+    ('{"type": "template"}\n', "is not a template bundle"),
+    ('{"type": "bundle", "version": 99}\n', "only reads up to"),
+    ('{"type": "bundle", "version": 1}\n{"type": "action", "action": {}}\n', "action without template"),
+    ('{"type": "bundle", "version": 1}\n{"type": "comment"}\n', "unknown record"),
+])
+def test_iter_bundle_rejects_a_malformed_bundle(tmp_path: Path, content: str, error: str) -> None:
+    bundle = tmp_path / "bundle.jsonl"
+    bundle.write_text(content, encoding="utf8")
+    with pytest.raises(Exception, match=error):
+        list(iterBundle(filename=str(bundle)))
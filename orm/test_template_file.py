@@ -0,0 +1,50 @@
+from pathlib import Path
+import json
+
+import pytest
+
+from orm.template_file import TEMPLATE_VERSION, migrateTemplate, readTemplateFile, writeTemplateFile
+
+
+def oldAction(action_type: str) -> dict:
+    return {"action_type": action_type, "name": "", "css": "#x", "html_attribute": "", "value": "1"}
+
+
+def test_migrate_from_1_renames_the_old_action_types() -> None:
+    data = {"delay": 0, "actions": [oldAction(action_type) for action_type in ("Text input", "Click by selector", "Click by value", "Select dropdown", "Sleep", "Input")]}
+    migrated = migrateTemplate(data=data)
+    assert migrated["version"] == TEMPLATE_VERSION
+    assert [action["action_type"] for action in migrated["actions"]] == ["Input", "Click", "Click by Value", "Select", "Wait", "Input"]
+    # The rest of the action is kept as it is.
+    assert migrated["actions"][0]["css"] == "#x"
+
+
+def test_migrate_keeps_a_current_template() -> None:
+    data = {"version": TEMPLATE_VERSION, "delay": 0, "actions": [oldAction("Wait")]}
+    assert migrateTemplate(data={**data}) == data
+
+
+def test_migrate_rejects_a_newer_template() -> None:
+    with pytest.raises(Exception, match="only reads up to"):
+        migrateTemplate(data={"version": TEMPLATE_VERSION + 1, "actions": []}, source="future.json")
+
+
+def test_read_never_rewrites_the_old_file(tmp_path: Path) -> None:
+    filename = tmp_path / "0_old.json"
+    content = json.dumps({"delay": 0, "actions": [oldAction("Sleep")]})
+    filename.write_text(content)
+    assert readTemplateFile(str(filename))["actions"][0]["action_type"] == "Wait"
+    assert filename.read_text() == content
+
+
+def test_write_skips_an_unchanged_template(tmp_path: Path) -> None:
+    filename = str(tmp_path / "0_T.json")
+    data = {"delay": 0, "actions": [oldAction("Wait")]}
+    assert writeTemplateFile(filename=filename, data=data)
+    modified = Path(filename).stat().st_mtime_ns
+    assert not writeTemplateFile(filename=filename, data=data)
+    assert Path(filename).stat().st_mtime_ns == modified
+
+    assert writeTemplateFile(filename=filename, data={**data, "delay": 5})
+    assert readTemplateFile(filename)["delay"] == 5
+    assert not Path(filename + ".tmp").exists()
@@ -0,0 +1,46 @@
+from configs.automation_configs import PacingMode, ResumeMode, RESUME_MODE, ScheduleMode
+from orm.pacing import Pacing
+from orm.schedule import Schedule
+from orm.template_settings import TemplateSettings
+
+
+def test_an_empty_template_has_the_defaults() -> None:
+    assert TemplateSettings.fromDict(data={"actions": []}) == TemplateSettings()
+    assert TemplateSettings().resume_mode == RESUME_MODE
+
+
+def test_all_the_settings_are_converted() -> None:
+    settings = TemplateSettings.fromDict(data={
+        "delay": 3,
+        "pacing": {"mode": "none"},
+        "resume_mode": "failed step",
+        "schedule": {"mode": "delay", "interval": 60},
+        "data_file": "users.csv",
+        "actions": [],
+    })
+    assert settings == TemplateSettings(
+        delay="3",
+        pacing=Pacing(mode=PacingMode.NONE),
+        resume_mode=ResumeMode.FAILED_STEP,
+        schedule=Schedule(mode=ScheduleMode.DELAY, interval=60),
+        data_file="users.csv",
+    )
+
+
+def test_an_invalid_setting_falls_back_to_its_default(capsys) -> None:
+    settings = TemplateSettings.fromDict(data={
+        "delay": "soon",
+        "pacing": {"mode": "random"},
+        "resume_mode": "never",
+        "schedule": {"mode": "cron", "cron": "* *"},
+        "data_file": None,
+    }, source="Login")
+    # The invalid settings never stop the others, nor the template, from loading.
+    assert settings == TemplateSettings()
+    output = capsys.readouterr().out
+    for key in ("delay", "pacing", "resume_mode", "schedule"):
+        assert "template (Login) has an invalid {}".format(key) in output
+
+
+def test_a_null_pacing_is_the_default_pacing() -> None:
+    assert TemplateSettings.fromDict(data={"pacing": None}).pacing == Pacing()
@@ -0,0 +1,97 @@
+from pathlib import Path
+import sqlite3
+
+import pytest
+
+from orm.template_file import TEMPLATE_VERSION
+from orm.template_store import JSONTemplateStore, SQLiteTemplateStore
+
+
+def newTemplate(*values: str, delay: int = 0) -> dict:
+    return {"delay": delay, "actions": [
+        {"action_type": "Input", "name": "", "css": "#field", "html_attribute": "", "value": value} for value in values]}
+
+
+@pytest.fixture
+def database(tmp_path: Path):
+    store = SQLiteTemplateStore(filename=str(tmp_path / "templates.db"))
+    yield store
+    store.close()
+
+
+def test_sqlite_round_trip(database: SQLiteTemplateStore) -> None:
+    entry = database.newEntry(name="Login", position=0)
+    assert database.write(entry=entry, data=newTemplate("alice", "secret", delay=2))
+    data = database.read(entry=entry)
+    assert data["version"] == TEMPLATE_VERSION
+    assert data["delay"] == 2
+    assert [action["value"] for action in data["actions"]] == ["alice", "secret"]
+    assert database.entries() == [entry]
+    assert entry.row_count == 2
+
+
+def test_sqlite_skips_an_unchanged_template(database: SQLiteTemplateStore) -> None:
+    entry = database.newEntry(name="Login", position=0)
+    database.write(entry=entry, data=newTemplate("alice"))
+    assert not database.write(entry=entry, data=database.read(entry=entry))
+    assert database.write(entry=entry, data=newTemplate("bob"))
+
+
+def test_sqlite_only_rewrites_the_actions_that_changed(database: SQLiteTemplateStore) -> None:
+    entry = database.newEntry(name="Login", position=0)
+    database.write(entry=entry, data=newTemplate("a", "b", "c", "d"))
+
+    # Count the rows written from now on, through another connection of the same database.
+    connection = sqlite3.connect(database.filename)
+    with connection:
+        connection.executescript("""
+            CREATE TABLE written (step INTEGER);
+            CREATE TRIGGER log_insert AFTER INSERT ON actions BEGIN INSERT INTO written VALUES (new.step); END;
+        """)
+    database.write(entry=entry, data=newTemplate("a", "B", "c"))
+    assert [row[0] for row in connection.execute("SELECT step FROM written")] == [1]
+    assert connection.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 3
+    connection.close()
+    assert [action["value"] for action in database.read(entry=entry)["actions"]] == ["a", "B", "c"]
+
+
+def test_sqlite_keeps_2_templates_with_the_same_name(database: SQLiteTemplateStore) -> None:
+    first, second = database.newEntry(name="T", position=0), database.newEntry(name="T", position=1)
+    database.write(entry=first, data=newTemplate("first"))
+    database.write(entry=second, data=newTemplate("second"))
+    database.reorder(entries=[second, first])
+    assert [(entry.id, entry.position) for entry in database.entries()] == [(second.id, 0), (first.id, 1)]
+    database.rename(entry=first, name="U")
+    assert database.read(entry=first)["actions"][0]["value"] == "first"
+
+
+def test_json_reorder_with_the_same_names(tmp_path: Path) -> None:
+    store = JSONTemplateStore(folder=str(tmp_path))
+    entries = [store.newEntry(name=name, position=position) for name, position in (("T", 1), ("T", 2), ("U", 5))]
+    for entry, value in zip(entries, ("first", "second", "third")):
+        store.write(entry=entry, data=newTemplate(value))
+
+    # The 2nd T moves to the file of the 1st T, which moves too.
+    store.reorder(entries=[entries[1], entries[0], entries[2]])
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["0_T.json", "1_T.json", "2_U.json"]
+    assert [(entry.name, entry.position) for entry in store.entries()] == [("T", 0), ("T", 1), ("U", 2)]
+    assert [store.read(entry=entry)["actions"][0]["value"] for entry in store.entries()] == ["second", "first", "third"]
+
+
+def test_json_write_removes_the_file_of_the_old_position(tmp_path: Path) -> None:
+    store = JSONTemplateStore(folder=str(tmp_path))
+    entry = store.newEntry(name="T", position=3)
+    store.write(entry=entry, data=newTemplate("a"))
+    entry.position = 0
+    store.write(entry=entry, data=newTemplate("a"))
+    assert [file.name for file in tmp_path.iterdir()] == ["0_T.json"]
+
+
+def test_import_from_the_json_store(tmp_path: Path, database: SQLiteTemplateStore) -> None:
+    json_store = JSONTemplateStore(folder=str(tmp_path / "templates"))
+    for position, name in enumerate(("Login", "Logout")):
+        json_store.write(entry=json_store.newEntry(name=name, position=position), data=newTemplate(name))
+
+    assert database.importFrom(store=json_store) == 2
+    assert [(entry.name, entry.position, entry.row_count) for entry in database.entries()] == [("Login", 0, 1), ("Logout", 1, 1)]
+    assert [database.read(entry=entry)["actions"][0]["value"] for entry in database.entries()] == ["Login", "Logout"]
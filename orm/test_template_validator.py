@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+
+from orm.actions_history import Action, ActionType
+from orm.template_validator import validateAction, validateTemplate
+
+
+def newAction(action_type: str, name: str = "", css: str = "", html_attribute: str = "", value: str = "") -> Action:
+    return Action(action_type=action_type, name=name, css=css, html_attribute=html_attribute, value=value)
+
+
+def errors(actions: list[Action], data_file: str = "") -> list[str]:
+    return [str(problem) for problem in validateTemplate(actions=actions, repeat="1", delay="0", data_file=data_file) if not problem.warning]
+
+
+def test_all_the_problems_are_reported_at_once() -> None:
+    problems = validateTemplate(actions=[
+        newAction(ActionType.CLICK_BY_SELECTOR),
+        newAction(ActionType.SWITCH_TAB, value="second"),
+        newAction(ActionType.SLEEP, value="-1"),
+        newAction("Drag"),
+    ], repeat="x", delay="0")
+    assert [problem.step for problem in problems] == [None, 1, 2, 3, 4]
+    assert not any(problem.warning for problem in problems)
+
+
+def test_a_valid_template_has_no_problem() -> None:
+    assert validateTemplate(actions=[
+        newAction(ActionType.TEXT_INPUT, css="#user", value="alice"),
+        newAction(ActionType.CLICK_BY_VALUE, css="button", value="Log in"),
+        newAction(ActionType.SLEEP, value="0.5"),
+    ], repeat="3", delay="1") == []
+
+
+@pytest.mark.parametrize("css", [
+    "#\\31 23",
+    "#form\\:btn",
+    '[data-x="a" i]',
+    "ns|a",
+    "a:hover",
+])
+def test_a_selector_the_parser_does_not_know_is_only_a_warning(css: str) -> None:
+    problems = validateAction(action=newAction(ActionType.CLICK_BY_SELECTOR, css=css), step=1)
+    assert len(problems) == 1
+    assert problems[0].warning
+
+
+def test_a_template_without_a_data_file_keeps_its_braces() -> None:
+    assert errors([
+        newAction(ActionType.TEXT_INPUT, css="#json", value='{"user": "{name}"}'),
+        newAction(ActionType.TEXT_INPUT, css="#user", value="{word}"),
+    ]) == []
+
+
+def test_placeholders_are_checked_against_the_data_file(tmp_path: Path) -> None:
+    data_file = tmp_path / "users.csv"
+    data_file.write_text("user,password\nalice,secret\n", encoding="utf8")
+    problems = errors([
+        newAction(ActionType.TEXT_INPUT, css="#user", value="{user}"),
+        newAction(ActionType.TEXT_INPUT, css="#email", value="{email}"),
+        newAction(ActionType.TEXT_INPUT, css="#json", value="{{email}}"),
+        newAction(ActionType.SWITCH_TAB, value="{user}"),
+    ], data_file=str(data_file))
+    assert problems == [
+        "step 2: value uses the column (email) that is not in the data file",
+        "step 4: value for switching tab must be a number, got ({user})",
+    ]
+
+
+def test_an_unreadable_data_file_is_an_error(tmp_path: Path) -> None:
+    problems = errors([newAction(ActionType.TEXT_INPUT, css="#user", value="{user}")], data_file=str(tmp_path / "missing.csv"))
+    assert len(problems) == 1
+    assert "can't read the data file" in problems[0]
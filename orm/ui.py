@@ -7,7 +7,7 @@ from configs.ui_configs import (
     ACTION_TAB_KEY,
     HISTORY_TAB_KEY,
 )
-from orm.driver import Driver
+from orm.driver_pool import DriverPool
 from orm.scrollable_table import (
     ScrollableActionTable,
 )
@@ -17,8 +17,8 @@ from helpers.ui import (
 )
 
 class UI:
-    def __init__(self, driver:Driver) -> None:
-        self.driver = driver
+    def __init__(self, driver_pool:DriverPool) -> None:
+        self.driver_pool = driver_pool
         self.root = Tk()
         SetStyle()
 
@@ -71,13 +71,19 @@ class UI:
 
 
     def __renderTemplateTab(self) -> None:
-        self.tab_templates: TabTemplates = TabTemplates(master=self.tab_control, driver=self.driver)
+        self.tab_templates: TabTemplates = TabTemplates(master=self.tab_control, driver_pool=self.driver_pool)
         self.tab_control.add(child=self.tab_templates.main_ui, text="Templates")
 
 
     # Start the application.
     def go(self) -> None:
-        # When the UI is initiated, it's linked to the mock browser, but not linked to any tab yet.
-        # The mock browser always has 1 empty tab open, so for convenience, I'll link the UI to that empty tab.
-        self.driver.switchTab(0)
+        # Each browser of the pool is linked to its first (empty) tab when it's started,
+        # see DriverPool.__newDriver.
+        self.root.protocol("WM_DELETE_WINDOW", self.__onClose)
         self.root.mainloop()
+
+
+    # __onClose saves the edited templates while their widgets still exist, then closes the window.
+    def __onClose(self) -> None:
+        self.tab_templates.close()
+        self.root.destroy()